@@ -1,30 +1,44 @@
 ## Eisenhower Matrix + Daily Planner integrated. Calender control working
-print("STEP 1: app.py import started")
 from re import search
 from warnings import filters
-from flask import Flask, request, redirect, url_for, render_template_string, session,jsonify,render_template,abort
+from flask import Flask, request, redirect, url_for, session,jsonify,render_template,abort
 import os
 from datetime import date, datetime, timedelta
 import calendar
 from calendar import monthrange
 import json
-from google.auth.transport.requests import Request   
 from werkzeug.wrappers import response
-from supabase_client import get, post, update
-from logger import setup_logger
+import supabase_client
+from supabase_client import get, post, update, upsert
+import metrics
+from metrics import timed
+from logger import setup_logger, log_payload
 from utils.dates import safe_date 
 from config import TOTAL_SLOTS,QUADRANT_MAP
 from utils.calender_links import google_calendar_link
-from services.planner_service import generate_weekly_insight, load_day, save_day, get_daily_summary, get_weekly_summary,compute_health_streak,is_health_day,ensure_daily_habits_row,group_slots_into_blocks
-from services.planner_service import fetch_daily_slots
+from services.planner_service import generate_weekly_insight, save_day, get_daily_summary, get_weekly_summary,compute_health_streak,is_health_day,group_slots_into_blocks
+from services.planner_service import load_day_bundle
 from services.login_service import login_required
 from services.eisenhower_service import autosave_task
 from config import MIN_HEALTH_HABITS
-from services.recurring_service import materialize_recurring_slots
+from services.habit_analytics import (
+    load_daily_scores,
+    load_scores_and_matrix,
+    score_series,
+    refresh_daily_score,
+)
+from services.streak_service import record_day_score, clear_streak_cache
+from supabase_async import gather_reads
+from services.project_service import invalidate_project_names
+from services.slot_occupancy import load_occupancy, invalidate_occupancy
+from services.event_index import EventIndexes, batch_conflicts, load_event_index
+from services.google_calendar import invalidate_calendar
+from services import google_sync
 from services.gantt_service import build_gantt_tasks
 from services.eisenhower_service import (
     copy_open_tasks_from_previous_day,  
     enable_travel_mode,
+    expire_old_eisenhower_tasks_daily,
 )
 from services.task_service import (
     complete_task_occurrence,
@@ -35,11 +49,10 @@ from services.task_service import (
 from collections import OrderedDict
 from services.untimed_service import remove_untimed_task  
 from services.timeline_service import load_timeline_tasks
-from templates.planner import PLANNER_TEMPLATE
-from templates.todo import TODO_TEMPLATE
-from templates.summary import SUMMARY_TEMPLATE
-from templates.login import LOGIN_TEMPLATE
-from utils.smartplanner import parse_smart_sentence
+import inline_templates
+from inline_templates import PLANNER_PAGE, TODO_PAGE, SUMMARY_PAGE, LOGIN_PAGE
+from utils.parse_cache import parse_planner_line, parse_smart_line
+from utils import parse_cache
 from config import (
     IST,
     STATUSES,
@@ -49,32 +62,31 @@ from config import (
     PRIORITY_MAP,
     SORT_PRESETS,
 )
-from utils.planner_parser import parse_planner_input
-from utils.slots import current_slot,slot_label
-import traceback
+from utils.slots import current_slot,SLOT_LABELS
 from services.ai_service  import call_gemini
 from flask import jsonify
 import requests
 from flask import request, jsonify
-from bs4 import BeautifulSoup
 from utils.dates import safe_date_from_string
-import bleach
 from flask import session, redirect, url_for, request, jsonify
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from datetime import datetime
-import pytz
-print("STEP 2: imports completed")
+
+# Google API clients, BeautifulSoup and bleach are imported inside the
+# routes that use them – together they were most of the cold-start
+# import time, and most worker boots never touch them.
 
 app = Flask(__name__)
-print("STEP 3: flask created")
+inline_templates.init_app(app)
+metrics.init_app(app)
+metrics.add_collector(parse_cache.metrics_lines)
+metrics.add_collector(supabase_client.metrics_lines)
+google_sync.init_app(app)
+metrics.add_collector(google_sync.metrics_lines)
 logger = setup_logger()
+logger.debug("Flask app created")
 @app.errorhandler(Exception)
 def catch_all_errors(e):
-    print("🔥 GLOBAL EXCEPTION CAUGHT 🔥")
-    traceback.print_exc()   # <-- ALWAYS prints
-    logger.exception("UNHANDLED EXCEPTION")
+    logger.exception("🔥 UNHANDLED EXCEPTION")
     return "Internal Server Error", 500
 
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "change-this-secret")
@@ -93,9 +105,9 @@ def login():
             session["authenticated"] = True
             session["user_id"] = "VenghateshS" 
             return redirect(url_for("planner"))
-        return render_template_string(LOGIN_TEMPLATE, error="Invalid password")
+        return render_template(LOGIN_PAGE, error="Invalid password")
 
-    return render_template_string(LOGIN_TEMPLATE)
+    return render_template(LOGIN_PAGE)
 
 
 @app.route("/logout")
@@ -152,12 +164,14 @@ def planner():
         return redirect(
             url_for("planner", year=plan_date.year, month=plan_date.month, day=plan_date.day, saved=1)
         )
-    materialize_recurring_slots(plan_date, user_id)
-    ensure_daily_habits_row(user_id, plan_date)
-  
-    plans, habits, reflection,untimed_tasks= load_day(plan_date)
- 
-    daily_slots = fetch_daily_slots(plan_date)
+    # One parallel fetch: slots + meta + recurring rules + habits
+    bundle = load_day_bundle(plan_date, user_id)
+
+    plans = bundle["plans"]
+    habits = bundle["habits"]
+    reflection = bundle["reflection"]
+    untimed_tasks = bundle["untimed_tasks"]
+    daily_slots = bundle["daily_slots"]
     blocks = group_slots_into_blocks(plans)
 
 
@@ -166,11 +180,6 @@ def planner():
         date(year, month, d) for d in range(1, calendar.monthrange(year, month)[1] + 1)
     ]
 
-    reminder_links = {
-        slot: google_calendar_link(plan_date, slot, plans[slot]["plan"])
-        for slot in range(1, TOTAL_SLOTS + 1)
-    }
-   
     health_streak = compute_health_streak(user_id, plan_date)
 
     streak_active_today = is_health_day(set(habits))
@@ -188,8 +197,8 @@ def planner():
    # tasks = build_tasks_for_ui(plan_date)
    
 
-    return render_template_string(
-        PLANNER_TEMPLATE,
+    return render_template(
+        PLANNER_PAGE,
         year=year,
         month=month,
         days=days,
@@ -197,8 +206,7 @@ def planner():
         today=today,
         plans=plans,
         statuses=STATUSES,
-        slot_labels={i: slot_label(i) for i in range(1, TOTAL_SLOTS + 1)},
-        reminder_links=reminder_links,
+        slot_labels=SLOT_LABELS,
         now_slot=current_slot() if plan_date == today else None,
         saved=request.args.get("saved"),
         habits=habits,
@@ -219,8 +227,40 @@ def planner():
         selected_date=selected_date,
        # tasks=tasks,
         daily_slots=daily_slots
-        
+
+    )
+
+
+@app.route("/planner/calendar-link")
+@login_required
+def planner_calendar_link():
+    """
+    Google Calendar "add event" link for one planned slot, built on
+    click instead of for all 48 slots on every planner render.
+    """
+    try:
+        plan_date = date.fromisoformat(request.args.get("date", ""))
+        slot = int(request.args.get("slot", ""))
+    except ValueError:
+        return jsonify({"error": "date and slot required"}), 400
+
+    if not 1 <= slot <= TOTAL_SLOTS:
+        return jsonify({"error": "slot out of range"}), 400
+
+    rows = get(
+        "daily_slots",
+        params={
+            "plan_date": f"eq.{plan_date}",
+            "slot": f"eq.{slot}",
+            "select": "plan",
+        },
     )
+    task = rows[0]["plan"] if rows else ""
+
+    if not task:
+        return jsonify({"error": "slot is empty"}), 404
+
+    return redirect(google_calendar_link(plan_date, slot, task))
 
 def empty_quadrant():
     return {"tasks": []}
@@ -325,43 +365,13 @@ def normalize_task(t, project_name=None):
         "recurring": bool(t.get("recurrence")),
         "recurrence": t.get("recurrence"),
     }
-def expire_old_eisenhower_tasks(user_id):
-    today = date.today().isoformat()
-
-    rows = get(
-        "todo_matrix",
-        params={
-            "user_id": f"eq.{user_id}",
-            "is_done": "eq.false",
-            "plan_date": f"lt.{today}",
-            "select": "id, source_task_id"
-        }
-    )
-
-    for r in rows:
-        # 1️⃣ Remove / expire Eisenhower entry
-        update(
-            "todo_matrix",
-            params={"id": f"eq.{r['id']}"},
-            json={"is_deleted": True}
-        )
-
-        # 2️⃣ Restore project task status (if linked)
-        if r.get("source_task_id"):
-            update(
-                "project_tasks",
-                params={"task_id": f"eq.{r['source_task_id']}"},
-                json={
-                    "status": "open"
-                }
-            )
 # ==========================================================
 # ROUTES – EISENHOWER MATRIX
 # ==========================================================
 @app.route("/todo", methods=["GET"])
 @login_required
 def todo():
-    expire_old_eisenhower_tasks(session["user_id"])
+    expire_old_eisenhower_tasks_daily(session["user_id"])
 
     # 📅 Selected day (default = today)
     year = int(request.args.get("year", date.today().year))
@@ -371,43 +381,42 @@ def todo():
     plan_date = date(year, month, day)
 
     # 1️⃣ Fetch ONLY Eisenhower tasks for this date
+    #    (project name embedded → no separate projects scan)
     raw_tasks = get(
         "todo_matrix",
         params={
             "plan_date": f"eq.{plan_date.isoformat()}",
-            "is_deleted": "eq.false"
+            "is_deleted": "eq.false",
+            "select": (
+                "id,task_text,quadrant,is_done,project_id,source_task_id,"
+                "projects(name)"
+            ),
         }
     )
 
-    # 2️⃣ Fetch projects (for labels / linking only)
-    projects = get("projects")
-    project_map = {
-        p["project_id"]: p["name"]
-        for p in projects
-    }
-
-    # 3️⃣ Normalize Eisenhower tasks
+    # 2️⃣ Normalize Eisenhower tasks
     tasks = []
     for t in raw_tasks:
+        project = t.get("projects") or {}
         tasks.append({
             "id": t["id"],
             "task_text": t["task_text"],
             "quadrant": t["quadrant"],          # already explicit
             "is_done": t.get("is_done", False),
             "project_id": t.get("project_id"),
-            "project_name": project_map.get(t.get("project_id")),
+            "project_name": project.get("name"),
             "source_task_id": t.get("source_task_id"),
         })
 
-    # 4️⃣ Build Eisenhower view (NO due-date logic here)
+    # 3️⃣ Build Eisenhower view (NO due-date logic here)
     todo = build_eisenhower_view(tasks, plan_date)
     quadrant_counts = compute_quadrant_counts(todo)
 
-    # 5️⃣ Render
+    # 4️⃣ Render
     days = calendar.monthrange(year, month)[1]
 
-    return render_template_string(
-        TODO_TEMPLATE,
+    return render_template(
+        TODO_PAGE,
         todo=todo,
         plan_date=plan_date,
         year=year,
@@ -493,7 +502,8 @@ def set_recurrence():
     task = get("todo_matrix", params={"id": f"eq.{task_id}"})[0]
 
     # ----------------------------
-    # FIX 3: prevent duplicate rules
+    # Prevent duplicate rules (active ones only – a stopped
+    # recurrence can be set again)
     # ----------------------------
     existing = get(
         "recurring_tasks",
@@ -502,6 +512,7 @@ def set_recurrence():
             "quadrant": f"eq.{task['quadrant']}",
             "start_date": f"eq.{task['plan_date']}",
             "is_active": "eq.true",
+            "select": "id",
         },
     )
 
@@ -512,7 +523,7 @@ def set_recurrence():
     # ----------------------------
     # Create recurring rule
     # ----------------------------
-    rule=post(
+    rule = post(
         "recurring_tasks",
         {
             "quadrant": task["quadrant"],
@@ -534,6 +545,7 @@ def set_recurrence():
             ),
          },
     )
+
     update(
     "todo_matrix",
     params={"id": f"eq.{task_id}"},
@@ -630,8 +642,8 @@ def summary():
         data = get_weekly_summary(start, end)
         insights = generate_weekly_insight(data)
 
-        return render_template_string(
-            SUMMARY_TEMPLATE,
+        return render_template(
+            SUMMARY_PAGE,
             view="weekly",
             data=data,
             start=start,
@@ -645,8 +657,8 @@ def summary():
     # =========================
     data = get_daily_summary(plan_date)
 
-    return render_template_string(
-        SUMMARY_TEMPLATE,
+    return render_template(
+        SUMMARY_PAGE,
         view="daily",
         data=data,
         date=plan_date,
@@ -750,21 +762,6 @@ def promoteuntimed():
     remove_untimed_task(user_id, plan_date, task_id)
 
     return ("", 204)
-def get_plans_for_date(plan_date):
-    return [
-        p for p in session.get("plans", [])
-        if p["plan_date"] == plan_date
-    ]
-
-def get_plan_for_slot(plan_date, slot):
-    plans = get_plans_for_date(plan_date)  # DB / cache / session
-
-    for plan in plans:
-        if plan["start_slot"] <= slot < plan["start_slot"] + plan["slot_count"]:
-            return plan["text"]
-
-    return None
-
 @app.route("/smart/add", methods=["POST"])
 @login_required
 def smart_add():
@@ -811,25 +808,21 @@ def smart_preview():
 
     # Try parsing smart sentence
     try:
-        parsed = parse_smart_sentence(text, date.fromisoformat(plan_date))
+        parsed = parse_smart_line(text, date.fromisoformat(plan_date))
     except Exception:
         # If parsing fails → no conflicts, allow save
         return jsonify({"conflicts": []})
 
-    start_slot = parsed["start_slot"]
-    slot_count = parsed["slot_count"]
-
-    # Fetch existing plans for those slots
-    conflicts = []
-    for i in range(slot_count):
-        slot = start_slot + i
-        existing = get_plan_for_slot(plan_date, slot)  # ← YOUR EXISTING helper
-        if existing and existing.strip():
-            conflicts.append({
-                "time": f"Slot {slot}",
-                "existing": existing,
-                "incoming": parsed["text"]
-            })
+    # One cached daily_slots read → bitmap range check
+    occupancy = load_occupancy(session.get("user_id"), plan_date)
+    conflicts = [
+        {
+            "time": f"Slot {slot}",
+            "existing": existing,
+            "incoming": parsed["text"]
+        }
+        for slot, existing in occupancy.conflicts(parsed["start_slot"], parsed["slot_count"])
+    ]
 
     return jsonify({"conflicts": conflicts})
 
@@ -846,9 +839,17 @@ def schedule_untimed():
         return ("Cannot schedule in the past", 400)
 
     task_id = data["id"]
-    start_slot = int(data["start_slot"])
     slot_count = int(data["slot_count"])
 
+    # No start slot → first free range (from now on for today)
+    if data.get("start_slot") is None:
+        after = current_slot() if plan_date == datetime.now(IST).date() else 1
+        start_slot = load_occupancy(user_id, plan_date).first_free(slot_count, after)
+        if start_slot is None:
+            return ("No free slot range", 409)
+    else:
+        start_slot = int(data["start_slot"])
+
     # -------------------------------------------------
     # Resolve untimed task from daily_meta (SOURCE OF TRUTH)
     # -------------------------------------------------
@@ -896,11 +897,8 @@ def schedule_untimed():
     # -------------------------------------------------
     # Insert / update daily slots
     # -------------------------------------------------
-    post(
-        "daily_slots?on_conflict=plan_date,slot",
-        payload,
-        prefer="resolution=merge-duplicates",
-    )
+    upsert("daily_slots", payload)
+    invalidate_occupancy(plan_date)
 
     # -------------------------------------------------
     # Remove from untimed list
@@ -918,33 +916,42 @@ def untimed_slot_preview():
     start_slot = int(data["start_slot"])
     slot_count = int(data["slot_count"])
 
-    preview = []
+    occupancy = load_occupancy(session["user_id"], plan_date)
 
-    for i in range(slot_count):
-        slot = start_slot + i
-        if not (1 <= slot <= TOTAL_SLOTS):
-            continue
+    return occupancy.preview(start_slot, slot_count), 200
 
-        row = get(
-            "daily_slots",
-            params={
-                "plan_date":f"eq.{plan_date.isoformat()}",
-                "slot": f"eq.{slot}",
-                "select": "slot,plan",
-            },
-        )
 
-        preview.append({
-            "slot": slot,
-            "existing": row[0]["plan"] if row and row[0].get("plan") else ""
-        })
+@app.route("/slots/free")
+@login_required
+def free_slots():
+    """
+    First free range of `count` slots at or after `after`, plus the
+    occupied slots of the day – one cached read.
+    """
+    plan_date = safe_date_from_string(request.args.get("date"))
+    try:
+        count = int(request.args.get("count", 1))
+        after = int(request.args.get("after", 1))
+    except ValueError:
+        return jsonify({"error": "count and after must be integers"}), 400
+
+    if not 1 <= count <= TOTAL_SLOTS:
+        return jsonify({"error": "count out of range"}), 400
 
-    return preview, 200
+    occupancy = load_occupancy(session["user_id"], plan_date)
+
+    return jsonify({
+        "start_slot": occupancy.first_free(count, after),
+        "occupied": [
+            slot for slot in range(1, TOTAL_SLOTS + 1)
+            if not occupancy.is_free(slot)
+        ],
+    })
 @app.route("/todo/autosave", methods=["POST"])
 @login_required
 def todo_autosave():
     data = request.get_json(force=True)
-    logger.info("AUTOSAVE DATA: %s", data)
+    log_payload(logger, "AUTOSAVE DATA: %s", data)
 
     # 🛑 HARD GUARD — ignore anything not from Eisenhower
     if "id" not in data or "plan_date" not in data or "quadrant" not in data:
@@ -971,11 +978,11 @@ def todo_autosave():
 
     # 🔁 Sync completion back to project task (if linked)
     if "is_done" in data:
-        row = get(
+        rows = get(
             "todo_matrix",
-            params={"id": f"eq.{task_id}"},
-            single=True
+            params={"id": f"eq.{task_id}", "select": "source_task_id"},
         )
+        row = rows[0] if rows else None
 
         if row and row.get("source_task_id"):
             update(
@@ -1077,6 +1084,7 @@ def update_slot():
             },
             json={"plan": text},
         )
+    invalidate_occupancy(plan_date)
 
     return ("", 204)
 @app.route("/subtask/add", methods=["POST"])
@@ -1157,6 +1165,7 @@ def set_project_sort(project_id):
         params={"project_id": f"eq.{project_id}"},
         json={"default_sort": sort}
     )
+    invalidate_project_names(session["user_id"])
 
     return jsonify({"status": "ok"})
 
@@ -1569,7 +1578,7 @@ def build_slot_blocks(rows):
 
         blocks.append({
             "slot": slot,
-            "label": slot_label(slot),
+            "label": SLOT_LABELS[slot],
             "text": r["plan"] if r else "",
             "status": r["status"] if r else None
         })
@@ -1899,6 +1908,7 @@ def create_project():
                 "user_id": session.get("user_id")
             }
         )
+        invalidate_project_names(session.get("user_id"))
 
         return redirect("/projects")
 
@@ -2149,32 +2159,25 @@ def update_task_occurrence_route():
     return "", 204
 
 def get_conflicts(user_id, plan_date, start_time, end_time, exclude_id=None):
-    existing = get(
-        "daily_events",
-        params={
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"eq.{plan_date}",
-            "is_deleted": "eq.false"
-        }
-    ) or []
+    index = load_event_index(user_id, plan_date)
+    return index.conflicts(start_time, end_time, exclude_id=exclude_id)
 
-    conflicts = []
 
-    for e in existing:
-        if exclude_id and str(e["id"]) == str(exclude_id):
-            continue
+@app.route("/api/v2/events/conflicts", methods=["POST"])
+@login_required
+def check_event_conflicts():
+    """
+    Batched conflict check: {"events": [{plan_date, start_time,
+    end_time[, id]}, ...]} → one conflict list per event.
+    """
+    events = (request.get_json(silent=True) or {}).get("events") or []
 
-        if not (
-            end_time <= e["start_time"] or
-            start_time >= e["end_time"]
-        ):
-            conflicts.append({
-                "start_time": str(e["start_time"]),
-                "end_time": str(e["end_time"]),
-                "title": e["title"]
-            })
+    try:
+        results = batch_conflicts(session["user_id"], events)
+    except (KeyError, ValueError, TypeError):
+        return jsonify({"error": "plan_date, start_time and end_time required"}), 400
 
-    return conflicts
+    return jsonify({"conflicts": results})
 
 @app.route("/planner-v2")
 def planner_v2():
@@ -2197,28 +2200,11 @@ def list_events():
     return jsonify(events)
 
 
-
-
-def build_google_datetime(plan_date, time_str):
-    tz = pytz.timezone("Asia/Kolkata")
-
-    # 🔥 Support both HH:MM and HH:MM:SS
-    try:
-        dt = datetime.strptime(f"{plan_date} {time_str}", "%Y-%m-%d %H:%M:%S")
-    except ValueError:
-        dt = datetime.strptime(f"{plan_date} {time_str}", "%Y-%m-%d %H:%M")
-
-    dt = tz.localize(dt)
-    return dt.isoformat()
-
 @app.route("/api/v2/events", methods=["POST"])
 @login_required
 def create_event():
     from flask import jsonify
-    print("Received event creation request with data:", request.json)
-    print("Session data:", dict(session))
-    print("User ID from session:", session.get("user_id"))
-    print("Session user_id:", session["user_id"]) 
+    log_payload(logger, "Create event request: %s", request.json)
     user_id = session["user_id"]
     data = request.json
     force = data.get("force", False)
@@ -2246,24 +2232,16 @@ def create_event():
     "end_time": data["end_time"],
     "title": data["title"],
     "description": data.get("description", ""),
-    "priority": data.get("priority", "medium")
+    "priority": data.get("priority", "medium"),
+    "google_sync_status": google_sync.PENDING
     })
-    print("Created event:", response1)
     created_row = response1[0] if response1 else None
-    print("Created row:", created_row )
-# 🔥 AUTO SYNC TO GOOGLE
+    log_payload(logger, "Created event row: %s", created_row)
+# 🔥 AUTO SYNC TO GOOGLE (outbox → background worker)
     if created_row:
-        try:
-            google_id = insert_google_event(created_row)
-
-            if google_id:
-                update(
-                    "daily_events",
-                    params={"id": f"eq.{created_row['id']}"},
-                    json={"google_event_id": google_id}
-                )
-        except Exception as e:
-            print("Google sync failed:", e)
+        google_sync.enqueue([
+            google_sync.outbox_row(user_id, created_row["id"], "create")
+        ])
 
     return jsonify({"success": True})
 
@@ -2297,69 +2275,13 @@ def update_event(event_id):
             "start_time": data["start_time"],
             "end_time": data["end_time"],
             "title": data["title"],
-            "description": data.get("description", "")
+            "description": data.get("description", ""),
+            "google_sync_status": google_sync.PENDING
         }
     )
     # 🔥 SYNC GOOGLE UPDATE
-    row = get(
-        "daily_events",
-        params={"id": f"eq.{event_id}"}
-    )
-
-    if row and row[0].get("google_event_id"):
-        try:
-            google_id = row[0]["google_event_id"]
-
-            # 🔥 Load user Google credentials from DB
-            user_id = "VenghateshS"
-
-            rows = get(
-                "user_google_tokens",
-                {"user_id": f"eq.{user_id}"}
-            )
-
-            if rows:
-                token_row = rows[0]
-
-                credentials = Credentials(
-                    token=token_row["access_token"],
-                    refresh_token=token_row["refresh_token"],
-                    token_uri=token_row["token_uri"],
-                    client_id=token_row["client_id"],
-                    client_secret=token_row["client_secret"],
-                    scopes=token_row["scopes"].split(",")
-                )
-
-                if credentials.expired and credentials.refresh_token:
-                    credentials.refresh(Request())
-
-                    update(
-                        "user_google_tokens",
-                        params={"user_id": f"eq.{user_id}"},
-                        json={"access_token": credentials.token}
-                    )
+    google_sync.enqueue([google_sync.outbox_row(user_id, event_id, "update")])
 
-                service = build("calendar", "v3", credentials=credentials)
-
-                service.events().update(
-                    calendarId="primary",
-                    eventId=google_id,
-                    body={
-                        "summary": data["title"],
-                        "description": data.get("description", ""),
-                        "start": {
-                            "dateTime": f"{data['plan_date']}T{data['start_time']}:00",
-                            "timeZone": "Asia/Kolkata"
-                        },
-                        "end": {
-                            "dateTime": f"{data['plan_date']}T{data['end_time']}:00",
-                            "timeZone": "Asia/Kolkata"
-                        }
-                    }
-                ).execute()
-
-        except Exception as e:
-            print("Google update failed:", e)
     return jsonify({"success": True})
 
 @app.route("/api/v2/events/<event_id>", methods=["DELETE"])
@@ -2367,45 +2289,12 @@ def delete_event(event_id):
     update(
         "daily_events",
         params={"id": f"eq.{event_id}"},
-        json={"is_deleted": True}
+        json={"is_deleted": True, "google_sync_status": google_sync.PENDING}
     )
-    row = get(
-    "daily_events",
-    params={"id": f"eq.{event_id}"}
-)
-
-    if row and row[0].get("google_event_id"):
-        try:
-            google_id = row[0]["google_event_id"]
-
-            user_id = "VenghateshS"
-
-            rows = get(
-                "user_google_tokens",
-                {"user_id": f"eq.{user_id}"}
-            )
-
-            if rows:
-                token_row = rows[0]
-
-                credentials = Credentials(
-                    token=token_row["access_token"],
-                    refresh_token=token_row["refresh_token"],
-                    token_uri=token_row["token_uri"],
-                    client_id=token_row["client_id"],
-                    client_secret=token_row["client_secret"],
-                    scopes=token_row["scopes"].split(",")
-                )
-
-                service = build("calendar", "v3", credentials=credentials)
+    google_sync.enqueue([
+        google_sync.outbox_row("VenghateshS", event_id, "delete")
+    ])
 
-                service.events().delete(
-                    calendarId="primary",
-                    eventId=google_id
-                ).execute()
-
-        except Exception as e:
-            print("Google delete failed:", e)
     return {"ok": True}
 @app.route("/api/v2/project-tasks")
 def get_project_tasks():
@@ -2522,39 +2411,49 @@ def get_daily_health():
         return jsonify({})
 
     # ---------------------
-    # Load health
+    # Independent reads → one concurrent round-trip
+    # (the 30-day trend also carries the day's row and the
+    #  latest previous one, so daily_health is read once)
     # ---------------------
-    health_rows = get(
-        "daily_health",
-        params={
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"eq.{plan_date}"
-        }
-    )
-
-    if health_rows:
-        health = health_rows[0]
-    else:
-        prev_rows = get(
+    reads = gather_reads({
+        "trend": (
             "daily_health",
-            params={
+            {
                 "user_id": f"eq.{user_id}",
-                "plan_date": f"lt.{plan_date}",
+                "plan_date": f"lte.{plan_date}",
                 "order": "plan_date.desc",
-                "limit": 1
+                "limit": 30
             }
-        )
-
-        if prev_rows:
-            prev = prev_rows[0]
-
-            health = {
-                "goal": prev.get("goal"),
-                "height": prev.get("height"),
-                "weight": prev.get("weight")
+        ),
+        "habit_defs": (
+            "habit_master",
+            {"user_id": f"eq.{user_id}", "is_deleted": "is.false", "order": "position.asc"}
+        ),
+        "habit_entries": (
+            "habit_entries",
+            {
+                "user_id": f"eq.{user_id}",
+                "plan_date": f"eq.{plan_date}"
             }
-        else:
-            health = {}
+        ),
+    })
+    trend_rows = reads["trend"]
+
+    # ---------------------
+    # Load health
+    # ---------------------
+    if trend_rows and trend_rows[0]["plan_date"] == plan_date:
+        health = trend_rows[0]
+    elif trend_rows:
+        prev = trend_rows[0]
+
+        health = {
+            "goal": prev.get("goal"),
+            "height": prev.get("height"),
+            "weight": prev.get("weight")
+        }
+    else:
+        health = {}
     # ---------------------
     # Calculate BMI
     # ---------------------
@@ -2573,25 +2472,8 @@ def get_daily_health():
         pass
     
    
-    # ---------------------
-    # Load all habits (definitions)
-    # ---------------------
-    habit_defs = get(
-        "habit_master",
-        params={"user_id": f"eq.{user_id}","is_deleted": "is.false", "order": "position.asc"},
-        
-    )
-
-    # ---------------------
-    # Load entries for date
-    # ---------------------
-    habit_entries = get(
-        "habit_entries",
-        params={
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"eq.{plan_date}"
-        }
-    )
+    habit_defs = reads["habit_defs"]
+    habit_entries = reads["habit_entries"]
 
     entry_map = {h["habit_id"]: h["value"] for h in habit_entries}
 
@@ -2628,16 +2510,6 @@ def get_daily_health():
     # ---------------------
     # Weight trend (last 7 days)
     # ---------------------
-    trend_rows = get(
-        "daily_health",
-        params={
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"lte.{plan_date}",
-            "order": "plan_date.desc",
-            "limit": 30
-        }
-    )
-
     weight_map = {}
 
     for r in trend_rows:
@@ -2700,14 +2572,9 @@ def save_daily_health():
         "energy_level": int(data.get("energy_level")) if data.get("energy_level") else None,
         "notes": data.get("notes")
     }
-    print("HEIGHT RAW:", data.get("height"))
-    print("HEIGHT CLEAN:", clean_number(data.get("height")))
+    log_payload(logger, "Daily health payload: %s", payload)
     # 🔥 UPSERT instead of check-then-update
-    post(
-        "daily_health",
-        payload,
-        prefer="resolution=merge-duplicates"
-    )
+    upsert("daily_health", payload)
 
     return jsonify({"success": True})
 
@@ -2727,31 +2594,35 @@ def health_dashboard():
     # -----------------------
     # Load daily health
     # -----------------------
-    health_rows = get(
-        "daily_health",
-        params={
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"eq.{plan_date_str}"
-        }
-    )
+    reads = gather_reads({
+        "health": (
+            "daily_health",
+            {
+                "user_id": f"eq.{user_id}",
+                "plan_date": f"eq.{plan_date_str}"
+            }
+        ),
+        "habit_defs": (
+            "habit_master",
+            {"user_id": f"eq.{user_id}"}
+        ),
+        "habit_entries": (
+            "habit_entries",
+            {
+                "user_id": f"eq.{user_id}",
+                "plan_date": f"eq.{plan_date_str}"
+            }
+        ),
+    })
 
+    health_rows = reads["health"]
     health = health_rows[0] if health_rows else {}
 
     # -----------------------
     # Load habits dynamically
     # -----------------------
-    habit_defs = get(
-        "habit_master",
-        params={"user_id": f"eq.{user_id}"}
-    )
-
-    habit_entries = get(
-        "habit_entries",
-        params={
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"eq.{plan_date_str}"
-        }
-    )
+    habit_defs = reads["habit_defs"]
+    habit_entries = reads["habit_entries"]
 
     entry_map = {h["habit_id"]: h["value"] for h in habit_entries}
 
@@ -2796,20 +2667,37 @@ def save_habit_value():
     if not habit_id or not plan_date:
         return jsonify({"error": "Missing data"}), 400
 
-    post(
-        "habit_entries?on_conflict=user_id,habit_id,plan_date",
+    upsert(
+        "habit_entries",
         {
             "user_id": user_id,
             "habit_id": habit_id,
             "plan_date": plan_date,
             "value": value
         },
-        prefer="resolution=merge-duplicates"
     )
 
+    refresh_habit_score(user_id, plan_date)
+
     return jsonify({"success": True})
 
 
+def refresh_habit_score(user_id, plan_date=None):
+    """
+    Keep habit_daily_scores (and the cached streak) in step with a
+    habit write; plan_date defaults to today.
+    """
+    if plan_date is None:
+        plan_date = datetime.now(IST).date().isoformat()
+
+    try:
+        score = refresh_daily_score(user_id, plan_date)
+        record_day_score(user_id, score)
+    except Exception as e:
+        logger.warning(f"Habit score refresh failed: {e}")
+        clear_streak_cache(user_id)
+
+
 def clean_number(val):
     return float(val) if val not in ("", None) else None
 def normalize_category(name):
@@ -2845,17 +2733,7 @@ def add_reference():
     # ---------------------------------
     # Auto-create missing tags
     # ---------------------------------
-    for tag in tags:
-        existing = get("tags", {
-            "user_id": f"eq.{user_id}",
-            "name": f"eq.{tag}"
-        })
-
-        if not existing:
-            post("tags", {
-                "user_id": user_id,
-                "name": tag
-            })
+    process_tags(user_id, tags)
 
     # ---------------------------------
     # Category Handling
@@ -2909,6 +2787,8 @@ def add_reference():
 
     raw_description = data.get("description") or ""
 
+    import bleach
+
     clean_description = bleach.clean(
         raw_description,
         tags=ALLOWED_TAGS,
@@ -2934,9 +2814,7 @@ def list_references():
     user_id = session["user_id"]
     tag = request.args.get("tag", "").strip().lower()
     category = request.args.get("category", "").strip()
-    print("🔥 DEBUG /references")
-    print("Query Params → tag:", tag)
-    print("Query Params → category:", category)
+    logger.debug("/references → tag=%s category=%s", tag, category)
     params = {
         "user_id": f"eq.{user_id}",
         "order": "created_at.desc"
@@ -2982,25 +2860,15 @@ def search_references():
     return jsonify({"results": rows})
 
 def process_tags(user_id, tag_list):
-    processed_tags = []
-
-    for tag in tag_list:
-        tag = tag.strip().lower()
-
-        # check if exists
-        existing = get("tags", {
-            "user_id": f"eq.{user_id}",
-            "name": f"eq.{tag}"
-        })
+    processed_tags = [tag.strip().lower() for tag in tag_list]
 
-        if existing:
-            processed_tags.append(tag)
-        else:
-            post("tags", {
-                "user_id": user_id,
-                "name": tag
-            })
-            processed_tags.append(tag)
+    # One idempotent insert for the whole list (existing tags untouched)
+    rows = [
+        {"user_id": user_id, "name": tag}
+        for tag in dict.fromkeys(processed_tags)
+    ]
+    if rows:
+        upsert("tags", rows, ignore_duplicates=True)
 
     return processed_tags
 
@@ -3132,6 +3000,8 @@ def fetch_metadata():
 
     try:
         # Always fetch page title
+        from bs4 import BeautifulSoup
+
         page = requests.get(url, timeout=5)
         soup = BeautifulSoup(page.text, "html.parser")
         title = soup.title.string.strip() if soup.title else None
@@ -3178,7 +3048,7 @@ def fetch_metadata():
 def get_tags_with_counts():
 
     user_id = session["user_id"]
-    print("🔥 DEBUG /references/tags called")
+    logger.debug("/references/tags called")
     rows = get("reference_links", {
         "user_id": f"eq.{user_id}"
     })
@@ -3249,11 +3119,7 @@ def list_references_api():
     # 3️⃣ Attach combined AND logic
     if and_conditions:
         filters["and"] = f"({','.join(and_conditions)})"
-    print("🔥 DEBUG /references/list")
-    print("Incoming → tags:", tags)
-    print("Incoming → search:", search)
-    print("Incoming → sort:", sort)
-    print("Final filters →", filters)
+    log_payload(logger, "/references/list filters → %s", filters)
     rows = get("reference_links", filters)
 
     return jsonify({
@@ -3292,22 +3158,23 @@ def ai_generate_groq():
         - Only raw JSON
         """
 
-    response = requests.post(
-        "https://api.groq.com/openai/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json",
-            
-        },
-        json={
-            "model": "llama-3.1-8b-instant",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": query}
-            ],
-            "temperature": 0.3
-        }
-    )
+    with timed("ai"):
+        response = requests.post(
+            "https://api.groq.com/openai/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json",
+                
+            },
+            json={
+                "model": "llama-3.1-8b-instant",
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": query}
+                ],
+                "temperature": 0.3
+            }
+        )
 
     if response.status_code != 200:
         return jsonify({"error": "Groq failed"}), 500
@@ -3332,96 +3199,96 @@ def ai_generate_groq():
     structured["category"] = structured.get("category") or "Learning"
 
     return jsonify(structured)
-def insert_event(user_id, data, force=False):
-    if data["end_time"] <= data["start_time"]:
-        return {"error": "Invalid time range"}, 400
-
-    conflicts = get_conflicts(
-        user_id,
-        data["plan_date"],
-        data["start_time"],
-        data["end_time"]
-    )
-
-    if conflicts and not force:
-        return {
-            "conflict": True,
-            "conflicting_events": conflicts
-        }, 409
-
-    response1 = post("daily_events", {
-        "user_id": user_id,
-        "plan_date": data["plan_date"],
-        "start_time": data["start_time"],
-        "end_time": data["end_time"],
-        "title": data["title"],
-        "description": data.get("description", "")
-    })
-
-    created_row = response1[0] if response1 else None
-
-    # 🔥 GOOGLE AUTO SYNC HERE
-    if created_row:
-        try:
-            google_id = insert_google_event(created_row)
-
-            if google_id:
-                update(
-                    "daily_events",
-                    params={"id": f"eq.{created_row['id']}"},
-                    json={"google_event_id": google_id}
-                )
-        except Exception as e:
-            print("Google sync failed:", e)
-
-    return {"success": True}, 200
-
 @app.post("/api/v2/smart-create")
+@login_required
 def smart_create():
+    """
+    Pipeline: parse every line → one conflict pass (one read per date)
+    → one bulk insert → Google sync in the background. Returns one
+    result per non-empty line.
+    """
     data = request.json or {}
 
     text = data.get("text", "").strip()
     date = safe_date_from_string(data.get("date"))
+    user_id = session["user_id"]
 
-    created = []
-    failed = []
-
+    # 1️⃣ Parse all lines up front
+    results = []
     for raw_line in text.splitlines():
         line = raw_line.strip()
         if not line:
             continue
 
         try:
-            parsed = parse_planner_input(line, date)
+            parsed = parse_planner_line(line, date)
+        except Exception as e:
+            results.append({"line": raw_line, "error": str(e)})
+            continue
 
-            payload = {
+        results.append({
+            "line": raw_line,
+            "event": {
                 "plan_date": str(parsed["date"]),
                 "start_time": parsed["start"].strftime("%H:%M"),
                 "end_time": parsed["end"].strftime("%H:%M"),
                 "title": parsed["title"],
-            }
-            user_id = session["user_id"]
-            result, status = insert_event(user_id, payload)
+            },
+        })
 
-            if status == 200:
-                created.append(payload)
-            else:
-                failed.append({
-                    "line": raw_line,
-                    "error": result
-                })
+    # 2️⃣ Conflicts in one pass – stored events + earlier lines of the batch
+    indexes = EventIndexes(user_id)
+    accepted = []
 
-        except Exception as e:
-            failed.append({
-                "line": raw_line,
-                "error": str(e)
-            })
+    for r in results:
+        event = r.get("event")
+        if event is None:
+            continue
+
+        if event["end_time"] <= event["start_time"]:
+            r["error"] = {"error": "Invalid time range"}
+            continue
+
+        index = indexes[event["plan_date"]]
+        conflicts = index.conflicts(event["start_time"], event["end_time"])
+        if conflicts:
+            r["error"] = {"conflict": True, "conflicting_events": conflicts}
+            continue
+
+        index.add(event)
+        accepted.append(r)
+
+    # 3️⃣ One bulk insert
+    if accepted:
+        try:
+            rows = post("daily_events", [
+                {"user_id": user_id, "description": "",
+                 "google_sync_status": google_sync.PENDING, **r["event"]}
+                for r in accepted
+            ])
+        except requests.RequestException as e:
+            logger.warning(f"Smart create insert failed: {e}")
+            for r in accepted:
+                r["error"] = str(e)
+            rows = []
+
+        # 4️⃣ Google sync for the batch via the outbox
+        google_sync.enqueue([
+            google_sync.outbox_row(user_id, row["id"], "create") for row in rows
+        ])
+
+    failed = []
+    for r in results:
+        r["created"] = "error" not in r
+        if not r["created"]:
+            failed.append({"line": r["line"], "error": r["error"]})
 
     return jsonify({
         "status": "ok",
-        "created_count": len(created),
+        "created_count": len(results) - len(failed),
         "failed_count": len(failed),
-        "failed": failed
+        "failed": failed,
+        "results": results
     })
 
 @app.route("/ping")
@@ -3429,6 +3296,8 @@ def ping():
     return "OK", 200
 @app.route('/google-login')
 def google_login():
+    from google_auth_oauthlib.flow import Flow
+
     flow = Flow.from_client_config(
     {
         "web": {
@@ -3458,11 +3327,13 @@ def credentials_to_dict(credentials):
         "token_uri": credentials.token_uri,
         "client_id": credentials.client_id,
         "client_secret": credentials.client_secret,
-        "scopes": credentials.scopes
+        "scopes": credentials.scopes,
+        "expiry": credentials.expiry.isoformat() + "Z" if credentials.expiry else None
     }
 @app.route('/oauth2callback')
 @login_required
 def oauth2callback():
+    from google_auth_oauthlib.flow import Flow
 
     flow = Flow.from_client_config(
         {
@@ -3478,115 +3349,30 @@ def oauth2callback():
         redirect_uri=url_for("oauth2callback", _external=True)
     )
 
-    flow.fetch_token(authorization_response=request.url)
+    with timed("google"):
+        flow.fetch_token(authorization_response=request.url)
     credentials = flow.credentials
 
     creds_dict = credentials_to_dict(credentials)
     user_id = session["user_id"]
 
-    # 🔥 MANUAL UPSERT (since you don't use supabase upsert)
-    existing = get(
+    upsert(
         "user_google_tokens",
-        {"user_id": f"eq.{user_id}"}
+        {
+            "user_id": user_id,
+            "access_token": creds_dict["token"],
+            "refresh_token": creds_dict["refresh_token"],
+            "token_uri": creds_dict["token_uri"],
+            "client_id": creds_dict["client_id"],
+            "client_secret": creds_dict["client_secret"],
+            "scopes": ",".join(creds_dict["scopes"]),
+            "expiry": creds_dict["expiry"]
+        }
     )
-
-    if existing:
-        update(
-            "user_google_tokens",
-            params={"user_id": f"eq.{user_id}"},
-            json={
-                "access_token": creds_dict["token"],
-                "refresh_token": creds_dict["refresh_token"],
-                "token_uri": creds_dict["token_uri"],
-                "client_id": creds_dict["client_id"],
-                "client_secret": creds_dict["client_secret"],
-                "scopes": ",".join(creds_dict["scopes"])
-            }
-        )
-    else:
-        post(
-            "user_google_tokens",
-            {
-                "user_id": user_id,
-                "access_token": creds_dict["token"],
-                "refresh_token": creds_dict["refresh_token"],
-                "token_uri": creds_dict["token_uri"],
-                "client_id": creds_dict["client_id"],
-                "client_secret": creds_dict["client_secret"],
-                "scopes": ",".join(creds_dict["scopes"])
-            }
-        )
+    invalidate_calendar(user_id)
 
     return redirect("/planner-v2")
 
-def insert_google_event(event_row):
-    print("🔥 GOOGLE INSERT FUNCTION CALLED")
-    user_id = session.get("user_id")
-    if not user_id:
-      return None
-    user_id = session["user_id"]  # session.get("user_id") or hardcoded for testing
-    print("USER ID:", session.get("user_id"))
-    rows = get(
-        "user_google_tokens",
-        {"user_id": f"eq.{user_id}"}
-    )
-
-    if not rows:
-        return None
-
-    row = rows[0]
-
-    credentials = Credentials(
-        token=row["access_token"],
-        refresh_token=row["refresh_token"],
-        token_uri=row["token_uri"],
-        client_id=row["client_id"],
-        client_secret=row["client_secret"],
-        scopes=row["scopes"].split(",")
-    )
-
-    if credentials.expired and credentials.refresh_token:
-        credentials.refresh(Request())
-
-        update(
-            "user_google_tokens",
-            params={"user_id": f"eq.{user_id}"},
-            json={
-                "access_token": credentials.token,
-                "updated_at": datetime.utcnow().isoformat()
-            }
-        )
-
-    service = build("calendar", "v3", credentials=credentials)
-
-    start_iso = build_google_datetime(event_row["plan_date"], event_row["start_time"])
-    end_iso = build_google_datetime(event_row["plan_date"], event_row["end_time"])
-
-    event_body = {
-        "summary": event_row["title"],
-        "description": event_row.get("description", ""),
-        "start": {
-            "dateTime": start_iso,
-            "timeZone": "Asia/Kolkata"
-        },
-        "end": {
-            "dateTime": end_iso,
-            "timeZone": "Asia/Kolkata"
-        },
-        "reminders": {
-            "useDefault": False,
-            "overrides": [
-                {"method": "popup", "minutes": 10}
-            ]
-        }
-    }
-
-    created = service.events().insert(
-        calendarId="primary",
-        body=event_body
-    ).execute()
-
-    return created.get("id")
 @app.route("/api/v2/weekly-health")
 @login_required
 def weekly_health():
@@ -3595,65 +3381,15 @@ def weekly_health():
     today = datetime.now(IST).date()
     start = today - timedelta(days=6)
 
-    rows = get(
-        "habit_entries",
-        {
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"gte.{start.isoformat()}",
-        }
-    )
-
-    habit_defs = get(
-        "habit_master",
-        {
-            "user_id": f"eq.{user_id}",
-            "is_deleted": "is.false"
-        }
-    )
-
-    total = len(habit_defs)
-
-    date_map = {}
-    for r in rows:
-        date_map.setdefault(r["plan_date"], []).append(r)
-
-    percentages = []
-
-    for i in range(7):
-        day = (start + timedelta(days=i)).isoformat()
-        entries = date_map.get(day, [])
+    # Rollup rows + the week's raw entries (best habit needs per-habit
+    # totals), fetched together
+    scores, matrix = load_scores_and_matrix(user_id, start)
 
-        completed = 0
-
-        for e in entries:
-            habit_map = {h["id"]: h for h in habit_defs}
-            habit = habit_map.get(e["habit_id"])
-            if not habit:
-                continue
-
-            goal = float(habit.get("goal") or 0)
-            value = float(e.get("value") or 0)
-
-            if goal > 0 and value >= goal:
-                completed += 1
-
-        percent = round((completed / total) * 100) if total else 0
-        percentages.append(percent)
+    percentages = score_series(scores, start, 7)
 
     avg = round(sum(percentages) / len(percentages)) if percentages else 0
 
-    # Best habit
-    habit_totals = {}
-    for r in rows:
-        habit_totals[r["habit_id"]] = habit_totals.get(r["habit_id"], 0) + float(r["value"] or 0)
-
-    best_habit_id = max(habit_totals, key=habit_totals.get) if habit_totals else None
-
-    best_name = None
-    if best_habit_id:
-        best = next((h for h in habit_defs if h["id"] == best_habit_id), None)
-        if best:
-            best_name = best["name"]
+    best_name = matrix.best_habit()
 
     return jsonify({
         "daily": percentages,
@@ -3679,60 +3415,17 @@ def monthly_summary():
         }
     )
 
-    habit_rows = get(
-        "habit_entries",
-        {
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"gte.{start.isoformat()}"
-        }
-    )
-
     days = len({h["plan_date"] for h in health_rows})
     avg_height = round(
         sum(float(h.get("height") or 0) for h in health_rows) / len(health_rows),
         1
     ) if health_rows else 0
 
-    habit_defs = get(
-        "habit_master",
-        {
-            "user_id": f"eq.{user_id}",
-            "is_deleted": "is.false"
-        }
-    )
-
-    total_habits = len(habit_defs)
-    habit_map = {h["id"]: h for h in habit_defs}
-
-    date_map = {}
-    for r in habit_rows:
-        date_map.setdefault(r["plan_date"], []).append(r)
-
     from calendar import monthrange
     num_days = monthrange(today.year, today.month)[1]
 
-    percents = []
-
-    for d in range(1, num_days + 1):
-
-        day = today.replace(day=d).isoformat()
-        entries = date_map.get(day, [])
-
-        completed = 0
-
-        for e in entries:
-            habit = habit_map.get(e["habit_id"])
-            if not habit:
-                continue
-
-            goal = float(habit.get("goal") or 0)
-            value = float(e.get("value") or 0)
-
-            if goal > 0 and value >= goal:
-                completed += 1
-
-        percent = round((completed / total_habits) * 100) if total_habits else 0
-        percents.append(percent)
+    scores = load_daily_scores(user_id, start)
+    percents = score_series(scores, start, num_days)
 
     avg_percent = round(sum(percents) / len(percents)) if percents else 0
     weights = [float(h.get("weight") or 0) for h in health_rows if h.get("weight")]
@@ -3754,48 +3447,8 @@ def heatmap():
     today = datetime.now(IST).date()
     start = today - timedelta(days=365)
 
-    rows = get(
-        "habit_entries",
-        {
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"gte.{start.isoformat()}"
-        }
-    )
-
-    habit_defs = get(
-        "habit_master",
-        {
-            "user_id": f"eq.{user_id}",
-            "is_deleted": "is.false"
-        }
-    )
-    total = len(habit_defs)
-
-    date_map = {}
-
-    for r in rows:
-        date_map.setdefault(r["plan_date"], []).append(r)
-
-    heat = {}
-
-    habit_map = {h["id"]: h for h in habit_defs}
-
-    for day, entries in date_map.items():
-        completed = 0
-
-        for e in entries:
-            habit = habit_map.get(e["habit_id"])
-            if not habit:
-                continue
-
-            goal = float(habit.get("goal") or 0)
-            value = float(e.get("value") or 0)
-
-            if goal > 0 and value >= goal:
-                completed += 1
-
-        percent = round((completed / total) * 100) if total else 0
-        heat[day] = percent
+    # 📊 Rollup rows (one per day) instead of a year of raw entries
+    heat = load_daily_scores(user_id, start)
 
     return jsonify(heat)       
 @app.route("/api/habits/add", methods=["POST"])
@@ -3833,6 +3486,9 @@ def add_habit():
 
     habit = inserted[0]
 
+    # 📊 One more habit → today's total changes
+    refresh_habit_score(user_id)
+
     return jsonify({
         "id": habit["id"],
         "name": habit["name"],
@@ -3853,6 +3509,8 @@ def delete_habit():
         json={"is_deleted": True}
     )
 
+    refresh_habit_score(session["user_id"])
+
     return jsonify({"success": True})
 
 @app.route("/api/habits/update", methods=["POST"])
@@ -3870,6 +3528,8 @@ def update_habit():
         }
     )
 
+    refresh_habit_score(session["user_id"])
+
     return jsonify({"success": True})
 
 @app.route("/api/habits/reorder", methods=["POST"])
@@ -0,0 +1,85 @@
+"""
+Throughput of the smart planner parser on a synthetic corpus.
+
+    python bench_parser.py --lines 20000
+
+The corpus mixes the shapes people actually type into the planner:
+"@9am", "from 9:30 to 11", leading "9-10" and "9.30-10.30" shorthands,
+relative and explicit dates, Q1–Q4, $priority, %category and #tags.
+The report gives µs per line for parse_planner_input (one line at a
+time) and for parse_smart_block (the whole corpus as one save_day
+block).
+"""
+import argparse
+import random
+import time
+from datetime import date
+
+from services.planner_service import parse_smart_block
+from utils.planner_parser import parse_planner_input
+
+TASKS = (
+    "Standup", "Review Q4 report", "Call mom", "Gym", "Write design doc",
+    "Pay electricity bill", "1:1 with Priya", "Deploy hotfix", "Read 20 pages",
+    "Plan sprint", "Groceries", "Dentist appointment", "Team lunch",
+)
+TIMES = (
+    "@9am", "@ 6:30 am", "@7pm", "@14:00", "from 9 to 10", "@9am to 10:30am",
+    "from 7 am to 8 am", "from 9:30 to 11", "@10.15", "at 16:45",
+)
+LEADING = ("9", "9-10", "9.30-10.30", "14-15")
+DATES = ("", "", "", "tomorrow", "next monday", "on 15Feb", "on 3/04", "on 21st Mar")
+EXTRAS = ("", "", "Q1", "Q2", "Q3", "$High", "$critical", "%Health", "%Finance",
+          "#work", "#deep #focus", "$Low %Personal #errand")
+
+
+def corpus(n, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        task = rng.choice(TASKS)
+        if rng.random() < 0.2:
+            line = f"{rng.choice(LEADING)} {task}"
+        else:
+            line = f"{task} {rng.choice(TIMES)}"
+        parts = [line, rng.choice(DATES), rng.choice(EXTRAS)]
+        lines.append(" ".join(p for p in parts if p))
+    return lines
+
+
+def per_line(fn, lines):
+    started = time.perf_counter()
+    for line in lines:
+        try:
+            fn(line)
+        except ValueError:
+            pass
+    return (time.perf_counter() - started) / len(lines)
+
+
+def bench(n=20000):
+    """
+    {"parse_planner_input": µs/line, "parse_smart_block": µs/line}
+    """
+    lines = corpus(n)
+    day = date(2026, 1, 11)
+
+    single = per_line(lambda line: parse_planner_input(line, day, leading=True), lines)
+
+    started = time.perf_counter()
+    parse_smart_block("\n".join(lines), day)
+    block = (time.perf_counter() - started) / len(lines)
+
+    return {"parse_planner_input": single * 1e6, "parse_smart_block": block * 1e6}
+
+
+if __name__ == "__main__":
+    import logging
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    for name, us in bench(args.lines).items():
+        print(f"{name:<22}{us:>8.1f} µs/line  ({1e6 / us:,.0f} lines/s)")
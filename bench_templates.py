@@ -0,0 +1,95 @@
+"""
+Per-render CPU of the inline page templates, string vs compiled.
+
+    python bench_templates.py --renders 300
+
+Each page is requested once against postgrest_fake (loadtest demo
+data) to capture its real template context. That context is then
+rendered the old way, render_template_string (parse + compile + render
+every time), and the new way, a template registered by
+inline_templates and compiled once. The report gives CPU µs per render
+(time.process_time) for both.
+"""
+import argparse
+import logging
+import time
+from datetime import date
+
+from flask import template_rendered
+
+import supabase_async
+import supabase_client
+from inline_templates import INLINE_TEMPLATES
+from loadtest import USER, demo_tables
+from postgrest_fake import FakePostgrest
+
+
+def capture_contexts(app, today):
+    """
+    {template name: context} for one request to each inline page.
+    """
+    fake = FakePostgrest(demo_tables(today))
+    previous = supabase_client._session
+    supabase_client._session = fake.session()
+    supabase_async.use_transport(fake.httpx_transport())
+
+    captured = {}
+
+    def on_render(sender, template, context, **extra):
+        if template.name in INLINE_TEMPLATES:
+            captured[template.name] = dict(context)
+
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s["user_id"] = USER
+        s["authenticated"] = True
+
+    day = f"year={today.year}&month={today.month}&day={today.day}"
+    with template_rendered.connected_to(on_render, app):
+        for url in (f"/?{day}", f"/todo?{day}", f"/summary?date={today}", "/login"):
+            client.get(url)
+
+    supabase_client._session = previous
+    supabase_async.use_transport(None)
+    return captured
+
+
+def cpu_per_render(fn, renders):
+    started = time.process_time()
+    for _ in range(renders):
+        fn()
+    return (time.process_time() - started) / renders
+
+
+def bench(app, renders=200, today=None):
+    """
+    {template name: (string µs, compiled µs)} per render.
+    """
+    env = app.jinja_env
+    results = {}
+
+    for name, context in capture_contexts(app, today or date.today()).items():
+        source = INLINE_TEMPLATES[name]
+        with app.test_request_context():
+            before = cpu_per_render(
+                lambda: env.from_string(source).render(context), renders
+            )
+            after = cpu_per_render(
+                lambda: env.get_template(name).render(context), renders
+            )
+        results[name] = (before * 1e6, after * 1e6)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--renders", type=int, default=200)
+    args = parser.parse_args()
+
+    from app import app
+    logging.getLogger("daily_plan").setLevel(logging.WARNING)
+
+    print(f"{'template':<24}{'string µs':>12}{'compiled µs':>14}{'speedup':>10}")
+    for name, (before, after) in sorted(bench(app, args.renders).items()):
+        print(f"{name:<24}{before:>12.0f}{after:>14.0f}{before / after:>9.1f}x")
@@ -0,0 +1,171 @@
+import json
+import re
+import threading
+import uuid
+from collections import namedtuple
+from email.parser import Parser
+from urllib.parse import urlsplit
+
+# ==========================================================
+# GOOGLE CALENDAR FAKE – in-process stand-in for Calendar v3
+# ==========================================================
+# Serves the events endpoints the app uses:
+#   POST   …/calendars/<cal>/events          → insert
+#   GET    …/calendars/<cal>/events[/<id>]   → list / get
+#   PUT    …/calendars/<cal>/events/<id>     → update
+#   PATCH  …/calendars/<cal>/events/<id>     → patch
+#   DELETE …/calendars/<cal>/events/<id>     → delete
+#   POST   /batch/calendar/v3                → multipart batch of the above
+#
+# Plug it in with google_calendar.use_http(fake.http); every request
+# (each part of a batch too) is recorded in .calls, and each batch
+# POST in .batches. fail_next(503, …) makes the next event requests
+# fail with those statuses.
+
+Call = namedtuple("Call", "method calendar event_id status")
+
+EVENTS_PATH = re.compile(r"^/calendar/v3/calendars/([^/]+)/events(?:/([^/]+))?$")
+BATCH_PATH = "/batch/calendar/v3"
+
+REASONS = {200: "OK", 204: "No Content", 404: "Not Found"}
+
+
+class FakeCalendar:
+    def __init__(self):
+        self.events = {}   # calendar id → {event id → event}
+        self.calls = []
+        self.batches = []
+        self.failures = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def call_count(self):
+        return len(self.calls)
+
+    def fail_next(self, *statuses):
+        self.failures.extend(statuses)
+
+    def calendar(self, calendar_id="primary"):
+        return self.events.setdefault(calendar_id, {})
+
+    def _new_id(self):
+        value = f"evt{self._next_id:06d}"
+        self._next_id += 1
+        return value
+
+    def _serve(self, method, calendar_id, event_id, payload):
+        events = self.calendar(calendar_id)
+
+        if event_id is None:
+            if method == "POST":
+                event = dict(payload, id=self._new_id(), status="confirmed")
+                events[event["id"]] = event
+                return 200, event
+            if method == "GET":
+                return 200, {"kind": "calendar#events", "items": list(events.values())}
+            return 405, None
+
+        if event_id not in events:
+            return 404, None
+
+        if method == "GET":
+            return 200, events[event_id]
+        if method == "PUT":
+            events[event_id] = dict(payload, id=event_id, status="confirmed")
+            return 200, events[event_id]
+        if method == "PATCH":
+            events[event_id].update(payload)
+            return 200, events[event_id]
+        if method == "DELETE":
+            del events[event_id]
+            return 204, None
+        return 405, None
+
+    def handle(self, method, uri, body=None):
+        """
+        Serve one request → (status, body bytes).
+        """
+        m = EVENTS_PATH.match(urlsplit(uri).path)
+        if isinstance(body, bytes):
+            body = body.decode()
+        payload = json.loads(body) if body else {}
+
+        with self._lock:
+            if m is None:
+                status, data = 404, None
+            elif self.failures:
+                status, data = self.failures.pop(0), None
+            else:
+                status, data = self._serve(method, m.group(1), m.group(2), payload)
+            self.calls.append(Call(method, m and m.group(1), m and m.group(2), status))
+
+        if status >= 400:
+            data = {"error": {"code": status, "message": "fake calendar error"}}
+        return status, json.dumps(data).encode() if data is not None else b""
+
+    def handle_batch(self, content_type, body):
+        """
+        Serve a multipart/mixed batch → (content type, body bytes).
+        """
+        if isinstance(body, bytes):
+            body = body.decode()
+        message = Parser().parsestr(f"Content-Type: {content_type}\r\n\r\n{body}")
+        self.batches.append(len(message.get_payload()))
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        out = []
+
+        for part in message.get_payload():
+            request_line, _, rest = part.get_payload().partition("\n")
+            method, path, _ = request_line.split(" ", 2)
+            _, _, part_body = rest.replace("\r\n", "\n").partition("\n\n")
+
+            status, data = self.handle(method, path, part_body.strip() or None)
+
+            content_id = part["Content-ID"].strip("<>")
+            out.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+                "Content-Type: application/json\r\n\r\n"
+                f"{data.decode()}\r\n"
+            )
+        out.append(f"--{boundary}--")
+
+        return f"multipart/mixed; boundary={boundary}", "".join(out).encode()
+
+    # -----------------------------
+    # Client adapter
+    # -----------------------------
+    def http(self):
+        """
+        httplib2.Http stand-in (factory for google_calendar.use_http).
+        """
+        return _FakeHttp(self)
+
+
+class _FakeHttp:
+    timeout = None
+
+    def __init__(self, fake):
+        self.fake = fake
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        import httplib2
+
+        if urlsplit(uri).path == BATCH_PATH:
+            content_type, data = self.fake.handle_batch(
+                (headers or {}).get("content-type", ""), body
+            )
+            status = 200
+        else:
+            content_type = "application/json"
+            status, data = self.fake.handle(method, uri, body)
+
+        response = httplib2.Response({"status": status, "content-type": content_type})
+        return response, data
+
+    def close(self):
+        pass
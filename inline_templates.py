@@ -0,0 +1,50 @@
+import os
+
+from jinja2 import ChoiceLoader, DictLoader, FileSystemBytecodeCache
+
+from templates.login import LOGIN_TEMPLATE
+from templates.planner import PLANNER_TEMPLATE
+from templates.summary import SUMMARY_TEMPLATE
+from templates.todo import TODO_TEMPLATE
+
+# ==========================================================
+# INLINE TEMPLATES – compiled once, rendered by name
+# ==========================================================
+# The page templates kept as Python strings are registered in the
+# Jinja environment under these names, so render_template() compiles
+# each one once per process (Jinja's template cache) instead of
+# render_template_string() re-parsing it on every request. Compiled
+# bytecode also goes to an on-disk cache that every worker on the
+# host shares, so a freshly booted worker skips the compile step.
+
+PLANNER_PAGE = "inline/planner.html"
+TODO_PAGE = "inline/todo.html"
+SUMMARY_PAGE = "inline/summary.html"
+LOGIN_PAGE = "inline/login.html"
+
+INLINE_TEMPLATES = {
+    PLANNER_PAGE: PLANNER_TEMPLATE,
+    TODO_PAGE: TODO_TEMPLATE,
+    SUMMARY_PAGE: SUMMARY_TEMPLATE,
+    LOGIN_PAGE: LOGIN_TEMPLATE,
+}
+
+# Bytecode cache directory ("" → Jinja's per-user temp dir)
+JINJA_CACHE_DIR = os.environ.get("JINJA_CACHE_DIR", "")
+
+
+def init_app(app):
+    """
+    Must run before app.jinja_env is first used.
+    """
+    if JINJA_CACHE_DIR:
+        os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+
+    app.jinja_options = {
+        **app.jinja_options,
+        "bytecode_cache": FileSystemBytecodeCache(JINJA_CACHE_DIR or None),
+    }
+    app.jinja_loader = ChoiceLoader([
+        DictLoader(INLINE_TEMPLATES),
+        app.jinja_loader,
+    ])
@@ -0,0 +1,379 @@
+"""
+Load-test the app against a local PostgREST stand-in.
+
+    python loadtest.py --rtt 80 --rtt 300 --users 8 --duration 20
+
+Each --rtt value is one run: the stand-in (postgrest_fake served over
+HTTP) sleeps rtt ± jitter ms per backend call and fails error_rate of
+them with 503. The app runs in-process behind a threaded WSGI server
+gated to --threads concurrent requests, like gunicorn's gthread worker
+in start.sh (--workers 1 --threads 2). Virtual users replay weighted
+scenarios and the report shows p50/p95/p99 latency and throughput
+per route.
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from werkzeug.serving import make_server
+
+import supabase_client
+from postgrest_fake import FakePostgrest
+
+USER = "VenghateshS"
+
+
+# ==========================================================
+# BACKEND STAND-IN – FakePostgrest over HTTP + latency injection
+# ==========================================================
+class LatencyProfile:
+    def __init__(self, rtt_ms=80, jitter_ms=0, error_rate=0.0, seed=None):
+        self.rtt_ms = rtt_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """
+        (delay seconds, inject error?) for one backend call.
+        """
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+        return max(self.rtt_ms + jitter, 0) / 1000, failed
+
+
+def serve_backend(fake, profile, host="127.0.0.1", port=0):
+    """
+    Start the stand-in on a daemon thread; returns the server
+    (base URL → f"http://{host}:{server.server_port}").
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like Supabase
+
+        def _serve(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else None
+
+            delay, failed = profile.sample()
+            time.sleep(delay)
+
+            if failed:
+                status, data = 503, b'{"message": "injected failure"}'
+            else:
+                status, data = fake.handle(
+                    self.command, self.path, self.headers, body
+                )
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = _serve
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def demo_tables(today, days=60):
+    """
+    A plausible single-user dataset around today.
+    """
+    history = [(today - timedelta(days=i)).isoformat() for i in range(days)]
+
+    return {
+        "daily_slots": [
+            {"plan_date": today.isoformat(), "slot": s, "plan": f"Focus block {s}",
+             "status": "Nothing Planned", "start_time": None, "end_time": None}
+            for s in range(16, 40, 2)
+        ],
+        "daily_meta": [
+            {"user_id": USER, "plan_date": d, "habits": [], "reflection": "",
+             "untimed_tasks": []}
+            for d in history
+        ],
+        "recurring_slots": [],
+        "habit_master": [
+            {"id": h, "user_id": USER, "name": f"Habit {h}", "unit": "x",
+             "goal": 1, "position": h, "is_deleted": False}
+            for h in range(1, 9)
+        ],
+        "habit_entries": [
+            {"user_id": USER, "habit_id": h, "plan_date": d, "value": (h + i) % 3}
+            for i, d in enumerate(history) for h in range(1, 9)
+        ],
+        "habit_daily_scores": [
+            {"user_id": USER, "plan_date": d, "completed": 5, "total": 8, "percent": 62}
+            for d in history
+        ],
+        "daily_health": [
+            {"user_id": USER, "plan_date": d, "weight": 72, "height": 175, "goal": "fit"}
+            for d in history
+        ],
+        "projects": [
+            {"project_id": "p1", "user_id": USER, "name": "Home",
+             "default_sort": "smart", "is_archived": False},
+        ],
+        "project_tasks": [],
+        "todo_matrix": [
+            {"id": f"m{i}", "user_id": USER, "plan_date": today.isoformat(),
+             "task_text": f"Todo {i}", "quadrant": "do", "is_done": False,
+             "is_deleted": False, "project_id": "p1", "source_task_id": None}
+            for i in range(12)
+        ],
+    }
+
+
+# ==========================================================
+# APP SERVER – in-process, gated like gunicorn gthread
+# ==========================================================
+def serve_app(app, threads, host="127.0.0.1"):
+    """
+    Threaded WSGI server that lets at most `threads` requests run the
+    app at once (the rest queue, as on a gthread worker).
+    """
+    gate = threading.BoundedSemaphore(threads)
+
+    def gated(environ, start_response):
+        with gate:
+            return list(app(environ, start_response))
+
+    server = make_server(host, 0, gated, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ==========================================================
+# SCENARIOS
+# ==========================================================
+# Each scenario takes (http, base, today) and returns a list of
+# (route label, seconds, status) samples.
+
+def _timed(label, call):
+    started = time.perf_counter()
+    try:
+        status = call().status_code
+    except requests.RequestException:
+        status = 0
+    return label, time.perf_counter() - started, status
+
+
+def open_planner_day(http, base, today):
+    url = f"{base}/?year={today.year}&month={today.month}&day={today.day}"
+    return [_timed("GET /", lambda: http.get(url))]
+
+
+def todo_autosave_burst(http, base, today, edits=5):
+    samples = [
+        _timed("GET /todo", lambda: http.get(f"{base}/todo"))
+    ]
+    for i in range(edits):
+        payload = {
+            "id": f"m{i % 12}",
+            "plan_date": today.isoformat(),
+            "quadrant": "do",
+            "is_done": bool(i % 2),
+        }
+        samples.append(_timed(
+            "POST /todo/autosave",
+            lambda: http.post(f"{base}/todo/autosave", json=payload),
+        ))
+    return samples
+
+
+def habit_typing(http, base, today, keystrokes=6):
+    samples = []
+    for i in range(1, keystrokes + 1):
+        payload = {"habit_id": 1, "plan_date": today.isoformat(), "value": i * 500}
+        samples.append(_timed(
+            "POST /api/save-habit-value",
+            lambda: http.post(f"{base}/api/save-habit-value", json=payload),
+        ))
+    return samples
+
+
+def health_dashboard(http, base, today):
+    day = today.isoformat()
+    return [
+        _timed("GET /health", lambda: http.get(f"{base}/health?date={day}")),
+        _timed(
+            "GET /api/v2/daily-health",
+            lambda: http.get(f"{base}/api/v2/daily-health?date={day}"),
+        ),
+    ]
+
+
+SCENARIOS = {
+    "planner": (open_planner_day, 4),
+    "autosave": (todo_autosave_burst, 2),
+    "habits": (habit_typing, 2),
+    "health": (health_dashboard, 2),
+}
+
+
+# ==========================================================
+# RUNNER + REPORT
+# ==========================================================
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(values)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def summarize(samples, elapsed):
+    by_route = defaultdict(list)
+    errors = defaultdict(int)
+
+    for label, seconds, status in samples:
+        by_route[label].append(seconds)
+        if not 200 <= status < 400:
+            errors[label] += 1
+
+    report = {}
+    for label, times in sorted(by_route.items()):
+        times.sort()
+        report[label] = {
+            "count": len(times),
+            "errors": errors[label],
+            "p50_ms": round(percentile(times, 50) * 1000, 1),
+            "p95_ms": round(percentile(times, 95) * 1000, 1),
+            "p99_ms": round(percentile(times, 99) * 1000, 1),
+            "rps": round(len(times) / elapsed, 2) if elapsed else 0.0,
+        }
+    return report
+
+
+def _login(base, password):
+    http = requests.Session()
+    http.post(f"{base}/login", data={"password": password}, allow_redirects=False)
+    return http
+
+
+def run(app, profile, users=4, duration=10.0, threads=2, scenarios=None, password=None):
+    """
+    One load run → {route: {count, errors, p50_ms, p95_ms, p99_ms, rps}}.
+    """
+    from app import APP_PASSWORD
+    from services.streak_service import clear_streak_cache
+
+    today = date.today()
+    fake = FakePostgrest(demo_tables(today))
+    backend = serve_backend(fake, profile)
+    server = serve_app(app, threads)
+
+    base = f"http://127.0.0.1:{server.server_port}"
+    previous_url = supabase_client.SUPABASE_URL
+    supabase_client.SUPABASE_URL = f"http://127.0.0.1:{backend.server_port}"
+    clear_streak_cache()
+
+    chosen = scenarios or list(SCENARIOS)
+    weights = [SCENARIOS[name][1] for name in chosen]
+
+    samples = []
+    samples_lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def virtual_user(n):
+        rng = random.Random(n)
+        http = _login(base, password or APP_PASSWORD)
+        while time.perf_counter() < deadline:
+            name = rng.choices(chosen, weights)[0]
+            got = SCENARIOS[name][0](http, base, today)
+            with samples_lock:
+                samples.extend(got)
+
+    started = time.perf_counter()
+    workers = [
+        threading.Thread(target=virtual_user, args=(n,), daemon=True)
+        for n in range(users)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+
+    server.shutdown()
+    backend.shutdown()
+    supabase_client.SUPABASE_URL = previous_url
+
+    report = summarize(samples, elapsed)
+    report["_backend"] = {"calls": fake.call_count, "bytes": fake.bytes_out}
+    return report
+
+
+def format_report(title, report):
+    lines = [
+        title,
+        f"{'route':<30}{'count':>7}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>8}",
+    ]
+    for label, r in report.items():
+        if label.startswith("_"):
+            continue
+        lines.append(
+            f"{label:<30}{r['count']:>7}{r['errors']:>5}"
+            f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['rps']:>8}"
+        )
+    backend = report.get("_backend")
+    if backend:
+        lines.append(f"backend: {backend['calls']} calls, {backend['bytes']} bytes")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rtt", type=float, action="append",
+                        help="backend round-trip ms (repeat to compare)")
+    parser.add_argument("--jitter", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--json", action="store_true", help="print JSON instead of tables")
+    args = parser.parse_args()
+
+    from app import app
+    logging.getLogger("daily_plan").setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    results = {}
+    for rtt in args.rtt or [80]:
+        profile = LatencyProfile(rtt, args.jitter, args.error_rate, seed=1)
+        results[rtt] = run(
+            app, profile,
+            users=args.users,
+            duration=args.duration,
+            threads=args.threads,
+            scenarios=args.scenario,
+        )
+        if not args.json:
+            print(format_report(
+                f"\n== rtt {rtt:g}ms ±{args.jitter:g} | errors {args.error_rate:.0%} | "
+                f"{args.users} users | {args.threads} threads ==",
+                results[rtt],
+            ))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
@@ -1,31 +1,126 @@
 # logger.py
+import atexit
 import logging
+import os
+import queue
+import random
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# ==========================================================
+# LOGGING – queue-backed, rotating, level-gated
+# ==========================================================
+# Request threads only enqueue records (QueueHandler); one listener
+# thread does the stdout / file I/O. Records below the configured
+# levels are dropped before they are formatted or queued.
+#
+#   LOG_LEVEL           console level            (default INFO)
+#   LOG_FILE            rotating log file, "" = off (default app.log)
+#   LOG_FILE_LEVEL      file level               (default LOG_LEVEL)
+#   LOG_MAX_BYTES       rotate after this size   (default 5 MB)
+#   LOG_BACKUPS         rotated files kept       (default 3)
+#   LOG_PAYLOAD_CHARS   max chars per payload    (default 300)
+#   LOG_PAYLOAD_SAMPLE  share of payload lines kept, 0..1 (default 1)
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.environ.get("LOG_FILE", "app.log")
+LOG_FILE_LEVEL = os.environ.get("LOG_FILE_LEVEL", LOG_LEVEL).upper()
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_BACKUPS = int(os.environ.get("LOG_BACKUPS", "3"))
+LOG_PAYLOAD_CHARS = int(os.environ.get("LOG_PAYLOAD_CHARS", "300"))
+LOG_PAYLOAD_SAMPLE = float(os.environ.get("LOG_PAYLOAD_SAMPLE", "1"))
+
+# App logger + the __name__ loggers used by services/ and utils/
+APP_LOGGERS = ("daily_plan", "services", "utils")
+
+FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+_listener = None
+
+
+def _build_handlers():
+    formatter = logging.Formatter(FORMAT)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(LOG_LEVEL)
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    if LOG_FILE:
+        file_handler = RotatingFileHandler(
+            LOG_FILE,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUPS,
+            encoding="utf-8",
+            delay=True,
+        )
+        file_handler.setLevel(LOG_FILE_LEVEL)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    return handlers
+
 
 def setup_logger():
+    global _listener
     logger = logging.getLogger("daily_plan")
-    logger.setLevel(logging.DEBUG)
 
-    # Prevent duplicate handlers
-    if logger.handlers:
+    # Prevent duplicate pipelines
+    if _listener is not None:
         return logger
 
-    # Console handler (for local / Render logs)
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
+    handlers = _build_handlers()
+    level = min(h.level for h in handlers)
 
-    # File handler (optional but very useful)
-    file_handler = logging.FileHandler("app.log")
-    file_handler.setLevel(logging.DEBUG)
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
 
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-    )
+    queue_handler = QueueHandler(log_queue)
+    for name in APP_LOGGERS:
+        app_logger = logging.getLogger(name)
+        app_logger.setLevel(level)
+        app_logger.addHandler(queue_handler)
+        app_logger.propagate = False
 
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
+    return logger
 
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
 
-    return logger
+# -----------------------------
+# Payload helpers
+# -----------------------------
+class _Truncated:
+    """
+    Lazy str() of a payload, cut to LOG_PAYLOAD_CHARS (only evaluated
+    if the record is actually emitted).
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        text = str(self.value)
+        if len(text) <= LOG_PAYLOAD_CHARS:
+            return text
+        return f"{text[:LOG_PAYLOAD_CHARS]}… (+{len(text) - LOG_PAYLOAD_CHARS} chars)"
+
+    __repr__ = __str__
+
+
+def truncated(value):
+    return _Truncated(value)
+
+
+def log_payload(logger, msg, *args):
+    """
+    DEBUG line whose args are request/response payloads: skipped
+    unless DEBUG is on, sampled by LOG_PAYLOAD_SAMPLE, truncated.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if LOG_PAYLOAD_SAMPLE < 1 and random.random() >= LOG_PAYLOAD_SAMPLE:
+        return
+    logger.debug(msg, *(truncated(a) for a in args))
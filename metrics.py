@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, abort, g, has_request_context, request
+
+# ==========================================================
+# REQUEST METRICS – per-endpoint backend cost + /metrics
+# ==========================================================
+# Clients report each outbound call with record(); the request hooks
+# fold those into per-endpoint Prometheus histograms and a
+# Server-Timing header, so an N+1 shows up as a jump in
+# backend_calls_per_request for that endpoint.
+
+BACKENDS = ("supabase", "google", "ai")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CALL_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Optional bearer token for /metrics
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * len(self.buckets), 0.0, 0
+                ]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            items = sorted(self._series.items())
+
+            for label_values, (counts, total, count) in items:
+                base = ",".join(
+                    f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values)
+                )
+                sep = "," if base else ""
+                for bound, c in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {c}')
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{base}}} {total}")
+                lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Wall time per Flask request.",
+    DURATION_BUCKETS, ("endpoint", "method", "status"),
+)
+BACKEND_CALLS = Histogram(
+    "backend_calls_per_request",
+    "Outbound calls made while serving one request.",
+    CALL_BUCKETS, ("endpoint", "backend"),
+)
+BACKEND_SECONDS = Histogram(
+    "backend_seconds_per_request",
+    "Time spent waiting on a backend while serving one request.",
+    DURATION_BUCKETS, ("endpoint", "backend"),
+)
+SUPABASE_BYTES = Histogram(
+    "supabase_response_bytes_per_request",
+    "Supabase response bytes received while serving one request.",
+    BYTE_BUCKETS, ("endpoint",),
+)
+
+JOB_BACKEND_SECONDS = Histogram(
+    "job_backend_call_seconds",
+    "Duration of one backend call made by a background job.",
+    DURATION_BUCKETS, ("job", "backend"),
+)
+
+HISTOGRAMS = (
+    REQUEST_SECONDS, BACKEND_CALLS, BACKEND_SECONDS, SUPABASE_BYTES,
+    JOB_BACKEND_SECONDS,
+)
+
+# Other exposition sources (callables → list of lines), e.g. cache counters
+COLLECTORS = []
+
+
+def add_collector(fn):
+    COLLECTORS.append(fn)
+
+
+# -----------------------------
+# Client hooks
+# -----------------------------
+_record_lock = threading.Lock()
+
+
+def _request_totals():
+    if not has_request_context():
+        return None
+
+    totals = getattr(g, "_metrics", None)
+    if totals is None:
+        totals = g._metrics = {b: [0, 0.0, 0] for b in BACKENDS}
+    return totals
+
+
+def record(backend, seconds, nbytes=0, calls=1):
+    """
+    Add one (or `calls`) outbound call to the current request.
+    No-op outside a request.
+    """
+    totals = _request_totals()
+    if totals is None:
+        return
+
+    with _record_lock:
+        t = totals[backend]
+        t[0] += calls
+        t[1] += seconds
+        t[2] += nbytes
+
+
+@contextmanager
+def timed(backend):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(backend, time.perf_counter() - started)
+
+
+@contextmanager
+def timed_job(job, backend):
+    """
+    timed() for work outside a request (e.g. the Google sync worker):
+    each call is one JOB_BACKEND_SECONDS observation.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        JOB_BACKEND_SECONDS.observe(time.perf_counter() - started, job, backend)
+
+
+# -----------------------------
+# Flask wiring
+# -----------------------------
+def _before():
+    g._metrics_started = time.perf_counter()
+    _request_totals()
+
+
+def _after(response):
+    started = getattr(g, "_metrics_started", None)
+    if started is None or request.endpoint in ("static", "metrics"):
+        return response
+
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or "unknown"
+    totals = _request_totals()
+
+    REQUEST_SECONDS.observe(elapsed, endpoint, request.method, str(response.status_code))
+
+    timing = [f"app;dur={elapsed * 1000:.1f}"]
+    for backend in BACKENDS:
+        calls, seconds, nbytes = totals[backend]
+        BACKEND_CALLS.observe(calls, endpoint, backend)
+        BACKEND_SECONDS.observe(seconds, endpoint, backend)
+        if calls:
+            timing.append(f'{backend};dur={seconds * 1000:.1f};desc="{calls} calls"')
+
+    SUPABASE_BYTES.observe(totals["supabase"][2], endpoint)
+    response.headers["Server-Timing"] = ", ".join(timing)
+    return response
+
+
+def render_metrics():
+    lines = []
+    for h in HISTOGRAMS:
+        lines.extend(h.expose())
+    for collect in COLLECTORS:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+def metrics():
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        abort(401)
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    app.before_request(_before)
+    app.after_request(_after)
+    app.add_url_rule("/metrics", "metrics", metrics)
@@ -0,0 +1,491 @@
+import json
+import re
+import threading
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+from supabase_client import HEADERS, UNIQUE_KEYS
+
+# ==========================================================
+# POSTGREST FAKE – in-process stand-in for Supabase REST
+# ==========================================================
+# Implements the subset supabase_client / supabase_async use:
+#   filters   → eq neq lt lte gt gte in is like ilike cs (+ not.)
+#   logic     → or=(…) and=(…), nested or(…)/and(…)
+#   shaping   → select (incl. embedded table(cols)), order, limit, offset
+#   writes    → POST (on_conflict + Prefer resolution/return), PATCH, DELETE
+#
+# Every request is recorded in .calls so tests can assert how many
+# round-trips (and bytes) a route costs.
+
+Call = namedtuple("Call", "method table status bytes")
+
+# Generated keys for tables whose primary key is not "id"
+PRIMARY_KEYS = {
+    "projects": "project_id",
+    "project_tasks": "task_id",
+}
+
+# (table, embedded) → (local column, foreign column, one-to-many?)
+RELATIONS = {
+    ("todo_matrix", "projects"): ("project_id", "project_id", False),
+    ("project_tasks", "projects"): ("project_id", "project_id", False),
+    ("projects", "project_tasks"): ("project_id", "project_id", True),
+}
+
+_RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+# -----------------------------
+# Expression parsing
+# -----------------------------
+def _split_top(text):
+    """
+    Split on commas that are not inside (), {} or "…".
+    """
+    parts, buf, depth, quoted = [], [], 0, False
+
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch in "({":
+            depth += 1
+        elif not quoted and ch in ")}":
+            depth -= 1
+        elif ch == "," and not depth and not quoted:
+            parts.append("".join(buf))
+            buf = []
+            continue
+        buf.append(ch)
+
+    if buf:
+        parts.append("".join(buf))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _unwrap(text, left="(", right=")"):
+    text = text.strip()
+    if text.startswith(left) and text.endswith(right):
+        return text[1:-1]
+    return text
+
+
+def _literal(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _text(value):
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return str(value)
+
+
+def _compare(actual, value):
+    """
+    -1 / 0 / 1, or None when actual is NULL.
+    """
+    if actual is None:
+        return None
+
+    if isinstance(actual, (int, float)) and not isinstance(actual, bool):
+        try:
+            expected = float(value)
+            return (actual > expected) - (actual < expected)
+        except ValueError:
+            pass
+
+    actual = _text(actual)
+    return (actual > value) - (actual < value)
+
+
+def _like(actual, pattern, flags=0):
+    if actual is None:
+        return False
+    regex = "".join(
+        ".*" if ch in "%*" else "." if ch == "_" else re.escape(ch)
+        for ch in pattern
+    )
+    return re.fullmatch(regex, _text(actual), flags | re.DOTALL) is not None
+
+
+def _contains(actual, value):
+    if not isinstance(actual, list):
+        return False
+    wanted = [_literal(v) for v in _split_top(_unwrap(value, "{", "}"))]
+    have = {_text(a) for a in actual}
+    return all(w in have for w in wanted)
+
+
+def _is(actual, value):
+    return {"null": actual is None, "true": actual is True, "false": actual is False}[value]
+
+
+OPERATORS = {
+    "eq": lambda a, v: _compare(a, v) == 0,
+    "neq": lambda a, v: _compare(a, v) not in (0, None),
+    "lt": lambda a, v: _compare(a, v) == -1,
+    "lte": lambda a, v: _compare(a, v) in (-1, 0),
+    "gt": lambda a, v: _compare(a, v) == 1,
+    "gte": lambda a, v: _compare(a, v) in (0, 1),
+    "in": lambda a, v: any(
+        _compare(a, _literal(x)) == 0 for x in _split_top(_unwrap(v))
+    ),
+    "is": _is,
+    "like": lambda a, v: _like(a, v),
+    "ilike": lambda a, v: _like(a, v, re.IGNORECASE),
+    "cs": _contains,
+}
+
+
+def _condition(column, expr):
+    """
+    Predicate for "col=op.value" (optionally "not.op.value").
+    """
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+
+    op, _, value = expr.partition(".")
+    if op not in OPERATORS:
+        raise ValueError(f"unsupported operator: {op}")
+    check = OPERATORS[op]
+
+    return lambda row: check(row.get(column), value) != negate
+
+
+def _logic(kind, body):
+    """
+    Predicate for or=(…) / and=(…) bodies, nested or(…)/and(…) allowed.
+    """
+    preds = []
+
+    for item in _split_top(_unwrap(body)):
+        negate = item.startswith("not.")
+        if negate:
+            item = item[4:]
+
+        m = re.match(r"^(or|and)\((.*)\)$", item, re.DOTALL)
+        if m:
+            pred = _logic(m.group(1), f"({m.group(2)})")
+        else:
+            column, _, expr = item.partition(".")
+            pred = _condition(column, expr)
+
+        preds.append((lambda p, n: lambda row: p(row) != n)(pred, negate))
+
+    combine = any if kind == "or" else all
+    return lambda row: combine(p(row) for p in preds)
+
+
+def _order_key(spec):
+    parts = spec.split(".")
+    column = parts[0]
+    desc = "desc" in parts[1:]
+    nulls_last = "nullslast" in parts[1:] or (
+        not desc and "nullsfirst" not in parts[1:]
+    )
+    return column, desc, nulls_last
+
+
+# ==========================================================
+# FAKE
+# ==========================================================
+class FakePostgrest:
+    def __init__(self, tables=None):
+        self.tables = {
+            name: [dict(r) for r in rows] for name, rows in (tables or {}).items()
+        }
+        self.calls = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # Bookkeeping
+    # -----------------------------
+    def reset_calls(self):
+        with self._lock:
+            self.calls = []
+
+    @property
+    def call_count(self):
+        return len(self.calls)
+
+    @property
+    def bytes_out(self):
+        return sum(c.bytes for c in self.calls)
+
+    def rows(self, table):
+        return self.tables.setdefault(table, [])
+
+    # -----------------------------
+    # Query helpers
+    # -----------------------------
+    def _filters(self, params):
+        preds = []
+        for key, value in params:
+            if key in _RESERVED:
+                continue
+            if key in ("or", "and"):
+                preds.append(_logic(key, value))
+            else:
+                preds.append(_condition(key, value))
+        return lambda row: all(p(row) for p in preds)
+
+    def _project(self, table, row, select):
+        if not select or select.strip() == "*":
+            return dict(row)
+
+        out = {}
+        for item in _split_top(select):
+            m = re.match(r"^(?:(\w+):)?(\w+)\((.*)\)$", item, re.DOTALL)
+            if m:
+                alias, embedded, cols = m.groups()
+                out[alias or embedded] = self._embed(table, row, embedded, cols)
+                continue
+
+            if item == "*":
+                out.update(row)
+                continue
+
+            alias, _, column = item.rpartition(":")
+            column = column.split("::")[0]
+            out[alias or column] = row.get(column)
+
+        return out
+
+    def _embed(self, table, row, embedded, select):
+        local, foreign, many = RELATIONS[(table, embedded)]
+        matches = [
+            self._project(embedded, r, select)
+            for r in self.rows(embedded)
+            if r.get(foreign) is not None and r.get(foreign) == row.get(local)
+        ]
+        if many:
+            return matches
+        return matches[0] if matches else None
+
+    def _order(self, rows, order):
+        for spec in reversed(order.split(",")):
+            column, desc, nulls_last = _order_key(spec.strip())
+            null_rank = int(nulls_last) if not desc else int(not nulls_last)
+
+            def key(r, column=column, null_rank=null_rank):
+                v = r.get(column)
+                if v is None:
+                    return (null_rank, 0)
+                if isinstance(v, bool):
+                    v = int(v)
+                return (1 - null_rank, v)
+
+            rows.sort(key=key, reverse=desc)
+        return rows
+
+    def _new_id(self):
+        value = f"{self._next_id:08d}-0000-4000-8000-000000000000"
+        self._next_id += 1
+        return value
+
+    # -----------------------------
+    # Verbs
+    # -----------------------------
+    def _select(self, table, params):
+        q = dict(params)
+        match = self._filters(params)
+        rows = [r for r in self.rows(table) if match(r)]
+
+        if q.get("order"):
+            rows = self._order(rows, q["order"])
+
+        offset = int(q.get("offset") or 0)
+        rows = rows[offset:]
+        if q.get("limit") not in (None, ""):
+            rows = rows[:int(q["limit"])]
+
+        return [self._project(table, r, q.get("select")) for r in rows]
+
+    def _insert(self, table, params, payload, prefer):
+        q = dict(params)
+        rows = payload if isinstance(payload, list) else [payload]
+
+        # Like PostgREST: a bulk insert needs one key set across rows
+        # unless ?columns= names them (missing ones → NULL/default)
+        if q.get("columns"):
+            columns = q["columns"].split(",")
+            rows = [{c: r.get(c) for c in columns} for r in rows]
+        elif len({frozenset(r) for r in rows}) > 1:
+            raise ValueError("All object keys must match")
+
+        resolution = prefer.get("resolution")
+        keys = (
+            q.get("on_conflict")
+            or UNIQUE_KEYS.get(table)
+            or PRIMARY_KEYS.get(table, "id")
+        ).split(",")
+
+        stored = self.rows(table)
+        result = []
+
+        for row in rows:
+            row = dict(row)
+            existing = None
+
+            if all(row.get(k) is not None for k in keys):
+                existing = next(
+                    (
+                        r for r in stored
+                        if all(_text(r.get(k)) == _text(row.get(k)) for k in keys)
+                    ),
+                    None,
+                )
+
+            if existing is not None:
+                if resolution == "ignore-duplicates":
+                    continue
+                if resolution != "merge-duplicates":
+                    raise _Conflict(table, keys)
+                existing.update(row)
+                result.append(existing)
+                continue
+
+            row.setdefault("id", self._new_id())
+            pk = PRIMARY_KEYS.get(table)
+            if pk:
+                row.setdefault(pk, self._new_id())
+
+            stored.append(row)
+            result.append(row)
+
+        return result
+
+    def _update(self, table, params, payload):
+        match = self._filters(params)
+        rows = [r for r in self.rows(table) if match(r)]
+        for r in rows:
+            r.update(payload)
+        return rows
+
+    def _delete(self, table, params):
+        match = self._filters(params)
+        stored = self.rows(table)
+        removed = [r for r in stored if match(r)]
+        stored[:] = [r for r in stored if not match(r)]
+        return removed
+
+    def handle(self, method, url, headers=None, body=None):
+        """
+        Serve one request → (status, body bytes).
+        """
+        parts = urlsplit(url)
+        prefix = "/rest/v1/"
+        if not parts.path.startswith(prefix):
+            return 404, b'{"message": "not found"}'
+
+        table = parts.path[len(prefix):]
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        prefer = dict(
+            p.strip().partition("=")[::2]
+            for p in (headers or {}).get("Prefer", "").split(",")
+            if p.strip()
+        )
+        payload = json.loads(body) if body else None
+
+        with self._lock:
+            try:
+                if method == "GET":
+                    status, rows = 200, self._select(table, params)
+                elif method == "POST":
+                    status, rows = 201, self._insert(table, params, payload, prefer)
+                elif method == "PATCH":
+                    status, rows = 200, self._update(table, params, payload)
+                elif method == "DELETE":
+                    status, rows = 200, self._delete(table, params)
+                else:
+                    status, rows = 405, None
+            except _Conflict as e:
+                status, rows = 409, {"message": str(e)}
+            except (ValueError, KeyError) as e:
+                status, rows = 400, {"message": str(e)}
+
+            if method != "GET" and status < 300:
+                select = dict(params).get("select")
+                if prefer.get("return") == "representation":
+                    rows = [self._project(table, r, select) for r in rows]
+                else:
+                    status, rows = (201 if method == "POST" else 204), None
+
+            data = json.dumps(rows, default=str).encode() if rows is not None else b""
+            self.calls.append(Call(method, table, status, len(data)))
+
+        return status, data
+
+    # -----------------------------
+    # Client adapters
+    # -----------------------------
+    def session(self):
+        """
+        requests.Session whose HTTP(S) traffic is served by this fake
+        (drop-in for supabase_client._session).
+        """
+        s = requests.Session()
+        s.headers.update(HEADERS)
+        adapter = _RequestsAdapter(self)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        return s
+
+    def httpx_transport(self):
+        """
+        httpx transport for supabase_async.use_transport().
+        """
+        import httpx
+
+        def handler(request):
+            status, data = self.handle(
+                request.method, str(request.url), request.headers, request.content
+            )
+            return httpx.Response(
+                status, content=data, headers={"Content-Type": "application/json"}
+            )
+
+        return httpx.MockTransport(handler)
+
+
+class _Conflict(Exception):
+    def __init__(self, table, keys):
+        super().__init__(f"duplicate key on {table} ({','.join(keys)})")
+
+
+class _RequestsAdapter(BaseAdapter):
+    def __init__(self, fake):
+        super().__init__()
+        self.fake = fake
+
+    def send(self, request, **kwargs):
+        body = request.body
+        if isinstance(body, str):
+            body = body.encode()
+
+        status, data = self.fake.handle(
+            request.method, request.url, request.headers, body
+        )
+
+        response = requests.Response()
+        response.status_code = status
+        response._content = data
+        response.headers["Content-Type"] = "application/json"
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "OK" if status < 400 else "Error"
+        return response
+
+    def close(self):
+        pass
@@ -1,8 +1,14 @@
 
+import logging
 import time
 import requests
 import os
 
+from logger import truncated
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
 def call_gemini(prompt, retries=3):
     API_KEY = os.getenv("GOOGLE_API_KEY")
     model = "gemini-3-flash-preview"
@@ -15,7 +21,8 @@ def call_gemini(prompt, retries=3):
     }
 
     for attempt in range(retries):
-        response = requests.post(url, headers=headers, json=payload)
+        with timed("ai"):
+            response = requests.post(url, headers=headers, json=payload)
 
         if response.status_code == 200:
             data = response.json()
@@ -26,7 +33,7 @@ def call_gemini(prompt, retries=3):
             time.sleep(2 * (attempt + 1))
             continue
 
-        print("Gemini error:", response.text)
+        logger.warning("Gemini error: %s", truncated(response.text))
         break
 
     return "AI service is busy. Please try again in a few seconds."
\ No newline at end of file
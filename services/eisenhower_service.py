@@ -1,6 +1,7 @@
 import logging
+import threading
 
-from supabase_client import get, post, update  
+from supabase_client import get, in_filter, post, update, upsert
 
 from datetime import timedelta ,datetime,date
 from config import TRAVEL_MODE_TASKS
@@ -327,11 +328,7 @@ def save_todo(plan_date, form):
     logger.debug("Final inserts count: %d", len(inserts))
 
     if updates:
-        post(
-            "todo_matrix?on_conflict=id",
-            updates,
-            prefer="resolution=merge-duplicates",
-        )
+        upsert("todo_matrix", updates)
 
     # -----------------------------------
     # DEDUPE INSERTS
@@ -592,3 +589,79 @@ def autosave_task(plan_date, task_id, quadrant, text=None, is_done=False, projec
             )
 
     return {"id": task_id}
+
+
+# ==========================================================
+# EXPIRY – stale (past, not done) Eisenhower tasks
+# ==========================================================
+# Set-based: one PATCH per table per EXPIRE_CHUNK ids instead of
+# two per row. /todo runs it at most once per user per day; the
+# in-process "last expired on" marker makes every other view free.
+
+EXPIRE_CHUNK = 100
+
+_expired_on = {}
+_expire_lock = threading.Lock()
+
+
+def expire_old_eisenhower_tasks(user_id, today=None):
+    """
+    Soft-delete open todo_matrix rows dated before today and reopen
+    their linked project tasks. Returns the number of rows expired.
+    """
+    today = today or date.today()
+
+    rows = get(
+        "todo_matrix",
+        params={
+            "user_id": f"eq.{user_id}",
+            "is_done": "eq.false",
+            "is_deleted": "eq.false",
+            "plan_date": f"lt.{today.isoformat()}",
+            "select": "id,source_task_id"
+        }
+    ) or []
+
+    ids = [r["id"] for r in rows]
+    source_ids = sorted({r["source_task_id"] for r in rows if r.get("source_task_id")})
+
+    for i in range(0, len(ids), EXPIRE_CHUNK):
+        update(
+            "todo_matrix",
+            params={"id": in_filter(ids[i:i + EXPIRE_CHUNK])},
+            json={"is_deleted": True}
+        )
+
+    for i in range(0, len(source_ids), EXPIRE_CHUNK):
+        update(
+            "project_tasks",
+            params={"task_id": in_filter(source_ids[i:i + EXPIRE_CHUNK])},
+            json={"status": "open"}
+        )
+
+    return len(ids)
+
+
+def expire_old_eisenhower_tasks_daily(user_id):
+    """
+    Run expire_old_eisenhower_tasks once per user per day.
+    """
+    today = date.today()
+
+    with _expire_lock:
+        if _expired_on.get(user_id) == today:
+            return 0
+        _expired_on[user_id] = today
+
+    try:
+        expired = expire_old_eisenhower_tasks(user_id, today)
+    except Exception as e:
+        logger.warning(f"Eisenhower expiry failed for {user_id}: {e}")
+        with _expire_lock:
+            _expired_on.pop(user_id, None)
+        return 0
+
+    if expired:
+        logger.info(f"Expired {expired} stale Eisenhower tasks for {user_id}")
+
+    return expired
@@ -0,0 +1,122 @@
+from bisect import bisect_left
+from itertools import accumulate
+
+from supabase_client import get
+
+# ==========================================================
+# EVENT INDEX – interval lookups over a day's daily_events
+# ==========================================================
+# Events sorted by start minute, plus a running max of end minutes:
+# everything that overlaps [start, end) starts before `end` (bisect)
+# and sits at or after the last position whose running max end is
+# still ≤ `start`, so a query walks back only over candidates.
+#
+# An index lives for one request/batch: built from a single read per
+# (user, date), then kept current with add() as the batch inserts.
+
+
+def to_minutes(value):
+    """
+    "09:30" / "09:30:00" → 570.
+    """
+    h, m = str(value).split(":")[:2]
+    return int(h) * 60 + int(m)
+
+
+class EventIndex:
+    def __init__(self, events=()):
+        self._items = sorted(
+            ((to_minutes(e["start_time"]), to_minutes(e["end_time"]), e) for e in events),
+            key=lambda item: item[0],
+        )
+        self._reindex()
+
+    def _reindex(self):
+        self._starts = [start for start, _, _ in self._items]
+        self._max_end = list(accumulate((end for _, end, _ in self._items), max))
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, event):
+        item = (to_minutes(event["start_time"]), to_minutes(event["end_time"]), event)
+        pos = bisect_left(self._starts, item[0])
+        self._items.insert(pos, item)
+        self._reindex()
+
+    def overlapping(self, start_time, end_time, exclude_id=None):
+        """
+        Events overlapping [start_time, end_time), by start time.
+        Touching intervals (one ends as the other starts) don't overlap.
+        """
+        start, end = to_minutes(start_time), to_minutes(end_time)
+        found = []
+
+        i = bisect_left(self._starts, end) - 1
+        while i >= 0 and self._max_end[i] > start:
+            e_start, e_end, event = self._items[i]
+            if e_end > start and not (
+                exclude_id is not None and str(event.get("id")) == str(exclude_id)
+            ):
+                found.append(event)
+            i -= 1
+
+        found.reverse()
+        return found
+
+    def conflicts(self, start_time, end_time, exclude_id=None):
+        """
+        Conflict payload for the API (same shape as before).
+        """
+        return [
+            {
+                "start_time": str(e["start_time"]),
+                "end_time": str(e["end_time"]),
+                "title": e["title"],
+            }
+            for e in self.overlapping(start_time, end_time, exclude_id)
+        ]
+
+
+def load_event_index(user_id, plan_date):
+    rows = get(
+        "daily_events",
+        params={
+            "user_id": f"eq.{user_id}",
+            "plan_date": f"eq.{plan_date}",
+            "is_deleted": "eq.false",
+            "select": "id,start_time,end_time,title",
+        }
+    ) or []
+
+    return EventIndex(rows)
+
+
+class EventIndexes(dict):
+    """
+    plan_date → EventIndex, each loaded on first use (one read per
+    date for a whole batch).
+    """
+
+    def __init__(self, user_id):
+        super().__init__()
+        self.user_id = user_id
+
+    def __missing__(self, plan_date):
+        index = self[plan_date] = load_event_index(self.user_id, plan_date)
+        return index
+
+
+def batch_conflicts(user_id, proposals):
+    """
+    Conflicts for many proposed events ({plan_date, start_time,
+    end_time[, id]}) → one list per proposal, one read per date.
+    Proposals are checked against stored events only, not each other.
+    """
+    indexes = EventIndexes(user_id)
+    return [
+        indexes[str(p["plan_date"])].conflicts(
+            p["start_time"], p["end_time"], exclude_id=p.get("id")
+        )
+        for p in proposals
+    ]
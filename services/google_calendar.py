@@ -0,0 +1,187 @@
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from supabase_client import get, update
+
+# ==========================================================
+# GOOGLE CALENDAR – per-user credentials + API client cache
+# ==========================================================
+# Every event operation used to read user_google_tokens, rebuild
+# Credentials and build() the Calendar client from its discovery
+# document. One client per user is kept here instead:
+#   - built from the discovery document bundled with
+#     google-api-python-client (read once, no network)
+#   - each API request gets its own AuthorizedHttp: httplib2
+#     connections are not thread-safe, the client and credentials are
+#   - dropped when its token has expired and when oauth2callback
+#     stores new tokens (invalidate_calendar)
+#
+# Tokens carry their expiry, so expired ones are refreshed up front;
+# every refresh, including the one AuthorizedHttp does after a 401,
+# is written back to user_google_tokens.
+#
+#   alter table user_google_tokens add column expiry timestamptz;
+#
+# Google modules are imported on first use to keep app import cheap.
+
+_clients = {}   # user_id → (credentials, service)
+_user_locks = {}
+_lock = threading.Lock()
+
+_http_factory = None
+
+
+def use_http(factory=None):
+    """
+    Swap the httplib2.Http factory (tests pass FakeCalendar.http).
+    Cached clients are dropped.
+    """
+    global _http_factory
+    _http_factory = factory
+    invalidate_calendar()
+
+
+def _new_http():
+    if _http_factory is not None:
+        return _http_factory()
+
+    import httplib2
+    return httplib2.Http()
+
+
+@lru_cache(maxsize=1)
+def _discovery_document():
+    from googleapiclient.discovery_cache import get_static_doc
+    return get_static_doc("calendar", "v3")
+
+
+def _user_lock(user_id):
+    with _lock:
+        return _user_locks.setdefault(user_id, threading.Lock())
+
+
+def _parse_expiry(value):
+    """
+    Stored timestamptz → naive UTC datetime, as google-auth expects.
+    """
+    if not value:
+        return None
+    expiry = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    return expiry
+
+
+def _save_token(user_id, credentials):
+    update(
+        "user_google_tokens",
+        params={"user_id": f"eq.{user_id}"},
+        json={
+            "access_token": credentials.token,
+            "expiry": credentials.expiry.isoformat() + "Z" if credentials.expiry else None,
+            "updated_at": datetime.utcnow().isoformat()
+        }
+    )
+
+
+@lru_cache(maxsize=1)
+def _credentials_class():
+    from google.oauth2.credentials import Credentials
+
+    class UserCredentials(Credentials):
+        """
+        Credentials that write every refreshed token back for their user.
+        """
+        user_id = None
+
+        def refresh(self, request):
+            super().refresh(request)
+            _save_token(self.user_id, self)
+
+    return UserCredentials
+
+
+def _load_credentials(user_id):
+    rows = get(
+        "user_google_tokens",
+        {"user_id": f"eq.{user_id}"}
+    )
+
+    if not rows:
+        return None
+
+    row = rows[0]
+
+    credentials = _credentials_class()(
+        token=row["access_token"],
+        refresh_token=row["refresh_token"],
+        token_uri=row["token_uri"],
+        client_id=row["client_id"],
+        client_secret=row["client_secret"],
+        scopes=row["scopes"].split(","),
+        expiry=_parse_expiry(row.get("expiry"))
+    )
+    credentials.user_id = user_id
+    return credentials
+
+
+def _refresh(credentials):
+    from google.auth.transport.requests import Request
+
+    credentials.refresh(Request())
+
+
+def _build(credentials):
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.http import HttpRequest
+
+    def request_builder(http, *args, **kwargs):
+        return HttpRequest(
+            AuthorizedHttp(credentials, http=_new_http()), *args, **kwargs
+        )
+
+    return build_from_document(
+        _discovery_document(),
+        http=AuthorizedHttp(credentials, http=_new_http()),
+        requestBuilder=request_builder,
+    )
+
+
+def calendar_service(user_id):
+    """
+    Calendar API client for the user (token refreshed if expired), or
+    None when the user hasn't linked Google.
+    """
+    with _user_lock(user_id):
+        cached = _clients.get(user_id)
+
+        if cached is not None:
+            credentials, service = cached
+            if not (credentials.expired and credentials.refresh_token):
+                return service
+            # 🔄 Expired → drop the client and rebuild from fresh tokens
+            _clients.pop(user_id, None)
+
+        credentials = _load_credentials(user_id)
+        if credentials is None:
+            return None
+
+        if credentials.expired and credentials.refresh_token:
+            _refresh(credentials)
+
+        service = _build(credentials)
+        _clients[user_id] = (credentials, service)
+        return service
+
+
+def invalidate_calendar(user_id=None):
+    """
+    Drop the cached client of one user (or everyone).
+    """
+    with _lock:
+        if user_id is None:
+            _clients.clear()
+        else:
+            _clients.pop(user_id, None)
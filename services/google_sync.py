@@ -0,0 +1,439 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+from config import IST
+from metrics import timed_job
+from services.google_calendar import calendar_service
+from supabase_client import delete, get, in_filter, post, update, upsert
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# GOOGLE SYNC OUTBOX – daily_events → Google Calendar
+# ==========================================================
+# Event routes only record what changed; a background worker pushes
+# it to Google, so a slow Google API never holds a request thread.
+#
+#   create table google_sync_outbox (
+#       id              bigserial   primary key,
+#       user_id         text        not null,
+#       event_id        text        not null,   -- daily_events.id
+#       op              text        not null,   -- create | update | delete
+#       google_event_id text,
+#       attempts        integer     not null default 0,
+#       next_attempt_at timestamptz not null default now(),
+#       last_error      text,
+#       created_at      timestamptz not null default now()
+#   );
+#   alter table daily_events add column google_sync_status text;
+#
+# google_sync_status: pending → synced | failed (NULL = not synced,
+# e.g. the user never linked Google).
+#
+# Each drain picks the events that have a due row, loads all of their
+# rows (including ones in backoff or failed), coalesces them per event
+# (create+update → create, create+delete → nothing, update+delete →
+# delete), and sends up to BATCH_SIZE calls per Google batch request.
+# Retryable failures back off exponentially; after MAX_ATTEMPTS, or on
+# a permanent error, the event is marked failed and its rows stay in
+# the outbox for inspection. A new op for such an event re-arms them:
+# they are sent again with it and the attempt count restarts.
+
+OUTBOX_TABLE = "google_sync_outbox"
+
+BATCH_SIZE = 50        # Google's limit per batch request
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 30      # seconds, doubled per attempt
+BACKOFF_MAX = 3600
+POLL_INTERVAL = 60     # seconds between sweeps for due retries
+
+PENDING, SYNCED, FAILED = "pending", "synced", "failed"
+
+# HTTP statuses worth retrying
+RETRYABLE = {408, 429, 500, 502, 503, 504}
+
+stats = Counter()
+
+_wake = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+_drain_lock = threading.Lock()
+
+
+# -----------------------------
+# Google payloads
+# -----------------------------
+def build_google_datetime(plan_date, time_str):
+    # 🔥 Support both HH:MM and HH:MM:SS
+    try:
+        dt = datetime.strptime(f"{plan_date} {time_str}", "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        dt = datetime.strptime(f"{plan_date} {time_str}", "%Y-%m-%d %H:%M")
+
+    dt = dt.replace(tzinfo=IST)
+    return dt.isoformat()
+
+
+def google_event_body(event_row):
+    start_iso = build_google_datetime(event_row["plan_date"], event_row["start_time"])
+    end_iso = build_google_datetime(event_row["plan_date"], event_row["end_time"])
+
+    return {
+        "summary": event_row["title"],
+        "description": event_row.get("description") or "",
+        "start": {
+            "dateTime": start_iso,
+            "timeZone": "Asia/Kolkata"
+        },
+        "end": {
+            "dateTime": end_iso,
+            "timeZone": "Asia/Kolkata"
+        },
+        "reminders": {
+            "useDefault": False,
+            "overrides": [
+                {"method": "popup", "minutes": 10}
+            ]
+        }
+    }
+
+
+# -----------------------------
+# Enqueue
+# -----------------------------
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def outbox_row(user_id, event_id, op, google_event_id=None):
+    return {
+        "user_id": user_id,
+        "event_id": str(event_id),
+        "op": op,
+        "google_event_id": google_event_id,
+        "attempts": 0,
+        "next_attempt_at": _now().isoformat(),
+    }
+
+
+def enqueue(rows):
+    """
+    Store outbox rows (see outbox_row) in one insert and wake the
+    worker. The caller marks the events pending in its own write.
+    """
+    if not rows:
+        return
+    post(OUTBOX_TABLE, rows, prefer="return=minimal")
+    wake()
+
+
+def coalesce(ops):
+    """
+    An event's queued ops, oldest first → the one op with the same
+    end result in Google, or None.
+    """
+    result = None
+    for op in ops:
+        if result is None:
+            result = op
+        elif result == "create" and op == "delete":
+            return None
+        elif result == "update" and op == "delete":
+            result = "delete"
+        # create+update → create (the worker sends the current row);
+        # anything after a delete is moot
+    return result
+
+
+# -----------------------------
+# Drain
+# -----------------------------
+def _backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def _set_status(event_ids, status):
+    if event_ids:
+        update(
+            "daily_events",
+            params={"id": in_filter(event_ids)},
+            json={"google_sync_status": status}
+        )
+
+
+def _status_of(exception):
+    resp = getattr(exception, "resp", None)
+    return getattr(resp, "status", None)
+
+
+class _Job:
+    """
+    One coalesced op for one event, plus the outbox rows it settles.
+    """
+
+    def __init__(self, event_id, rows):
+        self.event_id = event_id
+        self.rows = rows
+        self.op = coalesce([r["op"] for r in rows])
+        self.google_event_id = next(
+            (r["google_event_id"] for r in reversed(rows) if r.get("google_event_id")),
+            None,
+        )
+        self.sent = False
+        self.error = None
+        self.result = None
+
+
+def _request(service, job, event):
+    """
+    The Calendar API call for a job, or None when there is nothing to
+    send (e.g. an update for an event that never reached Google).
+    """
+    events = service.events()
+    google_id = (event or {}).get("google_event_id") or job.google_event_id
+
+    if job.op == "delete":
+        if not google_id:
+            return None
+        return events.delete(calendarId="primary", eventId=google_id)
+
+    if job.op is None or event is None or event.get("is_deleted"):
+        return None
+
+    # A create whose event already has a Google id was sent before
+    # (e.g. the outbox cleanup failed) → update it instead
+    if job.op == "create" and not google_id:
+        return events.insert(calendarId="primary", body=google_event_body(event))
+
+    if not google_id:
+        return None
+    return events.update(
+        calendarId="primary", eventId=google_id, body=google_event_body(event)
+    )
+
+
+def _send(service, jobs, events):
+    """
+    Run the jobs' API calls as Google batch requests; fills job.result
+    / job.error. Jobs with nothing to send succeed unsent.
+    """
+    pending = []
+    for job in jobs:
+        request = _request(service, job, events.get(job.event_id))
+        if request is None:
+            job.result = {}
+        else:
+            job.sent = True
+            pending.append((job, request))
+
+    for start in range(0, len(pending), BATCH_SIZE):
+        chunk = pending[start:start + BATCH_SIZE]
+        by_id = {str(i): job for i, (job, _) in enumerate(chunk)}
+
+        def callback(request_id, response, exception):
+            job = by_id[request_id]
+            if exception is not None and not (
+                job.op == "delete" and _status_of(exception) in (404, 410)
+            ):
+                job.error = exception
+            else:
+                job.result = response or {}
+
+        batch = service.new_batch_http_request(callback=callback)
+        for request_id, (_, request) in zip(by_id, chunk):
+            batch.add(request, request_id=request_id)
+
+        try:
+            with timed_job("google_sync", "google"):
+                batch.execute()
+        except Exception as e:
+            for job, _ in chunk:
+                if job.result is None and job.error is None:
+                    job.error = e
+
+
+def _settle(jobs):
+    """
+    Write job outcomes back: drop finished outbox rows, schedule
+    retries, update daily_events.
+    """
+    done_rows, created, synced, cleared, failed = [], [], [], [], []
+
+    for job in jobs:
+        if job.error is None:
+            done_rows += [r["id"] for r in job.rows]
+            if not job.sent:
+                cleared.append(job.event_id)
+                continue
+            if job.op == "create" and job.result.get("id"):
+                created.append({
+                    "id": job.event_id,
+                    "google_event_id": job.result["id"],
+                    "google_sync_status": SYNCED,
+                })
+            else:
+                synced.append(job.event_id)
+            stats["synced"] += 1
+            continue
+
+        # Counted from the freshest row: a new op re-arms the event
+        attempts = min(r.get("attempts") or 0 for r in job.rows) + 1
+        status = _status_of(job.error)
+        retry = attempts < MAX_ATTEMPTS and (status is None or status in RETRYABLE)
+
+        logger.warning(
+            "Google sync %s for event %s failed (attempt %s): %s",
+            job.op, job.event_id, attempts, job.error
+        )
+        update(
+            OUTBOX_TABLE,
+            params={"id": in_filter(r["id"] for r in job.rows)},
+            json={
+                "attempts": attempts if retry else MAX_ATTEMPTS,
+                "next_attempt_at": (_now() + timedelta(seconds=_backoff(attempts))).isoformat(),
+                "last_error": str(job.error)[:500],
+            }
+        )
+        if retry:
+            stats["retried"] += 1
+        else:
+            failed.append(job.event_id)
+            stats["failed"] += 1
+
+    if done_rows:
+        delete(OUTBOX_TABLE, params={"id": in_filter(done_rows)})
+    # New Google ids for the whole batch in one write
+    if created:
+        upsert("daily_events", created, on_conflict="id")
+    _set_status(synced, SYNCED)
+    _set_status(cleared, None)
+    _set_status(failed, FAILED)
+
+
+def _drain_user(user_id, rows):
+    by_event = defaultdict(list)
+    for r in rows:
+        by_event[r["event_id"]].append(r)
+    jobs = [_Job(event_id, event_rows) for event_id, event_rows in by_event.items()]
+
+    try:
+        service = calendar_service(user_id)
+    except Exception as e:
+        logger.warning("Google sync: no Calendar client for %s: %s", user_id, e)
+        for job in jobs:
+            job.error = e
+        _settle(jobs)
+        return
+
+    if service is None:
+        # Not linked → nothing to sync
+        delete(OUTBOX_TABLE, params={"id": in_filter(r["id"] for r in rows)})
+        _set_status(list(by_event), None)
+        return
+
+    events = {
+        str(e["id"]): e
+        for e in get(
+            "daily_events",
+            params={
+                "id": in_filter(by_event),
+                "select": "id,plan_date,start_time,end_time,title,description,"
+                          "google_event_id,is_deleted",
+            }
+        ) or []
+    }
+
+    _send(service, jobs, events)
+    _settle(jobs)
+
+
+def drain():
+    """
+    Sync every event with a due outbox row → number of rows processed.
+    """
+    with _drain_lock:
+        due = get(
+            OUTBOX_TABLE,
+            params={
+                "next_attempt_at": f"lte.{_now().isoformat()}",
+                "attempts": f"lt.{MAX_ATTEMPTS}",
+                "select": "event_id",
+            }
+        ) or []
+
+        if not due:
+            return 0
+
+        # Every row of those events, so ops waiting in backoff or
+        # failed are coalesced with the new ones
+        rows = get(
+            OUTBOX_TABLE,
+            params={
+                "event_id": in_filter(dict.fromkeys(r["event_id"] for r in due)),
+                "order": "id.asc",
+            }
+        ) or []
+
+        by_user = defaultdict(list)
+        for r in rows:
+            by_user[r["user_id"]].append(r)
+
+        for user_id, user_rows in by_user.items():
+            _drain_user(user_id, user_rows)
+
+        return len(rows)
+
+
+# -----------------------------
+# Worker
+# -----------------------------
+def wake():
+    _wake.set()
+
+
+def _run():
+    while True:
+        _wake.wait(POLL_INTERVAL)
+        _wake.clear()
+        try:
+            drain()
+        except Exception:
+            logger.exception("Google sync drain failed")
+
+
+def start_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run, name="google-sync", daemon=True)
+            _worker.start()
+
+
+def _start_on_first_request():
+    if not current_app.testing:
+        start_worker()
+
+
+def init_app(app):
+    """
+    Start the worker with the first request (not under tests, which
+    call drain() themselves).
+    """
+    app.before_request(_start_on_first_request)
+
+
+def metrics_lines():
+    """
+    Prometheus counters for metrics.add_collector().
+    """
+    lines = [
+        "# HELP google_sync_jobs_total Google Calendar sync outcomes.",
+        "# TYPE google_sync_jobs_total counter",
+    ]
+    for result in ("synced", "retried", "failed"):
+        lines.append(f'google_sync_jobs_total{{result="{result}"}} {stats[result]}')
+    return lines
@@ -0,0 +1,284 @@
+from array import array
+from datetime import date, datetime, timedelta
+
+from config import IST
+from supabase_async import gather_reads
+from supabase_client import get, upsert
+
+# ==========================================================
+# HABIT ANALYTICS – shared "value >= goal" engine
+# ==========================================================
+# habit_entries are loaded once into parallel typed arrays
+# (day index / habit index / value) and every per-day metric is
+# derived from one plain Python loop over those arrays. The arrays
+# keep the rows compact; the loop itself is not vectorized (no NumPy).
+
+
+def _iso(d):
+    return d.isoformat() if isinstance(d, date) else str(d)
+
+
+class HabitMatrix:
+    """
+    Habit entries for one user as parallel arrays.
+
+    habit_defs → active habit_master rows (define goals + total)
+    entries    → habit_entries rows (habit_id, plan_date, value)
+    """
+
+    def __init__(self, habit_defs, entries):
+        self.total = len(habit_defs)
+
+        self.habit_ids = [h["id"] for h in habit_defs]
+        self.names = [h.get("name") for h in habit_defs]
+        self.goals = array("d", (float(h.get("goal") or 0) for h in habit_defs))
+        habit_index = {hid: i for i, hid in enumerate(self.habit_ids)}
+
+        self.days = sorted({_iso(e["plan_date"]) for e in entries})
+        self.day_index = {d: i for i, d in enumerate(self.days)}
+
+        self.day_col = array("i")
+        self.habit_col = array("i")
+        self.value_col = array("d")
+
+        for e in entries:
+            hid = e["habit_id"]
+            if hid not in habit_index:
+                # Deleted / unknown habit: keep for totals, goal 0
+                habit_index[hid] = len(self.habit_ids)
+                self.habit_ids.append(hid)
+                self.names.append(None)
+                self.goals.append(0.0)
+
+            self.day_col.append(self.day_index[_iso(e["plan_date"])])
+            self.habit_col.append(habit_index[hid])
+            self.value_col.append(float(e.get("value") or 0))
+
+        self._completed = None
+        self._totals = None
+
+    # -----------------------------
+    # Reductions (cached)
+    # -----------------------------
+    def _reduce(self):
+        """
+        Per-day completed counts and per-habit totals, filled in one
+        per-entry loop.
+        """
+        completed = array("i", bytes(4 * len(self.days)))
+        totals = array("d", bytes(8 * len(self.habit_ids)))
+        goals = self.goals
+
+        for d, h, v in zip(self.day_col, self.habit_col, self.value_col):
+            totals[h] += v
+            g = goals[h]
+            if g > 0 and v >= g:
+                completed[d] += 1
+
+        self._completed = completed
+        self._totals = totals
+
+    @property
+    def completed(self):
+        if self._completed is None:
+            self._reduce()
+        return self._completed
+
+    @property
+    def totals(self):
+        if self._totals is None:
+            self._reduce()
+        return self._totals
+
+    # -----------------------------
+    # Per-day metrics
+    # -----------------------------
+    def percent(self, completed):
+        return round((completed / self.total) * 100) if self.total else 0
+
+    def completed_on(self, day):
+        i = self.day_index.get(_iso(day))
+        return self.completed[i] if i is not None else 0
+
+    def best_habit(self):
+        """
+        Name of the habit with the highest summed value (None if the
+        winner is not an active habit or there are no entries).
+        """
+        if not len(self.value_col):
+            return None
+
+        totals = self.totals
+        seen = dict.fromkeys(self.habit_col)   # first-appearance order
+        best = max(seen, key=lambda h: totals[h])
+        return self.names[best]
+
+
+def _matrix_reads(user_id, start, end=None, with_defs=True):
+    """
+    gather_reads specs for load_habit_matrix: entries, plus the active
+    habit_master rows unless the caller has them.
+    """
+    params = {
+        "user_id": f"eq.{user_id}",
+        "plan_date": f"gte.{_iso(start)}",
+        "select": "habit_id,plan_date,value",
+    }
+    if end is not None:
+        params["and"] = f"(plan_date.lte.{_iso(end)})"
+
+    reads = {"entries": ("habit_entries", params)}
+    if with_defs:
+        reads["defs"] = (
+            "habit_master",
+            {
+                "user_id": f"eq.{user_id}",
+                "is_deleted": "is.false"
+            }
+        )
+    return reads
+
+
+def load_habit_matrix(user_id, start, end=None, habit_defs=None):
+    """
+    Fetch active habits + entries (plan_date >= start, optional
+    end) and build a HabitMatrix. The two reads run concurrently.
+    """
+    rows = gather_reads(
+        _matrix_reads(user_id, start, end, with_defs=habit_defs is None)
+    )
+    if habit_defs is None:
+        habit_defs = rows["defs"] or []
+
+    return HabitMatrix(habit_defs, rows["entries"] or [])
+
+
+# ==========================================================
+# DAILY SCORE ROLLUP – habit_daily_scores
+# ==========================================================
+# One row per user/day, maintained on every habit write so the
+# health endpoints read N day-rows instead of N×habits entries.
+#
+#   create table habit_daily_scores (
+#       user_id    text    not null,
+#       plan_date  date    not null,
+#       completed  integer not null default 0,
+#       total      integer not null default 0,
+#       percent    integer not null default 0,
+#       primary key (user_id, plan_date)
+#   );
+#
+# Scores reflect habit_master as it was when the day was written.
+# Adding, deleting or editing a habit refreshes today's row; rebuild
+# past days after bulk edits with:
+#
+#   python -m services.habit_analytics --user VenghateshS --days 365
+
+SCORES_TABLE = "habit_daily_scores"
+BACKFILL_CHUNK = 500
+
+
+def score_row(user_id, matrix, day):
+    completed = matrix.completed_on(day)
+    return {
+        "user_id": user_id,
+        "plan_date": _iso(day),
+        "completed": completed,
+        "total": matrix.total,
+        "percent": matrix.percent(completed),
+    }
+
+
+def _upsert_scores(rows):
+    upsert(SCORES_TABLE, rows)
+
+
+def refresh_daily_score(user_id, plan_date):
+    """
+    Recompute one day's rollup row from that day's entries.
+    """
+    matrix = load_habit_matrix(user_id, plan_date, end=plan_date)
+    row = score_row(user_id, matrix, plan_date)
+    _upsert_scores([row])
+    return row
+
+
+def backfill_daily_scores(user_id, start, end=None):
+    """
+    Rebuild rollup rows for every day in [start, end] (end defaults
+    to today), including days without entries.
+    Returns the number of rows written.
+    """
+    start = date.fromisoformat(_iso(start))
+    end = date.fromisoformat(_iso(end)) if end is not None else datetime.now(IST).date()
+
+    matrix = load_habit_matrix(user_id, start, end=end)
+    rows = [
+        score_row(user_id, matrix, start + timedelta(days=i))
+        for i in range((end - start).days + 1)
+    ]
+
+    for i in range(0, len(rows), BACKFILL_CHUNK):
+        _upsert_scores(rows[i:i + BACKFILL_CHUNK])
+
+    return len(rows)
+
+
+def _scores_read(user_id, start, end=None):
+    params = {
+        "user_id": f"eq.{user_id}",
+        "plan_date": f"gte.{_iso(start)}",
+        "select": "plan_date,percent",
+    }
+    if end is not None:
+        params["and"] = f"(plan_date.lte.{_iso(end)})"
+    return SCORES_TABLE, params
+
+
+def _score_map(rows):
+    return {r["plan_date"]: r["percent"] for r in rows or []}
+
+
+def load_daily_scores(user_id, start, end=None):
+    """
+    {plan_date: percent} from the rollup table.
+    """
+    return _score_map(get(*_scores_read(user_id, start, end)))
+
+
+def load_scores_and_matrix(user_id, start, end=None):
+    """
+    load_daily_scores + load_habit_matrix for the same range, all three
+    reads in one gather_reads round trip.
+    """
+    reads = _matrix_reads(user_id, start, end)
+    reads["scores"] = _scores_read(user_id, start, end)
+    rows = gather_reads(reads)
+
+    matrix = HabitMatrix(rows["defs"] or [], rows["entries"] or [])
+    return _score_map(rows["scores"]), matrix
+
+
+def score_series(scores, start, num_days):
+    """
+    Percent for each of num_days consecutive dates from start.
+    """
+    return [
+        scores.get((start + timedelta(days=i)).isoformat(), 0)
+        for i in range(num_days)
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Rebuild habit_daily_scores from habit_entries history."
+    )
+    parser.add_argument("--user", default="VenghateshS")
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    start = datetime.now(IST).date() - timedelta(days=args.days)
+    written = backfill_daily_scores(args.user, start)
+    print(f"habit_daily_scores: {written} rows written for {args.user}")
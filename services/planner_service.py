@@ -10,36 +10,32 @@ from config import (
 )
 from utils.slots import generate_half_hour_slots
 import logging
-from supabase_client import get, post, update
-from utils.planner_parser import parse_planner_input
-from utils.slots import slot_label
+from supabase_client import get, post, update, upsert
+from supabase_async import gather_reads
+from services.streak_service import compute_streak
+from services.slot_occupancy import invalidate_occupancy
+from services.recurring_service import (
+    build_recurring_slot_payload,
+    recurring_slot_rule_params,
+)
+from utils.planner_parser import tokenize, has_slot_time
+from utils.parse_cache import parse_planner_line
+from utils.slots import SLOT_LABELS
 
 logger = logging.getLogger(__name__)
 
-def fetch_daily_slots(plan_date):
-
-
-    # ensure correct format
-    if hasattr(plan_date, "strftime"):
-        plan_date = plan_date.strftime("%Y-%m-%d")
-
-    rows = get(
-        "daily_slots",
-        params={
-            "plan_date": f"eq.{plan_date}",
-            "select": "plan,start_time,end_time,slot",
-            "order": "slot.asc",
-        },
-    )
-
+def build_timeline_slots(rows):
+    """
+    Shape daily_slots rows for window.TIMELINE_TASKS.
+    """
     if not rows :
         return []
 
     return [
         {
             "text": r["plan"],
-            "start_time": r["start_time"],
-            "end_time": r["end_time"],
+            "start_time": r.get("start_time"),
+            "end_time": r.get("end_time"),
             "slot": r["slot"],
         }
         for r in rows
@@ -50,39 +46,13 @@ def fetch_daily_slots(plan_date):
 # DATA ACCESS – DAILY PLANNER
 # ==========================================================
 
-def load_day(plan_date, tag=None):
+def build_slot_plans(rows, tag=None):
+    """
+    Map daily_slots rows onto the fixed 48-slot grid.
+    """
     plans = {
         i: {"plan": "", "status": DEFAULT_STATUS} for i in range(1, TOTAL_SLOTS + 1)
     }
-    habits = set()
-    reflection = ""
-    untimed_tasks = []  
-    user_id ="VenghateshS"
-    meta = get(
-        "daily_meta",
-        params={
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"eq.{plan_date}",
-            "select": "habits,reflection,untimed_tasks",
-        },
-    )
-
-    if meta:
-        row = meta[0]
-        habits = set(row.get("habits") or [])
-        reflection = row.get("reflection") or ""
-        untimed_tasks = row.get("untimed_tasks") or []
-
-    rows = (
-        get(
-            "daily_slots",
-            params={
-                "plan_date": f"eq.{plan_date}",
-                "select": "slot,plan,status,priority,category,tags",
-            },
-        )
-        or []
-    )
 
     for r in rows:
         slot = r.get("slot")
@@ -113,8 +83,82 @@ def load_day(plan_date, tag=None):
             "tags": row_tags,
         }
 
+    return plans
+
 
-    return plans, habits, reflection,untimed_tasks
+DAY_SLOT_SELECT = "slot,plan,status,priority,category,tags,start_time,end_time"
+
+
+def load_day_bundle(plan_date, user_id):
+    """
+    Everything the planner page needs for one day, fetched concurrently
+    (gather_reads): slots, meta and recurring-slot rules.
+
+    Recurring slots and the daily_meta row are materialized from the
+    same reads, so a page load no longer re-reads what it just wrote.
+    """
+    reads = {
+        "slots": (
+            "daily_slots",
+            {
+                "plan_date": f"eq.{plan_date}",
+                "select": DAY_SLOT_SELECT,
+                "order": "slot.asc",
+            },
+        ),
+        "meta": (
+            "daily_meta",
+            {
+                "user_id": f"eq.{user_id}",
+                "plan_date": f"eq.{plan_date}",
+                "select": "habits,reflection,untimed_tasks",
+            },
+        ),
+        "rules": (
+            "recurring_slots",
+            recurring_slot_rule_params(plan_date, user_id),
+        ),
+    }
+
+    results = {name: rows or [] for name, rows in gather_reads(reads).items()}
+
+    rows = results["slots"]
+
+    # -----------------------------
+    # Recurring slots (ignore-duplicates → only fill empty slots)
+    # -----------------------------
+    taken = {r.get("slot") for r in rows}
+    missing = [
+        r for r in build_recurring_slot_payload(results["rules"], plan_date)
+        if r["slot"] not in taken
+    ]
+
+    if missing:
+        upsert("daily_slots", missing, ignore_duplicates=True)
+        invalidate_occupancy(plan_date)
+        rows = sorted(rows + missing, key=lambda r: r["slot"])
+
+    # -----------------------------
+    # daily_meta row (habits / reflection / untimed)
+    # -----------------------------
+    meta = results["meta"]
+
+    if not meta:
+        try:
+            ensure_daily_habits_row(user_id, plan_date)
+        except Exception as e:
+            # The page still renders; the next load retries
+            logger.warning(f"daily_meta row create failed for {plan_date}: {e}")
+
+    row = meta[0] if meta else {}
+
+    return {
+        "plans": build_slot_plans(rows),
+        "daily_slots": build_timeline_slots(rows),
+        "habits": set(row.get("habits") or []),
+        "reflection": row.get("reflection") or "",
+        "untimed_tasks": row.get("untimed_tasks") or [],
+    }
 
 
 
@@ -142,246 +186,79 @@ def save_day(plan_date, form):
     # -------------------------------------------------
     # SMART MULTI-LINE INPUT (GLOBAL)
     # -------------------------------------------------
+    # Batched: parse every line first, read existing rows once per
+    # table, then write each table with a single bulk post.
     if smart_block:
-        for line in smart_block.splitlines():
-            # -------------------------------------------------
-            # Normalize leading time formats
-            # -------------------------------------------------
-
-            # Case 1: "9 task" → "task @9"
-            m = re.match(r"^(\d{1,2})(?:\s+)(.+)$", line)
-            if m:
-                line = f"{m.group(2)} @{m.group(1)}"
-
-            # Case 2: "9-10 task" → "task from 9 to 10"
-            m = re.match(r"^(\d{1,2})\s*-\s*(\d{1,2})\s+(.+)$", line)
-            if m:
-                line = f"{m.group(3)} from {m.group(1)} to {m.group(2)}"
-
-            # Case 3: "9.30-10.30 task" → "task from 9:30 to 10:30"
-            m = re.match(r"^(\d{1,2})\.(\d{2})\s*-\s*(\d{1,2})\.(\d{2})\s+(.+)$", line)
-            if m:
-                start = f"{m.group(1)}:{m.group(2)}"
-                end = f"{m.group(3)}:{m.group(4)}"
-                line = f"{m.group(5)} from {start} to {end}"
-
-            line = line.strip()
-            if not line:
-                continue
-            has_time = re.search(
-                r"""
-                (
-                    @\s*\d{1,2}(:\d{2})?\s*(am|pm)? |
-                    \bfrom\s+\d{1,2} |
-                    ^\d{1,2}(\.\d{2})?(\s*(am|pm))? |
-                    ^\d{1,2}(\.\d{2})?\s*-\s*\d{1,2}(\.\d{2})?
-                )
-                """,
-                line,
-                re.I | re.X
-                )
+        matrix_only, timed, auto_untimed = parse_smart_block(
+            smart_block, plan_date
+        )
 
-            quadrant_match = re.search(r"\b(Q[1-4])\b", line, re.I)
-
-            # -------------------------------------------------
-            # CASE 1: No time BUT Q1–Q4 → Eisenhower-only
-            # -------------------------------------------------
-            if not has_time and quadrant_match:
-                try:
-                    # Reuse parser by injecting a dummy time
-                    parsed = parse_planner_input(
-                        line + " @12am",
-                        plan_date
-                    )
-
-                    quadrant = parsed["quadrant"]
-
-                    existing = get(
-                        "todo_matrix",
-                        params={
-                            "plan_date": f"eq.{plan_date}",
-                            "quadrant": f"eq.{quadrant}",
-                            "task_text": f"eq.{parsed['title']}",
-                            "is_deleted": "eq.false",
-                        },
-                    )
-
-                    if not existing:
-                        max_pos = get(
-                        "todo_matrix",
-                        params={
-                            "plan_date": f"eq.{plan_date}",
-                            "quadrant": f"eq.{quadrant}",
-                            "is_deleted": "eq.false",
-                            "select": "position",
-                            "order": "position.desc",
-                            "limit": 1,
-                         },
-                        )
-
-                        next_pos = max_pos[0]["position"] + 1 if max_pos else 0
-
-                        post(
-                            "todo_matrix",
-                            {
-                                "plan_date": str(plan_date),
-                                "quadrant": quadrant,
-                                "task_text": parsed["title"],
-                                "is_done": False,
-                                "is_deleted": False,
-                                "position": next_pos,
-                                "category": parsed["category"],
-                                "subcategory": "General",
-                            },
-                        )
-
-                    logger.info(f"Eisenhower-only task added: {line}")
-                    continue
-
-                except Exception as e:
-                    logger.error(f"Eisenhower-only parse failed: {line} → {e}")
-                    continue
-
-            # -------------------------------------------------
-            # CASE 2: No time and no quadrant → skip
-            # -------------------------------------------------
-            # CASE 2: No time and no quadrant → append to untimed tasks
-            if not has_time and not quadrant_match:
-              auto_untimed.append({
-                    "id": f"u_{int(datetime.now().timestamp() * 1000)}_{len(auto_untimed)}",
-                    "text": line
-                })
-              logger.info(f"Smart planner → untimed task: {line}")
-              continue
-            
-            try:
-                parsed = parse_planner_input(line, plan_date)
-                task_date = parsed["date"]
-                # --------------------------------------------
-                # AUTO-INSERT INTO EISENHOWER MATRIX (Q1–Q4)
-                # --------------------------------------------
-                if parsed.get("quadrant"):
-                    quadrant = parsed["quadrant"]
-
-                    task_time = parsed["start"].strftime("%H:%M")
-                   
-                    existing = get(
-                        "todo_matrix",
-                        params={
-                            "plan_date": f"eq.{task_date}",
-                            "quadrant": f"eq.{quadrant}",
-                            "task_text": f"eq.{parsed['title']}",
-                            "task_time": f"eq.{task_time}",  # 👈 prevent duplicates
-                            "is_deleted": "eq.false",
-                        },
-                    )
-
-                    if not existing:
-                      max_pos = get(
-                            "todo_matrix",
-                            params={
-                                "plan_date": f"eq.{task_date}",
-                                "quadrant": f"eq.{quadrant}",
-                                "is_deleted": "eq.false",
-                                "select": "position",
-                                "order": "position.desc",
-                                "limit": 1,
-                            },
-                        )
-
-                      next_pos = max_pos[0]["position"] + 1 if max_pos else 0
-
-                      post(
-                            "todo_matrix",
-                            {
-                                "plan_date": str(task_date),
-                                "quadrant": quadrant,
-                                "task_text": parsed["title"],
-                                "task_date": str(task_date),   # ✅ retain date
-                                "task_time": task_time,        # ✅ retain time
-                                "is_done": False,
-                                "is_deleted": False,
-                                "position": next_pos,
-                                "category": parsed["category"],
-                                "subcategory": "General",
-                            },
-                        )
-              
-
-                slots = generate_half_hour_slots(parsed)
-               
-                affected_slots = set()
-
-                affected_slots = {
-                    s["slot"]
-                    for s in slots
-                    if 1 <= s["slot"] <= TOTAL_SLOTS
-                }
+        # --------------------------------------------
+        # AUTO-INSERT INTO EISENHOWER MATRIX (Q1–Q4)
+        # --------------------------------------------
+        todo_rows = build_todo_matrix_inserts(
+            plan_date,
+            matrix_only,
+            [p for p in timed if p.get("quadrant")],
+        )
 
-                # -------------------------------
-                # Slot metadata for recurrence
-                # -------------------------------
-                if affected_slots:
-                    first_slot = min(affected_slots)
-                    slot_count = len(affected_slots)
-                else:
-                    first_slot = None
-                    slot_count = 0
-                if recurrence["type"] and affected_slots:
-                    existing = get(
-                        "recurring_slots",
-                        params={
-                            "title": f"eq.{parsed['title']}",
-                            "start_slot": f"eq.{first_slot}",
-                            "slot_count": f"eq.{slot_count}",
-                            "start_date": f"eq.{recurrence['start_date']}",
-                            "is_active": "eq.true",
-                        },
-                    )
-
-                    if not existing:
-                        post(
-                            "recurring_slots",
-                            {
-                                "user_id": user_id,
-                                "title": parsed["title"],
-                                "start_slot": first_slot,
-                                "slot_count": slot_count,
-                                "recurrence_type": recurrence["type"],
-                                "interval_value": recurrence["interval"],
-                                "days_of_week": recurrence["days_of_week"],
-                                "start_date": str(recurrence["start_date"]),
-                                "is_active": True,
-                            },
-                        )
-
-              
-
-                # Re-insert smart slots
-                for s in slots:
-                    if 1 <= s["slot"] <= TOTAL_SLOTS:
-                        payload.append(
-                        {
-                            "plan_date": str(task_date),
-                            "slot": s["slot"],
-                            "plan": s["task"],
-
-                            # 🔥 ADD THESE TWO LINES
-                            "start_time": s["start"].strftime("%H:%M"),
-                            "end_time": s["end"].strftime("%H:%M"),
-
-                            "status": DEFAULT_STATUS,
-                            "priority": s["priority"],
-                            "category": s["category"],
-                            "tags": s["tags"],
-                        }
-                    )
+        if todo_rows:
+            try:
+                post("todo_matrix", todo_rows, prefer="return=minimal")
+                logger.info(f"Eisenhower tasks added: {len(todo_rows)}")
+            except Exception as e:
+                logger.error(f"Eisenhower batch insert failed: {e}")
 
+        recurring_candidates = []
 
+        for parsed in timed:
+            task_date = parsed["date"]
+            try:
+                slots = [
+                    s for s in generate_half_hour_slots(parsed)
+                    if 1 <= s["slot"] <= TOTAL_SLOTS
+                ]
             except Exception as e:
                 logger.error(
-                    f"Smart planner parse failed for line '{line}': {e}"
+                    f"Smart planner slot build failed for '{parsed['title']}': {e}"
                 )
+                continue
+
+            # -------------------------------
+            # Slot metadata for recurrence
+            # -------------------------------
+            if recurrence["type"] and slots:
+                recurring_candidates.append({
+                    "title": parsed["title"],
+                    "start_slot": min(s["slot"] for s in slots),
+                    "slot_count": len({s["slot"] for s in slots}),
+                })
+
+            # Re-insert smart slots
+            for s in slots:
+                payload.append(
+                    {
+                        "plan_date": str(task_date),
+                        "slot": s["slot"],
+                        "plan": s["task"],
+                        "start_time": s["start"].strftime("%H:%M"),
+                        "end_time": s["end"].strftime("%H:%M"),
+                        "status": DEFAULT_STATUS,
+                        "priority": s["priority"],
+                        "category": s["category"],
+                        "tags": s["tags"],
+                    }
+                )
+
+        rule_rows = build_recurring_slot_inserts(
+            user_id, recurrence, recurring_candidates
+        )
+
+        if rule_rows:
+            try:
+                post("recurring_slots", rule_rows, prefer="return=minimal")
+            except Exception as e:
+                logger.error(f"Recurring slot batch insert failed: {e}")
 
     # -------------------------------------------------
     # MANUAL ENTRY (only if smart planner not used)
@@ -491,15 +368,199 @@ def save_day(plan_date, form):
     ]
 
     if clean_payload:
-        post(
-            "daily_slots?on_conflict=plan_date,slot",
-            clean_payload,
-            prefer="resolution=merge-duplicates",
-        )
+        upsert("daily_slots", clean_payload)
+        for d in {row["plan_date"] for row in clean_payload}:
+            invalidate_occupancy(d)
+
 
 
+# ==========================================================
+# SMART PLANNER – BATCH PIPELINE
+# ==========================================================
+
+def parse_smart_block(smart_block, plan_date):
+    """
+    First pass over the smart planner text (no I/O).
+
+    Returns (matrix_only, timed, untimed):
+      matrix_only → Q1–Q4 lines without a time
+      timed       → parsed lines that become slots
+      untimed     → untimed task dicts for daily_meta
+    """
+    matrix_only = []
+    timed = []
+    untimed = []
+
+    for line in smart_block.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        # Leading "9 task" shorthands are a smart-block feature
+        found = tokenize(line, leading=True)
+        has_time = has_slot_time(found)
+
+        # No time BUT Q1–Q4 → Eisenhower-only
+        if not has_time and "quadrant" in found:
+            try:
+                # Reuse parser by injecting a dummy time
+                matrix_only.append(parse_planner_line(
+                    line + " @12am", plan_date, leading=True
+                ))
+            except Exception as e:
+                logger.error(f"Eisenhower-only parse failed: {line} → {e}")
+            continue
+
+        # No time and no quadrant → untimed task
+        if not has_time:
+            untimed.append({
+                "id": f"u_{int(datetime.now().timestamp() * 1000)}_{len(untimed)}",
+                "text": line
+            })
+            logger.info(f"Smart planner → untimed task: {line}")
+            continue
+
+        try:
+            timed.append(parse_planner_line(line, plan_date, found, leading=True))
+        except Exception as e:
+            logger.error(
+                f"Smart planner parse failed for line '{line}': {e}"
+            )
+
+    return matrix_only, timed, untimed
+
+
+def build_todo_matrix_inserts(plan_date, matrix_only, timed):
+    """
+    todo_matrix rows for a parsed batch, deduped against what is
+    already stored (one read for all affected dates) and against the
+    batch itself. Positions are assigned locally per date/quadrant.
+    """
+    dates = {str(p["date"]) for p in timed}
+    if matrix_only:
+        dates.add(str(plan_date))
+
+    if not dates:
+        return []
+
+    existing = get(
+        "todo_matrix",
+        params={
+            "plan_date": f"in.({','.join(sorted(dates))})",
+            "is_deleted": "eq.false",
+            "select": "plan_date,quadrant,task_text,task_time,position",
+        },
+    ) or []
+
+    seen = set()        # (date, quadrant, text)
+    seen_timed = set()  # (date, quadrant, text, HH:MM)
+    max_pos = {}
+
+    for r in existing:
+        key = (str(r["plan_date"]), r["quadrant"], r.get("task_text"))
+        seen.add(key)
+        seen_timed.add(key + ((r.get("task_time") or "")[:5],))
+
+        if r.get("position") is not None:
+            max_pos[key[:2]] = max(max_pos.get(key[:2], -1), r["position"])
+
+    def next_position(d, quadrant):
+        pos = max_pos.get((d, quadrant), -1) + 1
+        max_pos[(d, quadrant)] = pos
+        return pos
+
+    rows = []
+
+    for parsed in matrix_only:
+        d = str(plan_date)
+        key = (d, parsed["quadrant"], parsed["title"])
+        if key in seen:
+            continue
+        seen.add(key)
+
+        rows.append({
+            "plan_date": d,
+            "quadrant": parsed["quadrant"],
+            "task_text": parsed["title"],
+            "task_date": None,         # same keys as timed rows (bulk insert)
+            "task_time": None,
+            "is_done": False,
+            "is_deleted": False,
+            "position": next_position(d, parsed["quadrant"]),
+            "category": parsed["category"],
+            "subcategory": "General",
+        })
+
+    for parsed in timed:
+        d = str(parsed["date"])
+        task_time = parsed["start"].strftime("%H:%M")
+        key = (d, parsed["quadrant"], parsed["title"])
+        if key + (task_time,) in seen_timed:
+            continue  # 👈 prevent duplicates
+        seen.add(key)
+        seen_timed.add(key + (task_time,))
+
+        rows.append({
+            "plan_date": d,
+            "quadrant": parsed["quadrant"],
+            "task_text": parsed["title"],
+            "task_date": d,            # ✅ retain date
+            "task_time": task_time,    # ✅ retain time
+            "is_done": False,
+            "is_deleted": False,
+            "position": next_position(d, parsed["quadrant"]),
+            "category": parsed["category"],
+            "subcategory": "General",
+        })
+
+    return rows
+
+
+def build_recurring_slot_inserts(user_id, recurrence, candidates):
+    """
+    recurring_slots rows for a batch, skipping the user's active rules
+    that already exist for the same start date (one read for the whole
+    batch) and duplicates within the batch. A read rather than an
+    ignore-duplicates upsert: stopped rules must not block new ones.
+    """
+    if not recurrence["type"] or not candidates:
+        return []
+
+    existing = get(
+        "recurring_slots",
+        params={
+            "user_id": f"eq.{user_id}",
+            "start_date": f"eq.{recurrence['start_date']}",
+            "is_active": "eq.true",
+            "select": "title,start_slot,slot_count",
+        },
+    ) or []
+
+    seen = {
+        (r["title"], r["start_slot"], r["slot_count"]) for r in existing
+    }
+    rows = []
+
+    for c in candidates:
+        key = (c["title"], c["start_slot"], c["slot_count"])
+        if key in seen:
+            continue
+        seen.add(key)
+
+        rows.append({
+            "user_id": user_id,
+            "title": c["title"],
+            "start_slot": c["start_slot"],
+            "slot_count": c["slot_count"],
+            "recurrence_type": recurrence["type"],
+            "interval_value": recurrence["interval"],
+            "days_of_week": recurrence["days_of_week"],
+            "start_date": str(recurrence["start_date"]),
+            "is_active": True,
+        })
+
+    return rows
 
-SLOT_LABELS = {i: slot_label(i) for i in range(1, TOTAL_SLOTS + 1)}
 
 def get_daily_summary(plan_date):
     # ----------------------------
@@ -674,18 +735,7 @@ def generate_weekly_insight(data):
 
 
 def ensure_daily_habits_row(user_id, plan_date):
-    existing = get(
-        "daily_meta",
-        params={
-            "user_id": f"eq.{user_id}",
-            "plan_date": f"eq.{plan_date}",
-        },
-    )
-
-    if existing:
-        return
-
-    post(
+    upsert(
         "daily_meta",
         {
             "user_id": user_id,
@@ -694,6 +744,7 @@ def ensure_daily_habits_row(user_id, plan_date):
             "reflection": "",
             "untimed_tasks": [],
         },
+        ignore_duplicates=True,
     )
 
 
@@ -701,46 +752,11 @@ def ensure_daily_habits_row(user_id, plan_date):
 def is_health_day(habits):
     return len(HEALTH_HABITS.intersection(habits)) >= MIN_HEALTH_HABITS
 def compute_health_streak(user_id, plan_date):
-
+    """
+    Contiguous qualifying days up to plan_date (see streak_service).
+    """
     try:
-        # Get active habits
-        habit_defs = get(
-            "habit_master",
-            {
-                "user_id": f"eq.{user_id}",
-                "is_deleted": "is.false"
-            }
-        )
-
-        total = len(habit_defs)
-        if total == 0:
-            return 0
-
-        habit_map = {h["id"]: h for h in habit_defs}
-
-        # Get entries for that day
-        entries = get(
-            "habit_entries",
-            {
-                "user_id": f"eq.{user_id}",
-                "plan_date": f"eq.{plan_date}"
-            }
-        )
-
-        completed = 0
-
-        for e in entries:
-            habit = habit_map.get(e["habit_id"])
-            if not habit:
-                continue
-
-            goal = float(habit.get("goal") or 0)
-            value = float(e.get("value") or 0)
-
-            if goal > 0 and value >= goal:
-                completed += 1
-
-        return completed
+        return compute_streak(user_id, plan_date)
 
     except Exception as e:
         logger.warning(f"Health streak query failed: {e}")
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from supabase_client import get
+
+# ==========================================================
+# PROJECT NAME INDEX – project_id → name, cached per user
+# ==========================================================
+# Project names change only through /projects routes, which call
+# invalidate_project_names(); the TTL covers edits made elsewhere
+# (another worker, the Supabase dashboard).
+
+PROJECT_INDEX_TTL = 300   # seconds
+
+_index = {}
+_lock = threading.Lock()
+
+
+def project_names(user_id):
+    """
+    {project_id: name} for the user's projects.
+    """
+    now = time.monotonic()
+
+    with _lock:
+        cached = _index.get(user_id)
+        if cached and now - cached[0] < PROJECT_INDEX_TTL:
+            return dict(cached[1])
+
+    rows = get(
+        "projects",
+        params={
+            "user_id": f"eq.{user_id}",
+            "select": "project_id,name"
+        }
+    ) or []
+
+    names = {p["project_id"]: p["name"] for p in rows}
+
+    with _lock:
+        _index[user_id] = (now, names)
+
+    return dict(names)
+
+
+def invalidate_project_names(user_id=None):
+    with _lock:
+        if user_id is None:
+            _index.clear()
+        else:
+            _index.pop(user_id, None)
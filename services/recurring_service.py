@@ -2,6 +2,7 @@ import calendar
 from datetime import date   
 from supabase_client import get, post
 from config import TOTAL_SLOTS,DEFAULT_STATUS
+from services.project_service import project_names
 def matches_recurrence(rule, target_date):
     start = date.fromisoformat(rule["start_date"])
 
@@ -119,17 +120,19 @@ def materialize_recurring_tasks(plan_date,user_):
 
     if payload:
         post("todo_matrix", payload)
-def materialize_recurring_slots(plan_date, user_id):
-    rules = get(
-        "recurring_slots",
-        params={
-            "user_id": f"eq.{user_id}",
-            "is_active": "eq.true",
-            "start_date": f"lte.{plan_date}",
-            "or": f"(end_date.is.null,end_date.gte.{plan_date})",
-        },
-    ) or []
+def recurring_slot_rule_params(plan_date, user_id):
+    return {
+        "user_id": f"eq.{user_id}",
+        "is_active": "eq.true",
+        "start_date": f"lte.{plan_date}",
+        "or": f"(end_date.is.null,end_date.gte.{plan_date})",
+    }
+
 
+def build_recurring_slot_payload(rules, plan_date):
+    """
+    Expand recurring_slots rules into daily_slots rows for one date.
+    """
     payload = []
 
     for rule in rules:
@@ -146,12 +149,9 @@ def materialize_recurring_slots(plan_date, user_id):
                     "status": DEFAULT_STATUS,
                 })
 
-    if payload:
-        post(
-            "daily_slots?on_conflict=plan_date,slot",
-            payload,
-            prefer="resolution=ignore-duplicates",
-        )
+    return payload
+
+
 # ==========================================================
 # TIMELINE — PROJECT TASKS
 # ==========================================================
@@ -177,18 +177,7 @@ def load_timeline_tasks(user_id, project_id=None):
     # -----------------------------
     # Load projects for name map
     # -----------------------------
-    projects = get(
-        "projects",
-        params={
-            "user_id": f"eq.{user_id}",
-            "select": "project_id,name"
-        }
-    ) or []
-
-    project_map = {
-        p["project_id"]: p["name"]
-        for p in projects
-    }
+    project_map = project_names(user_id)
 
     # -----------------------------
     # Build task query
@@ -0,0 +1,129 @@
+import threading
+import time
+
+from config import TOTAL_SLOTS
+from supabase_client import get
+
+# ==========================================================
+# SLOT OCCUPANCY – per-day bitmap of planned slots
+# ==========================================================
+# One daily_slots read per (user, date) builds
+#   bitmap → bit (slot - 1) set when the slot has plan text
+#   plans  → slot → text (index 0 unused)
+# so range conflicts and free-range searches are mask tests instead
+# of one query per slot. Writers call invalidate_occupancy(); the TTL
+# covers writes made by another worker.
+
+OCCUPANCY_TTL = 30   # seconds
+
+FULL_DAY = (1 << TOTAL_SLOTS) - 1
+
+_cache = {}
+_lock = threading.Lock()
+
+
+class DayOccupancy:
+    def __init__(self, plans):
+        self.plans = plans
+        self.bitmap = 0
+        for slot in range(1, TOTAL_SLOTS + 1):
+            if plans[slot]:
+                self.bitmap |= 1 << (slot - 1)
+
+    @staticmethod
+    def mask(start_slot, slot_count):
+        """
+        Bits for start_slot … start_slot + slot_count - 1, clipped to
+        the day.
+        """
+        end_slot = min(start_slot + slot_count, TOTAL_SLOTS + 1)
+        start_slot = max(start_slot, 1)
+        if end_slot <= start_slot:
+            return 0
+        return ((1 << (end_slot - start_slot)) - 1) << (start_slot - 1)
+
+    def is_free(self, start_slot, slot_count=1):
+        return not self.bitmap & self.mask(start_slot, slot_count)
+
+    def conflicts(self, start_slot, slot_count):
+        """
+        [(slot, existing text)] for planned slots in the range.
+        """
+        hits = self.bitmap & self.mask(start_slot, slot_count)
+        return [
+            (slot, self.plans[slot])
+            for slot in range(start_slot, start_slot + slot_count)
+            if 1 <= slot <= TOTAL_SLOTS and hits >> (slot - 1) & 1
+        ]
+
+    def first_free(self, slot_count, after=1):
+        """
+        First start slot ≥ after with slot_count free slots, or None.
+        """
+        run = self.mask(1, slot_count)
+        for start in range(max(after, 1), TOTAL_SLOTS - slot_count + 2):
+            if not (self.bitmap >> (start - 1)) & run:
+                return start
+        return None
+
+    def preview(self, start_slot, slot_count):
+        """
+        [{slot, existing}] for the in-range slots of a range.
+        """
+        return [
+            {"slot": slot, "existing": self.plans[slot]}
+            for slot in range(start_slot, start_slot + slot_count)
+            if 1 <= slot <= TOTAL_SLOTS
+        ]
+
+
+def _load(plan_date):
+    rows = get(
+        "daily_slots",
+        params={
+            "plan_date": f"eq.{plan_date}",
+            "select": "slot,plan",
+        },
+    ) or []
+
+    plans = [""] * (TOTAL_SLOTS + 1)
+    for r in rows:
+        slot = r.get("slot")
+        if isinstance(slot, int) and 1 <= slot <= TOTAL_SLOTS:
+            text = r.get("plan") or ""
+            plans[slot] = text if text.strip() else ""
+    return DayOccupancy(plans)
+
+
+def load_occupancy(user_id, plan_date):
+    """
+    DayOccupancy for the date (plan_date: date or ISO string).
+    """
+    plan_date = str(plan_date)
+    key = (user_id, plan_date)
+    now = time.monotonic()
+
+    with _lock:
+        cached = _cache.get(key)
+        if cached and now - cached[0] < OCCUPANCY_TTL:
+            return cached[1]
+
+    occupancy = _load(plan_date)
+
+    with _lock:
+        _cache[key] = (now, occupancy)
+
+    return occupancy
+
+
+def invalidate_occupancy(plan_date=None):
+    """
+    Drop cached days (all users – daily_slots is not per user).
+    """
+    with _lock:
+        if plan_date is None:
+            _cache.clear()
+            return
+        plan_date = str(plan_date)
+        for key in [k for k in _cache if k[1] == plan_date]:
+            del _cache[key]
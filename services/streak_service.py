@@ -0,0 +1,135 @@
+import threading
+from datetime import date, timedelta
+
+from config import MIN_HEALTH_HABITS
+from supabase_client import get
+from services.habit_analytics import SCORES_TABLE
+
+# ==========================================================
+# HEALTH STREAK – contiguous qualifying days
+# ==========================================================
+# A day qualifies when enough habits met their goal
+# (MIN_HEALTH_HABITS, or all habits if fewer are defined).
+# The streak as of a date counts back over contiguous qualifying
+# days; an unfinished day does not break it, so "today" simply
+# adds one once it qualifies.
+#
+# Per user we cache the streak for the last computed date as
+#   prior          → run length ending the day before
+#   day_qualifies  → whether that date itself qualifies
+# so a habit write for that date updates the streak in place.
+
+STREAK_WINDOW_DAYS = 120
+
+_cache = {}
+_lock = threading.Lock()
+
+
+class StreakState:
+    def __init__(self, as_of, prior, day_qualifies):
+        self.as_of = as_of
+        self.prior = prior
+        self.day_qualifies = day_qualifies
+
+    @property
+    def streak(self):
+        return self.prior + (1 if self.day_qualifies else 0)
+
+
+def qualifies(completed, total):
+    if not completed:
+        return False
+    return completed >= min(MIN_HEALTH_HABITS, total or MIN_HEALTH_HABITS)
+
+
+def _qualifying_days(user_id, start, end):
+    rows = get(
+        SCORES_TABLE,
+        {
+            "user_id": f"eq.{user_id}",
+            "plan_date": f"gte.{start.isoformat()}",
+            "and": f"(plan_date.lte.{end.isoformat()})",
+            "select": "plan_date,completed,total",
+        },
+    ) or []
+
+    return {
+        r["plan_date"] for r in rows
+        if qualifies(r.get("completed"), r.get("total"))
+    }
+
+
+def _build_state(user_id, as_of):
+    """
+    One ranged read per STREAK_WINDOW_DAYS walked back (normally one).
+    """
+    end = as_of
+    prior = 0
+    day_qualifies = None
+
+    while True:
+        start = end - timedelta(days=STREAK_WINDOW_DAYS - 1)
+        days = _qualifying_days(user_id, start, end)
+
+        if day_qualifies is None:
+            day_qualifies = as_of.isoformat() in days
+            cursor = as_of - timedelta(days=1)
+        else:
+            cursor = end
+
+        while cursor >= start and cursor.isoformat() in days:
+            prior += 1
+            cursor -= timedelta(days=1)
+
+        if cursor >= start:
+            return StreakState(as_of, prior, day_qualifies)
+
+        end = start - timedelta(days=1)
+
+
+def compute_streak(user_id, as_of):
+    """
+    Health streak (in days) for a user as of a date, cached per user
+    for the last date computed.
+    """
+    if not isinstance(as_of, date):
+        as_of = date.fromisoformat(str(as_of))
+
+    with _lock:
+        state = _cache.get(user_id)
+        if state and state.as_of == as_of:
+            return state.streak
+
+    state = _build_state(user_id, as_of)
+
+    with _lock:
+        _cache[user_id] = state
+
+    return state.streak
+
+
+def record_day_score(user_id, score):
+    """
+    Apply a refreshed habit_daily_scores row to the cached streak.
+    Writes for the cached date update it in place; writes for any
+    other date drop the cache so the next read rebuilds it.
+    """
+    day = date.fromisoformat(str(score["plan_date"]))
+
+    with _lock:
+        state = _cache.get(user_id)
+        if not state:
+            return
+
+        if day == state.as_of:
+            state.day_qualifies = qualifies(score["completed"], score["total"])
+        else:
+            _cache.pop(user_id, None)
+
+
+def clear_streak_cache(user_id=None):
+    with _lock:
+        if user_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(user_id, None)
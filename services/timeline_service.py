@@ -2,6 +2,7 @@
 
 
 from supabase_client import get
+from services.project_service import project_names
 # services/timeline_service.py
 from  datetime import date 
 # services/timeline_service.py
@@ -19,18 +20,7 @@ def load_timeline_tasks(user_id, project_id=None):
     # -----------------------------
     # Load projects → name map
     # -----------------------------
-    projects = get(
-        "projects",
-        params={
-            "user_id": f"eq.{user_id}",
-            "select": "project_id,name"
-        }
-    ) or []
-
-    project_map = {
-        p["project_id"]: p["name"]
-        for p in projects
-    }
+    project_map = project_names(user_id)
 
     # -----------------------------
     # Build task query
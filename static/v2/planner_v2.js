@@ -173,6 +173,18 @@ function getReminderMinutes() {
 /* =========================
    RENDER TIMELINE
 ========================= */
+// Google Calendar sync state (daily_events.google_sync_status)
+const SYNC_BADGES = {
+  pending: { icon: "⏳", label: "Syncing to Google Calendar" },
+  failed: { icon: "⚠️", label: "Google Calendar sync failed" }
+};
+
+function syncBadge(ev) {
+  const badge = SYNC_BADGES[ev.google_sync_status];
+  if (!badge) return "";
+  return `<span class="event-sync sync-${ev.google_sync_status}" title="${badge.label}">${badge.icon}</span>`;
+}
+
 function render() {
   const root = document.getElementById("timeline");
   root.innerHTML = "";
@@ -202,6 +214,7 @@ function render() {
         <span class="event-time-inline">
           (${formatTime(ev.start_time).replace(":", ".")} - ${formatTime(ev.end_time).replace(":", ".")})
         </span>
+        ${syncBadge(ev)}
 
 
         </div>
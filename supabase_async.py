@@ -0,0 +1,161 @@
+import asyncio
+import copy
+import threading
+import time
+
+import httpx
+
+import supabase_client as sb
+from logger import log_payload
+from metrics import record
+from supabase_client import HEADERS, logger, _request_cache, _cache_key
+
+# ==========================================================
+# ASYNC READS – concurrent PostgREST fan-out
+# ==========================================================
+# asyncio counterpart of supabase_client.get() for views that need
+# several independent reads. The AsyncClient and its event loop live
+# on one daemon thread, so keep-alive connections survive between
+# Flask requests; sync views call gather_reads() and wait for
+# max() instead of sum() of the round-trips.
+
+_loop = None
+_client = None
+_transport = None
+_lock = threading.Lock()
+
+
+def _build_client():
+    transport = _transport or httpx.AsyncHTTPTransport(
+        retries=sb.READ_RETRIES,
+        limits=httpx.Limits(
+            max_connections=sb.POOL_SIZE,
+            max_keepalive_connections=sb.POOL_SIZE,
+        ),
+    )
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=httpx.Timeout(sb.READ_TIMEOUT, connect=sb.CONNECT_TIMEOUT),
+        transport=transport,
+    )
+
+
+def _get_client():
+    # Only ever called on the loop thread → no lock needed
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+def _get_loop():
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="supabase-async",
+                    daemon=True,
+                ).start()
+                _loop = loop
+    return _loop
+
+
+def _run(coro):
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def use_transport(transport=None):
+    """
+    Swap the HTTP transport (tests pass an httpx.MockTransport).
+    The client is rebuilt on next use.
+    """
+    global _transport, _client
+
+    async def _reset():
+        global _client
+        if _client is not None:
+            await _client.aclose()
+        _client = None
+
+    _run(_reset())
+    _transport = transport
+
+
+async def _fetch(path, params=None):
+    url = f"{sb.SUPABASE_URL}/rest/v1/{path}"
+
+    log_payload(logger, "SUPABASE AGET → %s | params=%s", url, params)
+
+    # Same policy as the sync Session: retry gateway errors with
+    # exponential backoff (connect errors are retried by the transport)
+    for attempt in range(sb.READ_RETRIES + 1):
+        r = await _get_client().get(url, params=params)
+        if r.status_code not in sb.RETRY_STATUSES or attempt == sb.READ_RETRIES:
+            break
+        logger.warning("SUPABASE %s → retrying %s", r.status_code, url)
+        await asyncio.sleep(sb.RETRY_BACKOFF * 2 ** attempt)
+
+    if r.is_error:
+        logger.error("SUPABASE ERROR %s", r.status_code)
+        logger.error("SUPABASE URL → %s", r.url)
+        logger.error("SUPABASE RESPONSE → %s", r.text)
+
+        r.raise_for_status()
+
+    return r.json(), len(r.content)
+
+
+async def aget(path, params=None):
+    data, _ = await _fetch(path, params)
+    return data
+
+
+async def _gather(reads):
+    fetched = await asyncio.gather(
+        *(_fetch(table, params) for table, params in reads.values())
+    )
+    return dict(zip(reads, fetched))
+
+
+def gather_reads(reads):
+    """
+    Run independent reads concurrently from sync code.
+
+    reads → {name: (table, params)}
+    returns {name: rows}
+
+    Shares the request-scoped cache with supabase_client.get().
+    """
+    cache = _request_cache()
+    results = {}
+    pending = {}
+
+    for name, (table, params) in reads.items():
+        key = _cache_key(table, params) if cache is not None else None
+        if cache is not None and key in cache:
+            results[name] = copy.deepcopy(cache[key])
+        else:
+            pending[name] = (table, params)
+
+    if pending:
+        started = time.perf_counter()
+        fetched = _run(_gather(pending))
+
+        # Concurrent → the request waited wall time, not the sum
+        record(
+            "supabase",
+            time.perf_counter() - started,
+            sum(size for _, size in fetched.values()),
+            calls=len(fetched),
+        )
+
+        for name, (data, _) in fetched.items():
+            if cache is not None:
+                cache[_cache_key(*pending[name])] = data
+                data = copy.deepcopy(data)
+            results[name] = data
+
+    return results
@@ -1,10 +1,17 @@
 
+import os
+import copy
+import threading
 import requests
 import logging
+import time
+from flask import g, has_request_context
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import record
+from logger import log_payload
 SUPABASE_URL = "https://gidpxopleslvmrrycood.supabase.co"
 SUPABASE_KEY = "sb_publishable_jv6-xI--WU4Tsm2Sq8wRYg_9Vf85OOi"
-print("SUPABASE_URL =", SUPABASE_URL)
-print("SUPABASE_KEY present =", bool(SUPABASE_KEY))
 
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise RuntimeError("Supabase env vars not set")
@@ -15,6 +22,180 @@ HEADERS = {
     "Content-Type": "application/json",
 }
 logger = logging.getLogger("daily_plan")
+logger.debug("SUPABASE_URL = %s | key present = %s", SUPABASE_URL, bool(SUPABASE_KEY))
+
+# ==========================================================
+# HTTP SESSION (pooled, keep-alive)
+# ==========================================================
+# One Session per process: every PostgREST call reuses the same
+# TCP+TLS connection instead of paying a new handshake per call.
+# Pool is sized for gunicorn's --threads (start.sh) times the parallel
+# fan-out of supabase_async.gather_reads().
+POOL_SIZE = int(os.environ.get("SUPABASE_POOL_SIZE", "10"))
+CONNECT_TIMEOUT = float(os.environ.get("SUPABASE_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("SUPABASE_READ_TIMEOUT", "10"))
+TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# Retries only for idempotent reads (GET); writes are never replayed
+READ_RETRIES = int(os.environ.get("SUPABASE_READ_RETRIES", "2"))
+RETRY_BACKOFF = float(os.environ.get("SUPABASE_RETRY_BACKOFF", "0.2"))
+RETRY_STATUSES = (502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=READ_RETRIES,
+        connect=READ_RETRIES,
+        read=READ_RETRIES,
+        status=READ_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=POOL_SIZE,
+        pool_block=False,
+        max_retries=retry,
+    )
+    s = requests.Session()
+    s.headers.update(HEADERS)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def get_session():
+    """
+    Return the process-wide pooled Session (created on first use).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def pool_stats():
+    """
+    Connection reuse counters for the Supabase pool.
+    hits   → requests served on an already-open connection
+    misses → requests that had to open a new connection (handshake)
+    """
+    requests_made = 0
+    connections = 0
+
+    # Swapped-in sessions (tests) may not pool through urllib3
+    manager = (
+        getattr(_session.get_adapter(SUPABASE_URL), "poolmanager", None)
+        if _session is not None
+        else None
+    )
+
+    if manager is not None:
+        pools = manager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_made += pool.num_requests
+            connections += pool.num_connections
+
+    return {
+        "requests": requests_made,
+        "hits": max(requests_made - connections, 0),
+        "misses": connections,
+        "pool_size": POOL_SIZE,
+    }
+
+
+def metrics_lines():
+    """
+    Prometheus pool counters for metrics.add_collector().
+    """
+    stats = pool_stats()
+    return [
+        "# HELP supabase_pool_requests_total Supabase requests by connection reuse.",
+        "# TYPE supabase_pool_requests_total counter",
+        f'supabase_pool_requests_total{{result="hit"}} {stats["hits"]}',
+        f'supabase_pool_requests_total{{result="miss"}} {stats["misses"]}',
+        "# HELP supabase_pool_size Max connections kept per Supabase host.",
+        "# TYPE supabase_pool_size gauge",
+        f"supabase_pool_size {stats['pool_size']}",
+    ]
+
+
+# ==========================================================
+# REQUEST-SCOPED READ CACHE
+# ==========================================================
+# Identical GETs inside one Flask request are served from flask.g.
+# Any post/update/delete on a table drops that table's entries
+# (including selects that embed it, e.g. "projects(name)").
+
+def _table_of(path):
+    return path.split("?", 1)[0]
+
+
+def _request_cache():
+    if not has_request_context():
+        return None
+
+    cache = getattr(g, "_supabase_cache", None)
+    if cache is None:
+        cache = g._supabase_cache = {}
+    return cache
+
+
+# Only column lists are whitespace-insensitive; filter values are
+# part of the query ("eq.Buy  milk" is not "eq.Buy milk")
+_NORMALIZED_PARAMS = ("select", "order")
+
+
+def _cache_key(path, params):
+    items = tuple(
+        sorted(
+            (k, " ".join(str(v).split()) if k in _NORMALIZED_PARAMS else str(v))
+            for k, v in (params or {}).items()
+        )
+    )
+    return (path, items)
+
+
+def invalidate(table):
+    """
+    Drop cached reads for a table in the current request.
+    """
+    cache = _request_cache()
+    if not cache:
+        return
+
+    table = _table_of(table)
+    embed = f"{table}("
+
+    for key in list(cache):
+        path, items = key
+        if _table_of(path) == table or any(
+            k == "select" and embed in v.replace(" ", "") for k, v in items
+        ):
+            del cache[key]
+
+
+def in_filter(values):
+    """
+    PostgREST in.(...) filter with every value double-quoted, so UUIDs
+    and values containing commas or parentheses match as written.
+    """
+    quoted = ",".join(
+        '"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"'
+        for v in values
+    )
+    return f"in.({quoted})"
+
 
 def _strip_eq(value):
     if isinstance(value, str) and value.startswith("eq."):
@@ -25,17 +206,27 @@ def _strip_eq(value):
 def get(path, params=None):
     url = f"{SUPABASE_URL}/rest/v1/{path}"
 
+    cache = _request_cache()
+    key = _cache_key(path, params) if cache is not None else None
+
+    # ♻️ Same read already done in this request
+    if cache is not None and key in cache:
+        log_payload(logger, "SUPABASE CACHE HIT → %s | params=%s", url, params)
+        return copy.deepcopy(cache[key])
+
     # 🔍 Log intent
-    logger.debug("SUPABASE GET → %s | params=%s", url, params)
+    log_payload(logger, "SUPABASE GET → %s | params=%s", url, params)
 
-    r = requests.get(
+    started = time.perf_counter()
+    r = get_session().get(
         url,
-        headers=HEADERS,
         params=params,
+        timeout=TIMEOUT,
     )
+    record("supabase", time.perf_counter() - started, len(r.content))
 
     # 🔑 Log final URL (THIS IS WHAT SUPABASE SEES)
-    logger.debug("SUPABASE FINAL URL → %s", r.url)
+    log_payload(logger, "SUPABASE FINAL URL → %s", r.url)
 
     if not r.ok:
         # 🔥 Log full error context
@@ -45,7 +236,13 @@ def get(path, params=None):
 
         r.raise_for_status()
 
-    return r.json()
+    data = r.json()
+
+    if cache is not None:
+        cache[key] = data
+        return copy.deepcopy(data)
+
+    return data
 def post(path, data, prefer="return=representation"):
     headers = HEADERS.copy()
 
@@ -62,13 +259,17 @@ def post(path, data, prefer="return=representation"):
             for row in data
         ]
 
-    logger.debug("SUPABASE Post → %s | params=%s", path, data)
+    log_payload(logger, "SUPABASE Post → %s | params=%s", path, data)
+    invalidate(path)
 
-    r = requests.post(
+    started = time.perf_counter()
+    r = get_session().post(
         f"{SUPABASE_URL}/rest/v1/{path}",
         headers=headers,
         json=data,
+        timeout=TIMEOUT,
     )
+    record("supabase", time.perf_counter() - started, len(r.content))
 
     r.raise_for_status()
 
@@ -78,11 +279,14 @@ def post(path, data, prefer="return=representation"):
 
     return []
 def delete(path, params):
-    r = requests.delete(
+    invalidate(path)
+    started = time.perf_counter()
+    r = get_session().delete(
         f"{SUPABASE_URL}/rest/v1/{path}",
-        headers=HEADERS,
         params=params,
+        timeout=TIMEOUT,
     )
+    record("supabase", time.perf_counter() - started, len(r.content))
     r.raise_for_status()
 def update(table, params, json):
     """
@@ -98,21 +302,71 @@ def update(table, params, json):
                 "Filters must include operators like eq., gt., lt."
             )
     url = f"{SUPABASE_URL}/rest/v1/{table}"
+    invalidate(table)
     # 🔍 Log intent
-    logger.debug("SUPABASE UPDATE → %s | params=%s", url, params)
-    response = requests.patch(
+    log_payload(logger, "SUPABASE UPDATE → %s | params=%s", url, params)
+    started = time.perf_counter()
+    response = get_session().patch(
         url,
-        headers=HEADERS,
         params=params,
         json=json,
-        timeout=10
+        timeout=TIMEOUT,
     )
+    record("supabase", time.perf_counter() - started, len(response.content))
     # 🔑 Log final URL (THIS IS WHAT SUPABASE SEES)
-    logger.debug("SUPABASE FINAL URL → %s", response.url)
+    log_payload(logger, "SUPABASE FINAL URL → %s", response.url)
     if not response.ok:
         logger.error("SUPABASE RESPONSE → %s", response.text)
         raise Exception(
             f"UPDATE failed {response.status_code}: {response.text}",
         )
 
-    return response.json() if response.text else None
\ No newline at end of file
+    return response.json() if response.text else None
+
+# ==========================================================
+# IDEMPOTENT WRITES – upsert on declared unique keys
+# ==========================================================
+# Conflict targets must match a unique constraint / primary key in
+# the database. One upsert replaces a get-then-post pair and has no
+# race window between concurrent requests. Required besides primary
+# keys (PostgREST rejects the upsert without them):
+#
+#   alter table daily_health       add unique (user_id, plan_date);
+#   alter table daily_meta         add unique (user_id, plan_date);
+#   alter table daily_slots        add unique (plan_date, slot);
+#   alter table habit_entries      add unique (user_id, habit_id, plan_date);
+#   alter table tags               add unique (user_id, name);
+#   alter table user_google_tokens add unique (user_id);
+#
+# habit_daily_scores declares its key in services/habit_analytics.py.
+# recurring_slots / recurring_tasks are deduped with a read instead:
+# only active rules count, which a PostgREST on_conflict target
+# (no partial indexes) can't express.
+UNIQUE_KEYS = {
+    "daily_health": "user_id,plan_date",
+    "daily_meta": "user_id,plan_date",
+    "daily_slots": "plan_date,slot",
+    "habit_daily_scores": "user_id,plan_date",
+    "habit_entries": "user_id,habit_id,plan_date",
+    "tags": "user_id,name",
+    "todo_matrix": "id",
+    "user_google_tokens": "user_id",
+}
+
+
+def upsert(table, data, ignore_duplicates=False, returning="minimal", on_conflict=None):
+    """
+    Insert rows keyed by UNIQUE_KEYS[table] (or on_conflict).
+    merge (default)   → existing rows are updated with the new values
+    ignore_duplicates → existing rows are left alone; with
+                        returning="representation" only the rows
+                        actually inserted come back
+    """
+    on_conflict = on_conflict or UNIQUE_KEYS[table]
+    resolution = "ignore-duplicates" if ignore_duplicates else "merge-duplicates"
+
+    return post(
+        f"{table}?on_conflict={on_conflict}",
+        data,
+        prefer=f"resolution={resolution},return={returning}",
+    )
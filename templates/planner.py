@@ -110,6 +110,7 @@ PLANNER_TEMPLATE = """
 
       <div class="day-grid-wrapper">
         <div class="day-grid">
+          {% set calendar_link = url_for('planner_calendar_link') %}
           {% for slot in plans %}
             <div class="time-row {% if now_slot and slot == now_slot %}now-slot{% endif %}">
               <div class="time-column">
@@ -120,6 +121,15 @@ PLANNER_TEMPLATE = """
                   {% if plans[slot].status == "done" %}checked{% endif %}
                 >
                 {{ slot_labels[slot] }}
+                {% if plans[slot].plan %}
+                  <a
+                    class="slot-calendar-link"
+                    href="{{ calendar_link }}?date={{ plan_date }}&slot={{ slot }}"
+                    target="_blank"
+                    rel="noopener"
+                    title="Add to Google Calendar"
+                  >📅</a>
+                {% endif %}
               </div>
               <div class="grid-line"></div>
             </div>
@@ -0,0 +1,138 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+# 📁 tests live one level below the app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import supabase_async  # noqa: E402
+import supabase_client  # noqa: E402
+from google_calendar_fake import FakeCalendar  # noqa: E402
+from postgrest_fake import FakePostgrest  # noqa: E402
+from services import eisenhower_service, google_calendar  # noqa: E402
+from services.project_service import invalidate_project_names  # noqa: E402
+from services.slot_occupancy import invalidate_occupancy  # noqa: E402
+from services.streak_service import clear_streak_cache  # noqa: E402
+
+
+USER = "u"
+DAY = date.today()
+OWNER = "VenghateshS"   # event update/delete routes are single-user
+
+ROUTES = {
+    "/": f"/?year={DAY.year}&month={DAY.month}&day={DAY.day}",
+    "/todo": f"/todo?year={DAY.year}&month={DAY.month}&day={DAY.day}",
+    "/health": f"/health?date={DAY.isoformat()}",
+    "/api/v2/daily-health": f"/api/v2/daily-health?date={DAY.isoformat()}",
+    "/references/list": "/references/list?tags=python&search=Ref&sort=title_asc",
+    "/projects/<id>/tasks": "/projects/p1/tasks",
+}
+
+
+def seed():
+    days = [(DAY - timedelta(days=i)).isoformat() for i in range(30)]
+
+    return {
+        "daily_slots": [
+            {"plan_date": DAY.isoformat(), "slot": s, "plan": f"Task {s}",
+             "status": "Nothing Planned", "start_time": None, "end_time": None}
+            for s in range(10, 20)
+        ],
+        "daily_meta": [
+            {"user_id": USER, "plan_date": DAY.isoformat(), "habits": [],
+             "reflection": "", "untimed_tasks": []},
+        ],
+        "recurring_slots": [],
+        "habit_master": [
+            {"id": h, "user_id": USER, "name": f"H{h}", "unit": "x", "goal": 1,
+             "position": h, "is_deleted": False}
+            for h in range(1, 6)
+        ],
+        "habit_entries": [
+            {"user_id": USER, "habit_id": h, "plan_date": d, "value": 1}
+            for d in days for h in range(1, 6)
+        ],
+        "habit_daily_scores": [
+            {"user_id": USER, "plan_date": d, "completed": 5, "total": 5, "percent": 100}
+            for d in days
+        ],
+        "daily_health": [
+            {"user_id": USER, "plan_date": d, "weight": 70, "height": 175, "goal": "fit"}
+            for d in days
+        ],
+        "projects": [
+            {"project_id": "p1", "user_id": USER, "name": "Home",
+             "default_sort": "smart", "is_archived": False},
+        ],
+        "project_tasks": [
+            {"task_id": f"t{i}", "project_id": "p1", "task_text": f"Task {i}",
+             "status": "open", "is_eliminated": False, "is_pinned": False,
+             "priority_rank": 2, "order_index": i, "due_date": None}
+            for i in range(20)
+        ],
+        "todo_matrix": [
+            {"id": f"m{i}", "user_id": USER, "plan_date": DAY.isoformat(),
+             "task_text": f"Todo {i}", "quadrant": "do", "is_done": False,
+             "is_deleted": False, "project_id": "p1", "source_task_id": None}
+            for i in range(8)
+        ] + [
+            {"id": f"old{i}", "user_id": USER,
+             "plan_date": (DAY - timedelta(days=3)).isoformat(),
+             "task_text": f"Stale {i}", "quadrant": "do", "is_done": False,
+             "is_deleted": False, "project_id": None, "source_task_id": f"t{i}"}
+            for i in range(5)
+        ],
+        "reference_links": [
+            {"id": i, "user_id": USER, "title": f"Ref {i}", "description": "",
+             "tags": ["python"], "category": "Dev", "created_at": f"2026-01-{i + 1:02d}"}
+            for i in range(12)
+        ],
+    }
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    fake = FakePostgrest(seed())
+
+    monkeypatch.setattr(supabase_client, "_session", fake.session())
+    supabase_async.use_transport(fake.httpx_transport())
+    monkeypatch.setattr(eisenhower_service, "_expired_on", {})
+    clear_streak_cache()
+    invalidate_project_names()
+    invalidate_occupancy()
+
+    yield fake
+
+    supabase_async.use_transport(None)
+    clear_streak_cache()
+
+
+@pytest.fixture
+def client():
+    from app import app
+
+    app.config["TESTING"] = True
+    c = app.test_client()
+    with c.session_transaction() as s:
+        s["user_id"] = USER
+        s["authenticated"] = True
+    return c
+
+
+def token_row(user_id):
+    return {
+        "user_id": user_id, "access_token": "tok", "refresh_token": "ref",
+        "token_uri": "https://oauth2.googleapis.com/token", "client_id": "cid",
+        "client_secret": "secret", "scopes": "https://www.googleapis.com/auth/calendar",
+    }
+
+
+@pytest.fixture
+def calendar(backend):
+    backend.tables["user_google_tokens"] = [token_row(USER), token_row(OWNER)]
+    fake = FakeCalendar()
+    google_calendar.use_http(fake.http)
+    yield fake
+    google_calendar.use_http(None)
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+from services import eisenhower_service
+from services.eisenhower_service import (
+    expire_old_eisenhower_tasks,
+    expire_old_eisenhower_tasks_daily,
+)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    rows = [
+        {"id": f"t{i}", "source_task_id": f"p{i % 3}" if i % 2 else None}
+        for i in range(250)
+    ]
+    updates = []
+
+    monkeypatch.setattr(eisenhower_service, "get", lambda table, params: rows)
+    monkeypatch.setattr(
+        eisenhower_service, "update",
+        lambda table, params, json: updates.append((table, params, json)),
+    )
+    monkeypatch.setattr(eisenhower_service, "_expired_on", {})
+    return updates
+
+
+# -------------------------------------------------
+# Expiry tests
+# -------------------------------------------------
+
+def test_expiry_is_set_based(backend):
+    assert expire_old_eisenhower_tasks("u", date(2026, 1, 5)) == 250
+
+    tables = [t for t, _, _ in backend]
+    assert tables == ["todo_matrix"] * 3 + ["project_tasks"]
+
+    _, params, json = backend[-1]
+    assert params["task_id"] == 'in.("p0","p1","p2")'
+    assert json == {"status": "open"}
+
+
+def test_expiry_runs_once_per_user_per_day(backend):
+    expire_old_eisenhower_tasks_daily("u")
+    expire_old_eisenhower_tasks_daily("u")
+
+    assert len(backend) == 4
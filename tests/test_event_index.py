@@ -0,0 +1,90 @@
+import random
+
+from services.event_index import EventIndex, batch_conflicts
+
+from conftest import DAY, USER
+
+
+def hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+
+def test_matches_linear_scan():
+    rng = random.Random(3)
+    events = []
+    for i in range(200):
+        start = rng.randrange(0, 23 * 60)
+        events.append({"id": i, "title": f"E{i}", "start_time": hhmm(start),
+                       "end_time": hhmm(start + rng.randrange(5, 90))})
+    index = EventIndex(events)
+
+    for _ in range(300):
+        start = rng.randrange(0, 23 * 60)
+        s, e = hhmm(start)[:5], hhmm(start + rng.randrange(5, 120))[:5]
+        expected = sorted(
+            (ev["id"] for ev in events
+             if not (e + ":00" <= ev["start_time"] or s + ":00" >= ev["end_time"])),
+        )
+        assert sorted(ev["id"] for ev in index.overlapping(s, e)) == expected
+
+
+def test_touching_events_do_not_conflict():
+    index = EventIndex([{"id": 1, "title": "A", "start_time": "09:00:00", "end_time": "10:00:00"}])
+
+    assert index.conflicts("10:00", "10:30") == []
+    assert index.conflicts("09:30", "10:30") == [
+        {"start_time": "09:00:00", "end_time": "10:00:00", "title": "A"}
+    ]
+    assert index.conflicts("09:30", "10:30", exclude_id="1") == []
+
+    index.add({"title": "B", "start_time": "10:00", "end_time": "11:00"})
+    assert [c["title"] for c in index.conflicts("09:45", "10:15")] == ["A", "B"]
+
+
+def test_batch_conflicts_one_read_per_date(backend):
+    backend.tables["daily_events"] = [
+        {"id": 1, "user_id": USER, "plan_date": DAY.isoformat(), "title": "Standup",
+         "start_time": "09:00:00", "end_time": "09:30:00", "is_deleted": False},
+    ]
+    proposals = [
+        {"plan_date": DAY.isoformat(), "start_time": f"{h:02d}:00", "end_time": f"{h:02d}:45"}
+        for h in range(8, 12)
+    ]
+
+    results = batch_conflicts(USER, proposals)
+
+    assert [len(r) for r in results] == [0, 1, 0, 0]
+    assert backend.call_count == 1
+
+
+def test_smart_create_reads_each_day_once(backend, client):
+    backend.tables["daily_events"] = []
+    text = "\n".join(f"Block {h} @{h}:00" for h in range(8, 14)) + "\nClash @8:15"
+
+    r = client.post("/api/v2/smart-create", json={"text": text, "date": DAY.isoformat()})
+    body = r.get_json()
+
+    assert body["created_count"] == 6
+    assert body["failed"][0]["error"]["conflict"] is True
+    reads = [c for c in backend.calls if c.method == "GET" and c.table == "daily_events"]
+    assert len(reads) == 1
+
+
+def test_smart_create_inserts_batch_in_one_post(backend, client):
+    backend.tables["daily_events"] = []
+    text = "\n".join(f"Item {i} @{8 + i // 2}:{30 * (i % 2):02d}" for i in range(15))
+    text += "\nnot a time\nDup @8:00"
+
+    r = client.post("/api/v2/smart-create", json={"text": text, "date": DAY.isoformat()})
+    body = r.get_json()
+
+    assert body["created_count"] == 15
+    assert [res["created"] for res in body["results"]] == [True] * 15 + [False, False]
+    assert body["results"][-1]["error"]["conflict"] is True
+    writes = [c for c in backend.calls if c.method == "POST" and c.table == "daily_events"]
+    assert len(writes) == 1
+    assert len(backend.tables["daily_events"]) == 15
+    assert len(backend.tables["google_sync_outbox"]) == 15   # one outbox insert
+    assert [c.table for c in backend.calls if c.method == "POST"] == [
+        "daily_events", "google_sync_outbox"
+    ]
@@ -0,0 +1,115 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from services import google_sync
+from services.google_calendar import calendar_service, invalidate_calendar
+
+from conftest import DAY, OWNER, USER
+
+
+def token_reads(backend):
+    return [c for c in backend.calls if c.table == "user_google_tokens"]
+
+
+def test_service_is_built_once_per_user(backend, calendar):
+    first = calendar_service(USER)
+    assert calendar_service(USER) is first
+    assert len(token_reads(backend)) == 1
+
+    invalidate_calendar(USER)
+    assert calendar_service(USER) is not first
+    assert len(token_reads(backend)) == 2
+
+    assert calendar_service("nobody") is None
+
+
+def test_shared_service_across_threads(calendar):
+    service = calendar_service(USER)
+
+    def insert(i):
+        service.events().insert(
+            calendarId="primary", body={"summary": f"E{i}"}
+        ).execute()
+
+    threads = [threading.Thread(target=insert, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(e["summary"] for e in calendar.calendar().values()) == [
+        f"E{i}" for i in range(8)
+    ]
+
+
+def test_event_routes_reuse_cached_service(backend, client, calendar):
+    created = calendar_service(OWNER).events().insert(
+        calendarId="primary", body={"summary": "Old"}
+    ).execute()
+    backend.tables["daily_events"] = [
+        {"id": 1, "user_id": OWNER, "plan_date": DAY.isoformat(), "title": "Old",
+         "start_time": "09:00:00", "end_time": "10:00:00", "is_deleted": False,
+         "google_event_id": created["id"]},
+    ]
+    backend.reset_calls()
+
+    body = {"plan_date": DAY.isoformat(), "start_time": "11:00",
+            "end_time": "12:00", "title": "New"}
+    assert client.put("/api/v2/events/1", json=body).status_code == 200
+    google_sync.drain()
+    assert calendar.calendar()[created["id"]]["summary"] == "New"
+
+    assert client.delete("/api/v2/events/1").status_code == 200
+    google_sync.drain()
+    assert calendar.calendar() == {}
+    assert token_reads(backend) == []
+
+
+@pytest.fixture
+def token_endpoint(monkeypatch):
+    """
+    Stand-in for Google's token endpoint: every refresh issues
+    "tok2", valid for an hour.
+    """
+    refreshes = []
+
+    def refresh(self, request):
+        refreshes.append(self.token)
+        self.token = "tok2"
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(Credentials, "refresh", refresh)
+    return refreshes
+
+
+def stored_token(backend, user_id):
+    return next(r for r in backend.tables["user_google_tokens"] if r["user_id"] == user_id)
+
+
+def test_expired_token_is_refreshed_and_saved(backend, calendar, token_endpoint):
+    stored_token(backend, USER)["expiry"] = "2020-01-01T00:00:00+00:00"
+    stored_token(backend, OWNER)["expiry"] = (
+        datetime.utcnow() + timedelta(hours=1)
+    ).isoformat() + "Z"
+
+    calendar_service(USER)
+    calendar_service(OWNER)
+
+    assert token_endpoint == ["tok"]
+    row = stored_token(backend, USER)
+    assert row["access_token"] == "tok2"
+    assert datetime.fromisoformat(row["expiry"].replace("Z", "+00:00")).year > 2020
+
+
+def test_refresh_after_401_is_saved(backend, calendar, token_endpoint):
+    service = calendar_service(USER)
+    calendar.fail_next(401)
+
+    service.events().insert(calendarId="primary", body={"summary": "E"}).execute()
+
+    assert token_endpoint == ["tok"]
+    assert stored_token(backend, USER)["access_token"] == "tok2"
+    assert [c.status for c in calendar.calls] == [401, 200]
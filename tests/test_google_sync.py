@@ -0,0 +1,123 @@
+import metrics
+from services import google_sync
+from services.google_sync import coalesce, drain
+
+from conftest import DAY, OWNER
+
+
+def outbox(backend):
+    return backend.tables.setdefault("google_sync_outbox", [])
+
+
+def event(backend, title):
+    return next(e for e in backend.tables["daily_events"] if e["title"] == title)
+
+
+def test_coalesce():
+    assert coalesce(["create", "update", "update"]) == "create"
+    assert coalesce(["create", "update", "delete"]) is None
+    assert coalesce(["update", "update"]) == "update"
+    assert coalesce(["update", "delete"]) == "delete"
+    assert coalesce(["delete", "update"]) == "delete"
+
+
+def test_smart_create_syncs_in_one_batch(backend, client, calendar):
+    backend.tables["daily_events"] = []
+    text = "\n".join(f"Item {h} @{h}:00" for h in range(8, 20))
+
+    client.post("/api/v2/smart-create", json={"text": text, "date": DAY.isoformat()})
+    assert {e["google_sync_status"] for e in backend.tables["daily_events"]} == {"pending"}
+
+    metrics.JOB_BACKEND_SECONDS.reset()
+    backend.reset_calls()
+    assert drain() == 12
+    assert [(c.method, c.table) for c in backend.calls].count(("POST", "daily_events")) == 1
+    assert not any(c.method == "PATCH" and c.table == "daily_events" for c in backend.calls)
+    assert calendar.batches == [12]
+    assert 'job_backend_call_seconds_count{job="google_sync",backend="google"} 1' in (
+        metrics.render_metrics()
+    )
+    assert outbox(backend) == []
+    for e in backend.tables["daily_events"]:
+        assert e["google_sync_status"] == "synced"
+        assert calendar.calendar()[e["google_event_id"]]["summary"] == e["title"]
+
+
+def test_create_then_delete_never_reaches_google(backend, client, calendar):
+    with client.session_transaction() as s:
+        s["user_id"] = OWNER   # event update/delete routes are single-user
+    backend.tables["daily_events"] = []
+    client.post("/api/v2/smart-create", json={"text": "Gym @7am\nRead @9pm",
+                                              "date": DAY.isoformat()})
+    gym = event(backend, "Gym")
+    client.put(f"/api/v2/events/{gym['id']}", json={
+        "plan_date": DAY.isoformat(), "start_time": "07:30", "end_time": "08:30",
+        "title": "Gym",
+    })
+    client.delete(f"/api/v2/events/{event(backend, 'Read')['id']}")
+
+    drain()
+
+    assert [c.method for c in calendar.calls] == ["POST"]   # create+update → one insert
+    synced = calendar.calendar()[event(backend, "Gym")["google_event_id"]]
+    assert synced["start"]["dateTime"].endswith("T07:30:00+05:30")
+    assert event(backend, "Read").get("google_event_id") is None
+    assert outbox(backend) == []
+
+
+def test_retry_with_backoff_then_fail(backend, client, calendar, monkeypatch):
+    monkeypatch.setattr(google_sync, "BACKOFF_BASE", 0)
+    backend.tables["daily_events"] = []
+    client.post("/api/v2/smart-create", json={"text": "Gym @7am", "date": DAY.isoformat()})
+
+    calendar.fail_next(503)
+    drain()
+    assert outbox(backend)[0]["attempts"] == 1
+    assert event(backend, "Gym")["google_sync_status"] == "pending"
+
+    drain()
+    assert event(backend, "Gym")["google_sync_status"] == "synced"
+
+    # Permanent errors are not retried
+    client.post("/api/v2/smart-create", json={"text": "Read @9pm", "date": DAY.isoformat()})
+    calendar.fail_next(400)
+    drain()
+    assert event(backend, "Read")["google_sync_status"] == "failed"
+    assert outbox(backend)[0]["attempts"] == google_sync.MAX_ATTEMPTS
+    assert drain() == 0
+
+
+def test_unlinked_user_is_cleared(backend, client):
+    backend.tables["daily_events"] = []
+    client.post("/api/v2/smart-create", json={"text": "Gym @7am", "date": DAY.isoformat()})
+
+    drain()
+
+    assert event(backend, "Gym")["google_sync_status"] is None
+    assert outbox(backend) == []
+
+
+def test_new_op_rearms_failed_and_backed_off_creates(backend, client, calendar):
+    with client.session_transaction() as s:
+        s["user_id"] = OWNER   # event update route is single-user
+    backend.tables["daily_events"] = []
+    client.post("/api/v2/smart-create", json={"text": "Gym @7am\nRead @9pm",
+                                              "date": DAY.isoformat()})
+
+    calendar.fail_next(400, 503)   # Gym fails for good, Read backs off
+    drain()
+    assert event(backend, "Gym")["google_sync_status"] == "failed"
+    assert event(backend, "Read")["google_sync_status"] == "pending"
+
+    for title, start in (("Gym", "07:30"), ("Read", "21:30")):
+        client.put(f"/api/v2/events/{event(backend, title)['id']}", json={
+            "plan_date": DAY.isoformat(), "start_time": start,
+            "end_time": start[:3] + "59", "title": title,
+        })
+    drain()
+
+    for title in ("Gym", "Read"):
+        row = event(backend, title)
+        assert row["google_sync_status"] == "synced"
+        assert calendar.calendar()[row["google_event_id"]]["summary"] == title
+    assert outbox(backend) == []
@@ -0,0 +1,167 @@
+from datetime import date, datetime, timedelta
+
+from config import IST
+from services import habit_analytics
+from services.habit_analytics import (
+    HabitMatrix,
+    backfill_daily_scores,
+    score_row,
+    score_series,
+)
+
+from conftest import USER
+
+
+HABITS = [
+    {"id": 1, "name": "WALK", "goal": 5000},
+    {"id": 2, "name": "WATER", "goal": 8},
+    {"id": 3, "name": "READ", "goal": 0},   # no goal → never "completed"
+    {"id": 4, "name": "SLEEP", "goal": 8},
+]
+
+ENTRIES = [
+    {"habit_id": 1, "plan_date": "2026-01-10", "value": 6000},
+    {"habit_id": 2, "plan_date": "2026-01-10", "value": 8},
+    {"habit_id": 3, "plan_date": "2026-01-10", "value": 30},
+    {"habit_id": 1, "plan_date": "2026-01-11", "value": 100},
+    {"habit_id": 2, "plan_date": "2026-01-11", "value": "9"},
+    {"habit_id": 99, "plan_date": "2026-01-11", "value": 99999},  # deleted habit
+    {"habit_id": 4, "plan_date": "2026-01-12", "value": None},
+]
+
+
+# -------------------------------------------------
+# HabitMatrix tests
+# -------------------------------------------------
+
+def test_completed_on_counts_value_at_or_above_goal():
+    m = HabitMatrix(HABITS, ENTRIES)
+
+    assert m.completed_on("2026-01-10") == 2
+    assert m.completed_on(date(2026, 1, 11)) == 1
+    assert m.completed_on("2026-01-12") == 0
+    assert m.completed_on("2026-02-01") == 0
+
+
+def test_best_habit_ignores_inactive_winner():
+    assert HabitMatrix(HABITS, ENTRIES).best_habit() is None
+    assert HabitMatrix(HABITS, ENTRIES[:5]).best_habit() == "WALK"
+    assert HabitMatrix(HABITS, []).best_habit() is None
+
+
+def test_no_habits_means_zero_percent():
+    m = HabitMatrix([], ENTRIES)
+
+    assert score_row("u1", m, "2026-01-10")["percent"] == 0
+
+
+def test_year_of_entries():
+    start = date(2025, 1, 1)
+    habits = [{"id": i, "name": f"H{i}", "goal": 1} for i in range(40)]
+    entries = [
+        {"habit_id": h, "plan_date": (start + timedelta(days=d)).isoformat(), "value": d % 2}
+        for d in range(365)
+        for h in range(40)
+    ]
+
+    m = HabitMatrix(habits, entries)
+
+    assert len(m.days) == 365
+    assert m.completed_on("2025-01-01") == 0
+    assert m.completed_on("2025-01-02") == 40
+
+
+# -------------------------------------------------
+# habit_daily_scores rollup tests
+# -------------------------------------------------
+
+def test_score_row_matches_matrix_percent():
+    m = HabitMatrix(HABITS, ENTRIES)
+
+    assert score_row("u1", m, date(2026, 1, 10)) == {
+        "user_id": "u1",
+        "plan_date": "2026-01-10",
+        "completed": 2,
+        "total": 4,
+        "percent": 50,
+    }
+
+
+def test_score_series_reads_rollup_map():
+    scores = {"2026-01-10": 50, "2026-01-12": 75}
+
+    assert score_series(scores, date(2026, 1, 9), 4) == [0, 50, 0, 75]
+
+
+def scores_by_day(backend):
+    return {r["plan_date"]: r for r in backend.tables["habit_daily_scores"]}
+
+
+def test_backfill_writes_days_without_entries(backend):
+    today = datetime.now(IST).date()
+    backend.tables["habit_entries"] = [
+        {"user_id": USER, "habit_id": 1, "plan_date": today.isoformat(), "value": 1},
+    ]
+    start = today - timedelta(days=40)
+
+    assert backfill_daily_scores(USER, start) == 41
+
+    scores = scores_by_day(backend)
+    assert scores[start.isoformat()]["percent"] == 0   # stale 100 overwritten
+    assert scores[(today - timedelta(days=1)).isoformat()]["percent"] == 0
+    assert scores[today.isoformat()]["percent"] == 20
+
+
+def test_habit_changes_refresh_todays_score(backend, client):
+    today = datetime.now(IST).date().isoformat()
+    backend.tables["habit_entries"] = [
+        {"user_id": USER, "habit_id": h, "plan_date": today, "value": 2}
+        for h in range(1, 6)
+    ]
+    backend.tables["habit_daily_scores"] = []
+
+    client.post("/api/habits/add", json={"name": "Run", "unit": "km", "goal": 5})
+    assert scores_by_day(backend)[today]["total"] == 6
+
+    client.post("/api/habits/update", json={"habit_id": 1, "goal": 3})
+    assert scores_by_day(backend)[today]["completed"] == 4
+
+    client.post("/api/habits/delete", json={"habit_id": 2})
+    assert scores_by_day(backend)[today]["total"] == 5
+
+
+def test_save_habit_value_reads_in_one_round_trip(backend, client, monkeypatch):
+    batches = []
+    real = habit_analytics.gather_reads
+
+    def spy(reads):
+        batches.append(sorted(table for table, _ in reads.values()))
+        return real(reads)
+
+    monkeypatch.setattr(habit_analytics, "gather_reads", spy)
+    backend.reset_calls()
+
+    client.post("/api/save-habit-value", json={
+        "habit_id": 1, "plan_date": datetime.now(IST).date().isoformat(), "value": 1,
+    })
+
+    assert batches == [["habit_entries", "habit_master"]]
+    assert [c.method for c in backend.calls] == ["POST", "GET", "GET", "POST"]
+
+
+def test_weekly_health_reads_in_one_round_trip(backend, client, monkeypatch):
+    batches = []
+    real = habit_analytics.gather_reads
+
+    def spy(reads):
+        batches.append(sorted(table for table, _ in reads.values()))
+        return real(reads)
+
+    monkeypatch.setattr(habit_analytics, "gather_reads", spy)
+    backend.reset_calls()
+
+    body = client.get("/api/v2/weekly-health").get_json()
+
+    assert batches == [["habit_daily_scores", "habit_entries", "habit_master"]]
+    assert len(backend.calls) == 3
+    assert len(body["daily"]) == 7
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# `import app` is timed against the framework stack it imports
+# (flask, requests, httpx) in the same interpreter, so host speed and
+# noise cancel out. App code may add at most MAX_RATIO on top (~1.3×
+# here), best of RUNS fresh interpreters. IMPORT_BUDGET_MS opts in to
+# an absolute limit as well.
+BASELINE = ("flask", "requests", "httpx")
+MAX_RATIO = float(os.environ.get("IMPORT_MAX_RATIO", "1.6"))
+IMPORT_BUDGET_MS = os.environ.get("IMPORT_BUDGET_MS")
+RUNS = 3
+
+# Loaded on first use by the routes that need them
+LAZY_MODULES = (
+    "googleapiclient",
+    "google_auth_oauthlib",
+    "google.oauth2",
+    "google.auth.transport.requests",
+    "bs4",
+    "bleach",
+    "pytz",
+)
+
+
+def _importtime(code):
+    """
+    {module: cumulative µs} for one `python -X importtime -c code`.
+    """
+    env = dict(os.environ, LOG_FILE="")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def _best_ms(runs, names):
+    return min(sum(r[n] for n in names) for r in runs) / 1000
+
+
+@pytest.fixture(scope="module")
+def runs():
+    return [_importtime("import app") for _ in range(RUNS)]
+
+
+def test_heavy_integrations_not_imported_at_startup(runs):
+    loaded = [
+        name for name in runs[0]
+        if any(name == m or name.startswith(m + ".") for m in LAZY_MODULES)
+    ]
+    assert loaded == []
+
+
+def test_app_import_close_to_framework_baseline(runs):
+    ratio = min(r["app"] / sum(r[n] for n in BASELINE) for r in runs)
+    assert ratio <= MAX_RATIO, (
+        f"import app took {ratio:.2f}× its flask/requests/httpx imports "
+        f"(max {MAX_RATIO}×)"
+    )
+
+
+@pytest.mark.skipif(IMPORT_BUDGET_MS is None, reason="set IMPORT_BUDGET_MS to enforce")
+def test_app_import_within_budget(runs):
+    best_ms = _best_ms(runs, ["app"])
+    assert best_ms <= float(IMPORT_BUDGET_MS), (
+        f"import app took {best_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms)"
+    )
@@ -0,0 +1,30 @@
+from flask import render_template, render_template_string
+
+from bench_templates import bench
+from inline_templates import INLINE_TEMPLATES, LOGIN_PAGE, PLANNER_PAGE
+
+
+def test_inline_templates_compile_once():
+    from app import app
+
+    env = app.jinja_env
+    assert env.get_template(PLANNER_PAGE) is env.get_template(PLANNER_PAGE)
+
+
+def test_named_render_matches_string_render():
+    from app import app
+
+    with app.test_request_context("/login"):
+        assert render_template(LOGIN_PAGE, error="x") == render_template_string(
+            INLINE_TEMPLATES[LOGIN_PAGE], error="x"
+        )
+
+
+def test_compiled_render_is_cheaper():
+    from app import app
+
+    results = bench(app, renders=3)
+
+    assert set(results) == set(INLINE_TEMPLATES)
+    for before, after in results.values():
+        assert after < before
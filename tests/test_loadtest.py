@@ -0,0 +1,24 @@
+from app import app
+from loadtest import LatencyProfile, percentile, run
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_short_run_reports_every_route_of_the_scenario():
+    profile = LatencyProfile(rtt_ms=1, error_rate=0.0, seed=1)
+
+    report = run(app, profile, users=2, duration=0.5, scenarios=["health"])
+
+    assert set(report) == {"GET /health", "GET /api/v2/daily-health", "_backend"}
+    for label in ("GET /health", "GET /api/v2/daily-health"):
+        assert report[label]["count"] >= 1
+        assert report[label]["errors"] == 0
+        assert report[label]["p50_ms"] <= report[label]["p99_ms"]
+    assert report["_backend"]["calls"] > 0
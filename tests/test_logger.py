@@ -0,0 +1,45 @@
+import logging
+from logging.handlers import QueueHandler, RotatingFileHandler
+
+import logger as log_module
+from logger import log_payload, setup_logger, truncated
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_app_loggers_only_enqueue():
+    setup_logger()
+
+    for name in log_module.APP_LOGGERS:
+        handlers = logging.getLogger(name).handlers
+        assert any(isinstance(h, QueueHandler) for h in handlers)
+        assert not any(isinstance(h, RotatingFileHandler) for h in handlers)
+
+
+def test_payloads_are_truncated_and_gated(monkeypatch):
+    monkeypatch.setattr(log_module, "LOG_PAYLOAD_CHARS", 10)
+    log = logging.getLogger("test_payloads")
+    log.propagate = False
+    capture = _Capture()
+    log.addHandler(capture)
+
+    assert str(truncated("x" * 25)) == "xxxxxxxxxx… (+15 chars)"
+
+    log.setLevel(logging.INFO)
+    log_payload(log, "payload %s", "y" * 50)
+    assert capture.messages == []
+
+    log.setLevel(logging.DEBUG)
+    log_payload(log, "payload %s", "y" * 50)
+    assert capture.messages == ["payload yyyyyyyyyy… (+40 chars)"]
+
+    monkeypatch.setattr(log_module, "LOG_PAYLOAD_SAMPLE", 0.0)
+    log_payload(log, "payload %s", "z")
+    assert len(capture.messages) == 1
@@ -0,0 +1,51 @@
+import pytest
+
+import metrics
+from metrics import Histogram
+
+from conftest import DAY, ROUTES
+
+
+@pytest.fixture(autouse=True)
+def fresh_histograms():
+    for h in metrics.HISTOGRAMS:
+        h.reset()
+
+
+# -------------------------------------------------
+# Metrics tests
+# -------------------------------------------------
+
+def test_histogram_exposition():
+    h = Histogram("demo_seconds", "Demo.", (0.1, 1), ("endpoint",))
+    h.observe(0.05, "a")
+    h.observe(0.5, "a")
+
+    assert h.expose() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{endpoint="a",le="0.1"} 1',
+        'demo_seconds_bucket{endpoint="a",le="1"} 2',
+        'demo_seconds_bucket{endpoint="a",le="+Inf"} 2',
+        'demo_seconds_sum{endpoint="a"} 0.55',
+        'demo_seconds_count{endpoint="a"} 2',
+    ]
+
+
+def test_server_timing_counts_backend_calls(backend, client):
+    response = client.get(ROUTES["/"])
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("app;dur=")
+    assert f'desc="{backend.call_count} calls"' in timing
+
+
+def test_metrics_endpoint_reports_per_endpoint_calls(backend, client):
+    client.get(ROUTES["/api/v2/daily-health"])
+    calls = backend.call_count
+
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert 'http_request_duration_seconds_count{endpoint="get_daily_health",method="GET",status="200"} 1' in body
+    assert f'backend_calls_per_request_sum{{endpoint="get_daily_health",backend="supabase"}} {calls}' in body
+    assert 'endpoint="metrics"' not in body
@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+
+from services.planner_service import parse_smart_block
+from utils import parse_cache
+from utils.parse_cache import cache_stats, parse_planner_line, parse_smart_line
+
+DAY = date(2026, 1, 11)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    parse_cache.clear_parse_cache()
+    yield
+    parse_cache.clear_parse_cache()
+
+
+def test_repeated_line_is_a_hit():
+    first = parse_planner_line("Yoga @6am  #fitness", DAY)
+    again = parse_planner_line(" Yoga @6am #fitness", DAY)
+
+    assert again is first
+    assert cache_stats()["planner"] == {"hits": 1, "misses": 1, "size": 1,
+                                        "maxsize": parse_cache.PARSE_CACHE_SIZE}
+
+
+def test_results_are_read_only():
+    parsed = parse_planner_line("Yoga @6am #fitness", DAY)
+
+    assert parsed["tags"] == ("fitness",)
+    with pytest.raises(TypeError):
+        parsed["title"] = "changed"
+
+
+def test_date_and_version_are_part_of_the_key(monkeypatch):
+    parse_planner_line("Yoga @6am", DAY)
+    parse_planner_line("Yoga @6am", date(2026, 1, 12))
+    monkeypatch.setattr(parse_cache, "PARSER_VERSION", parse_cache.PARSER_VERSION + 1)
+    parse_planner_line("Yoga @6am", DAY)
+
+    assert cache_stats()["planner"]["misses"] == 3
+
+
+def test_errors_are_cached():
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Time missing"):
+            parse_planner_line("Buy groceries", DAY)
+
+    assert cache_stats()["planner"]["hits"] == 1
+
+
+def test_smart_block_reuses_earlier_parses():
+    parse_planner_line("Standup @9am Q1", DAY)
+    parse_smart_block("Standup @9am Q1\nStandup @9am Q1", DAY)
+
+    assert cache_stats()["planner"]["hits"] == 2
+
+
+def test_smart_sentence_cache_and_metrics():
+    import app  # noqa: F401 – registers the collector
+    from metrics import render_metrics
+
+    parse_smart_line("9-10 standup", DAY)
+    parse_smart_line("9-10 standup", DAY)
+
+    text = render_metrics()
+    assert 'parse_cache_requests_total{parser="smart",result="hit"} 1' in text
+    assert 'parse_cache_requests_total{parser="smart",result="miss"} 1' in text
@@ -3,12 +3,8 @@ from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
 # Import the functions under test
-from app import (
-    extract_date,
-    parse_planner_input,
-    parse_time_token,
-    safe_date,
-)
+from utils.planner_parser import extract_date, parse_planner_input
+from utils.time_parser import parse_time_token
 
 IST = ZoneInfo("Asia/Kolkata")
 
@@ -138,3 +134,80 @@ def test_missing_time_raises():
     d = date(2026, 1, 11)
     with pytest.raises(ValueError):
         parse_planner_input("Buy groceries tomorrow", d)
+
+
+def test_parse_time_token_spaced_pm():
+    d = date(2026, 1, 11)
+    assert parse_time_token("7:30 pm", d).hour == 19
+
+
+def test_parse_date_before_range_keeps_title_clean():
+    d = date(2026, 1, 11)
+    parsed = parse_planner_input("meet Renga on 15th Feb from 7 am to 8 am", d)
+
+    assert parsed["title"] == "meet Renga"
+    assert parsed["date"] == date(2026, 2, 15)
+    assert (parsed["start"].hour, parsed["end"].hour) == (7, 8)
+
+
+def test_parse_leading_shorthands():
+    d = date(2026, 1, 11)
+
+    parsed = parse_planner_input("9.30-10.30 Deploy hotfix", d, leading=True)
+    assert parsed["title"] == "Deploy hotfix"
+    assert (parsed["start"].minute, parsed["end"].hour) == (30, 10)
+
+    parsed = parse_planner_input("12 apples @5pm", d, leading=True)
+    assert parsed["title"] == "12 apples"
+    assert parsed["start"].hour == 17
+
+
+def test_invalid_date_phrase_stays_in_title():
+    d = date(2026, 1, 11)
+    parsed = parse_planner_input("Work on 2 tasks @9am", d)
+
+    assert parsed["date"] == d
+    assert parsed["title"] == "Work on 2 tasks"
+
+
+@pytest.mark.parametrize("text, title", [
+    ("Team sync @9:30am Q1 $high %work #team", "Team sync"),
+    ("Gym @7 %fitness", "Gym"),
+    ("Call $urgent @9", "Call"),
+    ("Ship @9 #release-v2", "Ship"),
+    ("Read book at 14:00", "Read book"),
+    ("Gym @7am every day", "Gym"),
+    ("Learn C# @9", "Learn C#"),
+])
+def test_title_drops_markers_and_connectors(text, title):
+    assert parse_planner_input(text, date(2026, 1, 11))["title"] == title
+
+
+def test_unknown_markers_keep_defaults():
+    r = parse_planner_input("Call $urgent @9 %work #team", date(2026, 1, 11))
+    assert (r["priority"], r["category"], r["tags"]) == ("Medium", "Office", ["team"])
+
+
+def test_leading_shorthand_is_smart_block_only():
+    d = date(2026, 1, 11)
+
+    with pytest.raises(ValueError, match="Time missing"):
+        parse_planner_input("3 calls to make", d)
+
+    parsed = parse_planner_input("3 calls to make", d, leading=True)
+    assert (parsed["title"], parsed["start"].hour) == ("calls to make", 3)
+
+
+def test_at_time_with_trailing_range():
+    parsed = parse_planner_input("Design review @10:00 - 11:00", date(2026, 1, 11))
+
+    assert parsed["title"] == "Design review"
+    assert (parsed["start"].hour, parsed["end"].hour) == (10, 11)
+
+
+def test_priority_and_tags_match_inside_words():
+    parsed = parse_planner_input("Send email#work @9am $highest", date(2026, 1, 11))
+
+    assert parsed["priority"] == "High"
+    assert parsed["tags"] == ["work"]
+    assert parsed["title"] == "Send email#work"
@@ -0,0 +1,79 @@
+import json
+
+from postgrest_fake import FakePostgrest
+
+
+URL = "http://fake/rest/v1/"
+
+
+def fake():
+    return FakePostgrest({
+        "refs": [
+            {"id": 1, "title": "Flask tips", "tags": ["python", "web"], "n": 5, "p": None},
+            {"id": 2, "title": "Rust book", "tags": ["rust"], "n": 12, "p": "x"},
+            {"id": 3, "title": "pytest", "tags": ["python"], "n": 9, "p": None},
+        ],
+        "projects": [{"project_id": "p1", "name": "Home"}],
+        "todo_matrix": [{"id": "a", "project_id": "p1"}, {"id": "b", "project_id": None}],
+    })
+
+
+def rows(f, method, path, body=None, prefer=""):
+    status, data = f.handle(method, URL + path, {"Prefer": prefer},
+                            json.dumps(body).encode() if body else None)
+    return status, json.loads(data) if data else None
+
+
+# -------------------------------------------------
+# PostgREST fake tests
+# -------------------------------------------------
+
+def test_filters_logic_order_and_limit():
+    f = fake()
+
+    _, got = rows(f, "GET", "refs?n=gte.9&order=n.desc&select=id")
+    assert got == [{"id": 2}, {"id": 3}]
+
+    _, got = rows(f, "GET", "refs?and=(or(tags.cs.{python},tags.cs.{go}),title.ilike.*TIP*)")
+    assert [r["id"] for r in got] == [1]
+
+    _, got = rows(f, "GET", 'refs?id=in.("1","3")&p=is.null&limit=1&offset=1')
+    assert [r["id"] for r in got] == [3]
+
+
+def test_embedded_select():
+    _, got = rows(fake(), "GET", "todo_matrix?select=id,projects(name)&order=id.asc")
+    assert got == [
+        {"id": "a", "projects": {"name": "Home"}},
+        {"id": "b", "projects": None},
+    ]
+
+
+def test_upsert_resolutions_and_conflicts():
+    f = fake()
+    row = {"project_id": "p1", "name": "Renamed"}
+
+    status, _ = rows(f, "POST", "projects", row)
+    assert status == 409
+
+    _, got = rows(f, "POST", "projects?on_conflict=project_id", row,
+                  "resolution=ignore-duplicates,return=representation")
+    assert got == [] and f.tables["projects"][0]["name"] == "Home"
+
+    rows(f, "POST", "projects?on_conflict=project_id", row, "resolution=merge-duplicates")
+    assert f.tables["projects"] == [{"project_id": "p1", "name": "Renamed"}]
+
+    assert [c.status for c in f.calls] == [409, 201, 201]
+
+
+def test_bulk_insert_needs_uniform_keys():
+    f = fake()
+    mixed = [{"id": 7, "title": "a"}, {"id": 8, "title": "b", "n": 1}]
+
+    status, _ = rows(f, "POST", "refs", mixed)
+    assert status == 400
+
+    rows(f, "POST", "refs?columns=id,title,n", mixed)
+    assert f.tables["refs"][-2:] == [
+        {"id": 7, "title": "a", "n": None}, {"id": 8, "title": "b", "n": 1},
+    ]
@@ -0,0 +1,45 @@
+import pytest
+
+from services import project_service
+from services.project_service import project_names, invalidate_project_names
+
+
+@pytest.fixture
+def projects(monkeypatch):
+    rows = [{"project_id": "p1", "name": "Home"}]
+    calls = []
+
+    def fake_get(table, params):
+        calls.append(params["user_id"])
+        return [dict(r) for r in rows]
+
+    monkeypatch.setattr(project_service, "get", fake_get)
+    invalidate_project_names()
+    yield rows, calls
+    invalidate_project_names()
+
+
+# -------------------------------------------------
+# Project name index tests
+# -------------------------------------------------
+
+def test_index_is_cached_per_user(projects):
+    _, calls = projects
+
+    assert project_names("u") == {"p1": "Home"}
+    project_names("u")["p1"] = "mutated"
+    assert project_names("u") == {"p1": "Home"}
+    project_names("other")
+
+    assert calls == ["eq.u", "eq.other"]
+
+
+def test_invalidate_reloads_names(projects):
+    rows, calls = projects
+    project_names("u")
+
+    rows.append({"project_id": "p2", "name": "Work"})
+    invalidate_project_names("u")
+
+    assert project_names("u") == {"p1": "Home", "p2": "Work"}
+    assert len(calls) == 2
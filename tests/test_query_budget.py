@@ -0,0 +1,39 @@
+import pytest
+
+from conftest import ROUTES
+
+
+# route → (max backend calls, max response bytes)
+BUDGETS = {
+    "/": (4, 5_000),
+    "/todo": (4, 2_000),
+    "/health": (4, 4_000),
+    "/api/v2/daily-health": (4, 8_000),
+    "/references/list": (1, 2_000),
+    "/projects/<id>/tasks": (2, 5_500),
+}
+
+
+# -------------------------------------------------
+# Query budget tests
+# -------------------------------------------------
+
+@pytest.mark.parametrize("route", sorted(ROUTES))
+def test_route_stays_within_query_budget(route, backend, client):
+    response = client.get(ROUTES[route])
+    assert response.status_code == 200, response.data[:500]
+
+    max_calls, max_bytes = BUDGETS[route]
+    calls = [(c.method, c.table) for c in backend.calls]
+
+    assert backend.call_count <= max_calls, calls
+    assert backend.bytes_out <= max_bytes, calls
+
+
+def test_todo_expiry_only_runs_once_per_day(backend, client):
+    client.get(ROUTES["/todo"])
+    backend.reset_calls()
+
+    client.get(ROUTES["/todo"])
+
+    assert [(c.method, c.table) for c in backend.calls] == [("GET", "todo_matrix")]
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from services.planner_service import build_recurring_slot_inserts, save_day
+
+from conftest import DAY
+
+DATE = DAY + timedelta(days=2)
+
+
+def test_smart_block_writes_matrix_rows_of_both_shapes(backend):
+    backend.tables["todo_matrix"] = []
+    text = "Plan sprint Q2\nStandup @9am Q1\nGym @7am"
+
+    save_day(DATE, {"smart_plan": text})
+
+    rows = {r["task_text"]: r for r in backend.tables["todo_matrix"]}
+    assert set(rows) == {"Plan sprint", "Standup"}
+    assert rows["Plan sprint"]["task_time"] is None
+    assert rows["Standup"]["task_time"] == "09:00"
+    assert {r["plan"] for r in backend.tables["daily_slots"]
+            if r["plan_date"] == DATE.isoformat()} >= {"Standup", "Gym"}
+
+
+def test_recurring_rules_ignore_stopped_and_other_users(backend):
+    rule = {"title": "Gym", "start_slot": 15, "slot_count": 2,
+            "start_date": DATE.isoformat()}
+    backend.tables["recurring_slots"] = [
+        dict(rule, user_id="someone-else", is_active=True),
+        dict(rule, user_id="me", is_active=False),
+    ]
+    recurrence = {"type": "daily", "interval": None, "days_of_week": None,
+                  "start_date": DATE}
+    candidate = {"title": "Gym", "start_slot": 15, "slot_count": 2}
+
+    rows = build_recurring_slot_inserts("me", recurrence, [candidate, candidate])
+    assert [(r["user_id"], r["title"]) for r in rows] == [("me", "Gym")]
+
+    backend.tables["recurring_slots"].append(dict(rule, user_id="me", is_active=True))
+    assert build_recurring_slot_inserts("me", recurrence, [candidate]) == []
+
+
+def test_set_recurrence_after_stop(backend, client):
+    backend.tables["todo_matrix"] = [
+        {"id": "t1", "plan_date": DATE.isoformat(), "quadrant": "do",
+         "task_text": "Pay rent", "is_deleted": False},
+    ]
+    backend.tables["recurring_tasks"] = [
+        {"id": "r0", "task_text": "Pay rent", "quadrant": "do",
+         "start_date": DATE.isoformat(), "is_active": False},
+    ]
+
+    client.post("/set_recurrence", json={"task_id": "t1", "recurrence": "monthly"})
+    client.post("/set_recurrence", json={"task_id": "t1", "recurrence": "monthly"})
+
+    active = [r for r in backend.tables["recurring_tasks"] if r["is_active"]]
+    assert len(active) == 1
+    assert backend.tables["todo_matrix"][0]["recurring_id"] == active[0]["id"]
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from services.slot_occupancy import DayOccupancy, load_occupancy
+
+from conftest import DAY, USER
+
+
+def day(*planned):
+    plans = [""] * 49
+    for slot in planned:
+        plans[slot] = f"Task {slot}"
+    return DayOccupancy(plans)
+
+
+def test_bitmap_conflicts_and_first_fit():
+    occ = day(3, 4, 10, 48)
+
+    assert occ.conflicts(2, 3) == [(3, "Task 3"), (4, "Task 4")]
+    assert occ.is_free(5, 5) and not occ.is_free(9, 2)
+    assert occ.first_free(4) == 5
+    assert occ.first_free(6, after=5) == 11
+    assert occ.first_free(2, after=47) is None
+    assert occ.preview(47, 4) == [
+        {"slot": 47, "existing": ""},
+        {"slot": 48, "existing": "Task 48"},
+    ]
+
+
+def test_ranges_are_clipped_to_the_day():
+    occ = day(1, 2, 48)
+
+    assert DayOccupancy.mask(-1, 4) == 0b11
+    assert DayOccupancy.mask(-5, 2) == 0
+    assert DayOccupancy.mask(47, 10) == 0b11 << 46
+    assert occ.conflicts(0, 3) == [(1, "Task 1"), (2, "Task 2")]
+    assert occ.is_free(-3, 3)
+    assert occ.first_free(100) is None
+
+
+def test_free_slots_rejects_bad_numbers(backend, client):
+    for query in ("count=abc", "after=1.5", "count=0", "count=49"):
+        response = client.get(f"/slots/free?date={DAY.isoformat()}&{query}")
+        assert response.status_code == 400, query
+
+    response = client.get(f"/slots/free?date={DAY.isoformat()}&count=2&after=-4")
+    assert response.status_code == 200
+
+def test_occupancy_is_one_cached_read(backend):
+    load_occupancy(USER, DAY)
+    load_occupancy(USER, DAY.isoformat())
+
+    assert backend.call_count == 1
+
+
+def test_previews_use_the_bitmap(backend, client):
+    r = client.post("/untimed/slot-preview", json={
+        "plan_date": DAY.isoformat(), "start_slot": 9, "slot_count": 3,
+    })
+    assert [p["existing"] for p in r.get_json()] == ["", "Task 10", "Task 11"]
+
+    r = client.post("/smart/preview", json={
+        "plan_date": DAY.isoformat(), "text": "9-10 Standup",
+    })
+    assert [c["time"] for c in r.get_json()["conflicts"]] == ["Slot 19"]
+
+    assert backend.call_count == 1
+
+
+def test_schedule_untimed_first_fit_and_invalidate(backend, client):
+    plan_date = (DAY + timedelta(days=2)).isoformat()  # never "today" in IST
+    backend.tables["daily_slots"].append(
+        {"plan_date": plan_date, "slot": 1, "plan": "Early", "status": "Nothing Planned"}
+    )
+    backend.tables["daily_meta"].append(
+        # schedule_untimed is still pinned to the single app user
+        {"user_id": "VenghateshS", "plan_date": plan_date, "habits": [], "reflection": "",
+         "untimed_tasks": [{"id": "u1", "text": "Read"}]}
+    )
+
+    assert client.get(f"/slots/free?date={plan_date}&count=2").get_json()["start_slot"] == 2
+
+    r = client.post("/untimed/schedule", json={
+        "plan_date": plan_date, "id": "u1", "slot_count": 2,
+    })
+    assert r.status_code == 204
+
+    free = client.get(f"/slots/free?date={plan_date}&count=2").get_json()
+    assert free["occupied"] == [1, 2, 3]
+    assert free["start_slot"] == 4
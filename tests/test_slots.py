@@ -0,0 +1,50 @@
+from datetime import date
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from config import IST, TOTAL_SLOTS
+from utils.calender_links import google_calendar_link
+from utils.slots import SLOT_LABELS, slot_label, slot_start_end, slot_utc_range
+
+from conftest import DAY
+
+
+def test_slot_table_matches_slot_label():
+    assert len(SLOT_LABELS) == TOTAL_SLOTS
+    assert all(SLOT_LABELS[s] == slot_label(s) for s in range(1, TOTAL_SLOTS + 1))
+
+
+@pytest.mark.parametrize("slot", [1, 15, 48])
+def test_utc_range_matches_tz_conversion(slot):
+    day = date(2026, 3, 1)
+    start, end = slot_start_end(day, slot)
+    utc = ZoneInfo("UTC")
+
+    assert slot_utc_range(day, slot) == (
+        start.astimezone(utc).replace(tzinfo=None),
+        end.astimezone(utc).replace(tzinfo=None),
+    )
+    assert start.tzinfo is IST
+
+
+def test_calendar_link_dates():
+    link = google_calendar_link(date(2026, 3, 1), 1, "Plan")
+    assert "dates=20260228T183000Z%2F20260228T190000Z" in link
+    assert google_calendar_link(date(2026, 3, 1), 1, "") == "#"
+
+
+def test_calendar_link_endpoint(backend, client):
+    response = client.get(f"/planner/calendar-link?date={DAY}&slot=10")
+    assert response.status_code == 302
+    assert "text=Task+10" in response.headers["Location"]
+
+    assert client.get(f"/planner/calendar-link?date={DAY}&slot=40").status_code == 404
+    assert client.get("/planner/calendar-link?slot=x").status_code == 400
+
+
+def test_planner_links_planned_slots_to_calendar(backend, client):
+    html = client.get(f"/?year={DAY.year}&month={DAY.month}&day={DAY.day}").get_data(as_text=True)
+
+    assert f"/planner/calendar-link?date={DAY}&slot=10" in html
+    assert html.count('class="slot-calendar-link"') == 10
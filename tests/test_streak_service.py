@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+import pytest
+
+from services import streak_service
+from services.streak_service import compute_streak, record_day_score, clear_streak_cache
+
+
+TODAY = date(2026, 3, 31)
+
+
+def score(day, completed, total=4):
+    return {"plan_date": day.isoformat(), "completed": completed, "total": total}
+
+
+@pytest.fixture
+def scores(monkeypatch):
+    """
+    Rollup rows served from a list; records every ranged read.
+    """
+    rows = []
+    calls = []
+
+    def fake_get(table, params):
+        start = params["plan_date"][len("gte."):]
+        end = params["and"][len("(plan_date.lte."):-1]
+        calls.append((start, end))
+        return [r for r in rows if start <= r["plan_date"] <= end]
+
+    monkeypatch.setattr(streak_service, "get", fake_get)
+    clear_streak_cache()
+    yield rows, calls
+    clear_streak_cache()
+
+
+# -------------------------------------------------
+# Streak tests
+# -------------------------------------------------
+
+def test_streak_counts_contiguous_days_in_one_read(scores):
+    rows, calls = scores
+    rows += [score(TODAY - timedelta(days=i), 3) for i in range(5)]
+    rows.append(score(TODAY - timedelta(days=6), 4))   # gap on day 5
+
+    assert compute_streak("u", TODAY) == 5
+    assert len(calls) == 1
+
+
+def test_unfinished_today_does_not_break_streak(scores):
+    rows, _ = scores
+    rows += [score(TODAY - timedelta(days=i), 2) for i in range(1, 4)]
+    rows.append(score(TODAY, 1))   # below MIN_HEALTH_HABITS
+
+    assert compute_streak("u", TODAY) == 3
+
+
+def test_streak_uses_all_habits_when_fewer_than_minimum(scores):
+    rows, _ = scores
+    rows.append(score(TODAY, 1, total=1))
+
+    assert compute_streak("u", TODAY) == 1
+
+
+def test_streak_longer_than_window_reads_further_back(scores):
+    rows, calls = scores
+    days = streak_service.STREAK_WINDOW_DAYS + 10
+    rows += [score(TODAY - timedelta(days=i), 2) for i in range(days)]
+
+    assert compute_streak("u", TODAY) == days
+    assert len(calls) == 2
+
+
+def test_cached_streak_updates_incrementally(scores):
+    rows, calls = scores
+    rows += [score(TODAY - timedelta(days=i), 2) for i in range(1, 3)]
+
+    assert compute_streak("u", TODAY) == 2
+
+    record_day_score("u", score(TODAY, 2))
+    assert compute_streak("u", TODAY) == 3
+
+    record_day_score("u", score(TODAY, 0))
+    assert compute_streak("u", TODAY) == 2
+    assert len(calls) == 1
+
+
+def test_past_day_write_rebuilds_streak(scores):
+    rows, calls = scores
+    rows += [score(TODAY - timedelta(days=i), 2) for i in range(3)]
+
+    assert compute_streak("u", TODAY) == 3
+
+    rows[1] = score(TODAY - timedelta(days=1), 0)
+    record_day_score("u", rows[1])
+
+    assert compute_streak("u", TODAY) == 1
+    assert len(calls) == 2
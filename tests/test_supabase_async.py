@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from flask import Flask
+
+import supabase_async
+from supabase_async import gather_reads
+
+
+DELAY = 0.2
+
+
+@pytest.fixture
+def stub():
+    """
+    Local PostgREST stub: every read waits DELAY seconds and echoes
+    its table + query string.
+    """
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(DELAY)
+        if request.url.path.endswith("/broken"):
+            return httpx.Response(500, json={"message": "boom"})
+        return httpx.Response(
+            200,
+            json=[{
+                "table": request.url.path.rsplit("/", 1)[-1],
+                "query": dict(request.url.params),
+            }],
+        )
+
+    supabase_async.use_transport(httpx.MockTransport(handler))
+    yield calls
+    supabase_async.use_transport(None)
+
+
+READS = {
+    "defs": ("habit_master", {"user_id": "eq.u"}),
+    "entries": ("habit_entries", {"user_id": "eq.u", "plan_date": "eq.2026-01-01"}),
+    "health": ("daily_health", {"user_id": "eq.u", "limit": 30}),
+    "meta": ("daily_meta", {"user_id": "eq.u"}),
+}
+
+
+# -------------------------------------------------
+# gather_reads tests
+# -------------------------------------------------
+
+def test_reads_run_concurrently(stub):
+    started = time.perf_counter()
+    results = gather_reads(READS)
+    elapsed = time.perf_counter() - started
+
+    assert len(stub) == 4
+    assert elapsed < DELAY * 2
+    assert results["entries"][0]["table"] == "habit_entries"
+    assert results["entries"][0]["query"]["plan_date"] == "eq.2026-01-01"
+    assert results["health"][0]["query"]["limit"] == "30"
+
+
+def test_reads_share_the_request_cache(stub):
+    app = Flask(__name__)
+
+    with app.test_request_context():
+        first = gather_reads(READS)
+        first["defs"][0]["table"] = "mutated"
+
+        second = gather_reads(READS)
+
+    assert len(stub) == 4
+    assert second["defs"][0]["table"] == "habit_master"
+
+
+def test_http_errors_are_raised(stub):
+    with pytest.raises(httpx.HTTPStatusError):
+        gather_reads({"bad": ("broken", None)})
+
+
+def test_gateway_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(supabase_async.sb, "RETRY_BACKOFF", 0)
+    statuses = [503, 502]
+
+    def handler(request):
+        if statuses:
+            return httpx.Response(statuses.pop(0), json={"message": "busy"})
+        return httpx.Response(200, json=[{"ok": True}])
+
+    supabase_async.use_transport(httpx.MockTransport(handler))
+    try:
+        assert gather_reads({"rows": ("daily_meta", None)}) == {"rows": [{"ok": True}]}
+
+        statuses.extend([504] * (supabase_async.sb.READ_RETRIES + 1))
+        with pytest.raises(httpx.HTTPStatusError):
+            gather_reads({"rows": ("daily_meta", None)})
+    finally:
+        supabase_async.use_transport(None)
@@ -0,0 +1,170 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from flask import Flask
+
+import supabase_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    fail_next = 0
+    gets = 0
+    last_post = None
+
+    def _reply(self, status, body):
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        _Handler.gets += 1
+        if _Handler.fail_next:
+            _Handler.fail_next -= 1
+            return self._reply(503, {"message": "busy"})
+        self._reply(200, [{"path": self.path}])
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        _Handler.last_post = (self.path, self.headers.get("Prefer"))
+        self._reply(201, [{"ok": True}])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(
+        supabase_client, "SUPABASE_URL", f"http://127.0.0.1:{server.server_port}"
+    )
+    monkeypatch.setattr(supabase_client, "RETRY_BACKOFF", 0)
+    monkeypatch.setattr(supabase_client, "_session", None)
+    _Handler.gets = 0
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+# -------------------------------------------------
+# pooled session tests
+# -------------------------------------------------
+
+def test_session_is_shared():
+    assert supabase_client.get_session() is supabase_client.get_session()
+
+
+def test_connections_are_reused(backend):
+    for _ in range(5):
+        supabase_client.get("daily_slots", params={"slot": "eq.1"})
+
+    stats = supabase_client.pool_stats()
+
+    assert stats["requests"] == 5
+    assert stats["misses"] == 1
+    assert stats["hits"] == 4
+    assert 'supabase_pool_requests_total{result="hit"} 4' in supabase_client.metrics_lines()
+
+
+def test_get_retries_transient_errors(backend):
+    _Handler.fail_next = 1
+
+    rows = supabase_client.get("daily_slots")
+
+    assert rows and rows[0]["path"].startswith("/rest/v1/daily_slots")
+
+
+def test_post_uses_pooled_session(backend):
+    rows = supabase_client.post("daily_slots", {"slot": 1})
+    assert rows == [{"ok": True}]
+
+
+def test_upsert_targets_declared_unique_key(backend):
+    supabase_client.upsert("tags", [{"user_id": "u", "name": "x"}], ignore_duplicates=True)
+    assert _Handler.last_post == (
+        "/rest/v1/tags?on_conflict=user_id,name",
+        "resolution=ignore-duplicates,return=minimal",
+    )
+
+    supabase_client.upsert("daily_meta", {"user_id": "u"}, returning="representation")
+    assert _Handler.last_post == (
+        "/rest/v1/daily_meta?on_conflict=user_id,plan_date",
+        "resolution=merge-duplicates,return=representation",
+    )
+
+
+# -------------------------------------------------
+# request-scoped read cache tests
+# -------------------------------------------------
+
+def test_identical_reads_are_deduped_within_request(backend):
+    app = Flask(__name__)
+
+    with app.test_request_context("/"):
+        a = supabase_client.get("daily_meta", {"plan_date": "eq.2026-01-11", "limit": 1})
+        b = supabase_client.get("daily_meta", {"limit": 1, "plan_date": "eq.2026-01-11"})
+
+    assert a == b
+    assert _Handler.gets == 1
+
+
+def test_cache_key_keeps_filter_whitespace():
+    key = supabase_client._cache_key
+
+    assert key("todo_matrix", {"task_text": "eq.Buy  milk"}) != key(
+        "todo_matrix", {"task_text": "eq.Buy milk"}
+    )
+    assert key("todo_matrix", {"select": "id,\n  task_text", "order": "id.asc"}) == key(
+        "todo_matrix", {"select": "id, task_text", "order": "id.asc"}
+    )
+
+def test_cached_rows_are_not_shared_with_callers(backend):
+    app = Flask(__name__)
+
+    with app.test_request_context("/"):
+        rows = supabase_client.get("daily_meta")
+        rows[0]["path"] = "mutated"
+        again = supabase_client.get("daily_meta")
+
+    assert again[0]["path"] != "mutated"
+
+
+def test_write_invalidates_table(backend):
+    app = Flask(__name__)
+
+    with app.test_request_context("/"):
+        supabase_client.get("daily_slots")
+        supabase_client.get("project_tasks", {"select": "task_id,projects(name)"})
+        supabase_client.get("daily_meta")
+
+        supabase_client.post("daily_slots?on_conflict=plan_date,slot", [{"slot": 1}])
+        supabase_client.post("projects", {"name": "x"})
+
+        supabase_client.get("daily_slots")
+        supabase_client.get("project_tasks", {"select": "task_id,projects(name)"})
+        supabase_client.get("daily_meta")
+
+    assert _Handler.gets == 5
+
+
+def test_no_cache_outside_request(backend):
+    supabase_client.get("daily_meta")
+    supabase_client.get("daily_meta")
+
+    assert _Handler.gets == 2
+
+
+def test_in_filter_quotes_values():
+    assert supabase_client.in_filter(["a1", 2, 'x"y']) == 'in.("a1","2","x\\"y")'
@@ -1,21 +1,19 @@
 import urllib.parse
-from zoneinfo import ZoneInfo
-from utils.slots import slot_start_end
+from utils.slots import slot_utc_range
+
+CALENDAR_RENDER_URL = "https://calendar.google.com/calendar/render?"
 
 
 def google_calendar_link(plan_date, slot, task):
     if not task:
         return "#"
-    start_ist, end_ist = slot_start_end(plan_date, slot)
-    start_utc = start_ist.astimezone(ZoneInfo("UTC"))
-    end_utc = end_ist.astimezone(ZoneInfo("UTC"))
+    start_utc, end_utc = slot_utc_range(plan_date, slot)
     params = {
         "action": "TEMPLATE",
         "text": task,
-        "dates": f"{start_utc.strftime('%Y%m%dT%H%M%SZ')}/{end_utc.strftime('%Y%m%dT%H%M%SZ')}",
+        "dates": f"{start_utc:%Y%m%dT%H%M%SZ}/{end_utc:%Y%m%dT%H%M%SZ}",
         "details": "Created from Daily Planner",
         "trp": "false",
     }
-    return "https://calendar.google.com/calendar/render?" + urllib.parse.urlencode(
-        params
-    )
\ No newline at end of file
+    return CALENDAR_RENDER_URL + urllib.parse.urlencode(params)
+
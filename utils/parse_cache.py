@@ -0,0 +1,149 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from types import MappingProxyType
+
+from config import IST
+from utils.planner_parser import parse_planner_input
+from utils.smartplanner import parse_smart_sentence
+
+# ==========================================================
+# PARSE CACHE – bounded LRU over the smart-planner parsers
+# ==========================================================
+# The same line is parsed again and again: /smart/preview on every
+# submit attempt, save_day for each smart block line, and
+# /api/v2/smart-create. Results are keyed by whitespace-normalized
+# line + date + PARSER_VERSION, and returned read-only because one
+# object is shared by every caller that hits it. Parse errors are
+# cached too (half-typed lines are the common case in preview).
+
+PARSE_CACHE_SIZE = int(os.environ.get("PARSE_CACHE_SIZE", "2048"))
+
+# Bump when either parser's output changes
+PARSER_VERSION = 3
+
+
+def normalize_line(text):
+    return " ".join(text.split())
+
+
+def _freeze(result):
+    return MappingProxyType({
+        k: tuple(v) if isinstance(v, list) else v
+        for k, v in result.items()
+    })
+
+
+class LRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+CACHES = {
+    "planner": LRUCache(PARSE_CACHE_SIZE),
+    "smart": LRUCache(PARSE_CACHE_SIZE),
+}
+
+
+def _cached(cache, key, parse):
+    def compute():
+        try:
+            return _freeze(parse()), None
+        except ValueError as e:
+            return None, str(e)
+
+    parsed, error = CACHES[cache].get_or_compute(key, compute)
+    if error is not None:
+        raise ValueError(error)
+    return parsed
+
+
+def parse_planner_line(raw_text, plan_date, found=None, leading=False):
+    """
+    Cached parse_planner_input → read-only mapping (tags as a tuple).
+    `found` (tokenize(raw_text, leading)) is only used on a miss.
+    """
+    line = normalize_line(raw_text)
+    # Shorthands start with a digit; other lines parse the same either way
+    leading = leading and line[:1].isdigit()
+    key = (line, plan_date, leading, PARSER_VERSION)
+    return _cached(
+        "planner", key,
+        lambda: parse_planner_input(raw_text, plan_date, found, leading)
+    )
+
+
+def parse_smart_line(text, base_date=None):
+    """
+    Cached parse_smart_sentence → read-only mapping.
+    """
+    base_date = base_date or datetime.now(IST).date()
+    key = (normalize_line(text), base_date, PARSER_VERSION)
+    return _cached("smart", key, lambda: parse_smart_sentence(text, base_date))
+
+
+# -----------------------------
+# Counters
+# -----------------------------
+def cache_stats():
+    """
+    {parser: {hits, misses, size, maxsize}}
+    """
+    stats = {}
+    for name, cache in CACHES.items():
+        stats[name] = {
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "size": len(cache),
+            "maxsize": cache.maxsize,
+        }
+    return stats
+
+
+def clear_parse_cache():
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def metrics_lines():
+    """
+    Prometheus counters for metrics.add_collector().
+    """
+    lines = [
+        "# HELP parse_cache_requests_total Smart-planner parse cache lookups.",
+        "# TYPE parse_cache_requests_total counter",
+    ]
+    for name, stats in cache_stats().items():
+        lines.append(f'parse_cache_requests_total{{parser="{name}",result="hit"}} {stats["hits"]}')
+        lines.append(f'parse_cache_requests_total{{parser="{name}",result="miss"}} {stats["misses"]}')
+    return lines
@@ -2,7 +2,7 @@ import re
 from datetime import datetime, timedelta
 
 from utils.dates import safe_date
-from utils.time_parser import parse_time_token 
+from utils.time_parser import IST, time_parts
 from config import (
     WEEKDAY_MAP,
     QUADRANT_MAP,
@@ -10,13 +10,143 @@ from config import (
     DEFAULT_PRIORITY,
     DEFAULT_CATEGORY,
     PRIORITY_RANK,
+    EVERY_DAY_RE,
+    EVERY_WEEKDAY_RE,
+    INTERVAL_RE,
+    MONTHLY_RE,
 )
 
+# ==========================================================
+# GRAMMAR – one compiled scanner per planner line
+# ==========================================================
+# Every construct the planner understands is one alternative of
+# PLANNER_TOKEN_RE, so a single finditer() pass finds the time
+# expression, date phrase, quadrant, $priority, %category and #tags.
+# Alternatives are tried left to right at each position: a range
+# ("@9 to 10", "@10:00 - 11:00") wins over the "@time" it starts with.
+# $priority and #tag match anywhere, as they always have ("$highest",
+# "email#work"). Unknown whole-token markers ("$urgent", "%work") are
+# scanned as `marker` and only dropped from the title, as are
+# recurrence phrases (read by parse_recurrence_block).
+#
+# Leading-hour shorthands ("9 task", "9-10 task") are a smart planner
+# block feature: only LEADING_TOKEN_RE (tokenize(leading=True)) knows
+# them, so "3 calls to make" sent anywhere else still needs a time.
+
+
+def _time(name):
+    return (
+        rf"(?P<{name}_h>\d{{1,2}})(?:[:.](?P<{name}_m>\d{{2}}))?"
+        rf"(?:\s*(?P<{name}_p>[ap]m))?"
+    )
+
+
+_LEADING = rf"""
+      (?P<lead_range> ^{_time("lr")} \s*-\s* {_time("le")} (?=\s) )
+    | (?P<lead_single> ^{_time("ls")} (?=\s) )
+    |"""
+
+_TOKENS = rf"""
+      (?P<range> (?:@|\bfrom\b) \s* {_time("rs")} (?:\s+to\s+|\s*-\s*) {_time("re")} \b )
+    | (?P<at> @\s* {_time("at")} \b )
+    | (?P<bare> \b (?P<bare_h>\d{{1,2}})[:.](?P<bare_m>\d{{2}}) (?:\s*(?P<bare_p>[ap]m))? \b )
+    | (?P<on_date> \bon\s+ (?P<on_day>\d{{1,2}})(?:st|nd|rd|th)? [\s\-/]?
+                   (?: (?P<on_mon>[a-z]{{3}})[a-z]* | (?P<on_num>\d{{1,2}}) ) )
+    | (?P<tomorrow> \btomorrow\b )
+    | (?P<next_day> \bnext\s+ (?P<weekday>{"|".join(WEEKDAY_MAP)}) \b )
+    | (?P<quadrant> \b Q[1-4] \b )
+    | (?P<priority> \$ (?P<priority_name>critical|high|medium|low) \S* )
+    | (?P<category> (?<!\S) % (?P<category_name>{"|".join(TASK_CATEGORIES)}) (?!\S) )
+    | (?P<tag> \# (?P<tag_name>\w+) \S* )
+    | (?P<marker> (?<!\S) [$%\#] \S+ )
+    | (?P<recurrence> {EVERY_DAY_RE} | {EVERY_WEEKDAY_RE} | {INTERVAL_RE} | {MONTHLY_RE}
+                    | \bstarting\s+\d{{4}}-\d{{2}}-\d{{2}}\b )
+    """
+
+PLANNER_TOKEN_RE = re.compile(_TOKENS, re.I | re.X)
+LEADING_TOKEN_RE = re.compile(_LEADING + _TOKENS, re.I | re.X)
+
+# Time expressions in precedence order → (start group, end group)
+TIME_KINDS = (
+    ("range", "rs", "re"),
+    ("lead_range", "lr", "le"),
+    ("at", "at", None),
+    ("lead_single", "ls", None),
+    ("bare", "bare", None),
+)
+
+# Explicit times that make a smart-planner line a timed slot (a bare
+# "9:30" inside the text does not)
+SLOT_TIME_KINDS = ("range", "lead_range", "at", "lead_single")
+
+# "at" / "@" left dangling before a bare time ("Read book at 14:00")
+CONNECTOR_RE = re.compile(r"(?:\bat|@)\s*$", re.I)
+
+MONTH_ABBR = {
+    m: i for i, m in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun",
+         "jul", "aug", "sep", "oct", "nov", "dec"), 1
+    )
+}
+
+
+def tokenize(text, leading=False):
+    """
+    {token kind: [match, ...]} for one line, in line order.
+    leading=True also reads "9 task" / "9-10 task" shorthands.
+    """
+    scanner = LEADING_TOKEN_RE if leading else PLANNER_TOKEN_RE
+    found = {}
+    for m in scanner.finditer(text):
+        found.setdefault(m.lastgroup, []).append(m)
+    return found
+
+
+def has_slot_time(found):
+    return any(kind in found for kind in SLOT_TIME_KINDS)
+
+
+def _match_time(m, prefix, plan_date):
+    hour, minute = time_parts(
+        m.group(f"{prefix}_h"), m.group(f"{prefix}_m"), m.group(f"{prefix}_p")
+    )
+    return datetime(plan_date.year, plan_date.month, plan_date.day, hour, minute, tzinfo=IST)
+
+
+def _on_date_month(m):
+    """
+    Month of an "on 15Feb" / "on 15/02" match, None if it isn't one.
+    """
+    if m.group("on_num"):
+        month = int(m.group("on_num"))
+        return month if 1 <= month <= 12 else None
+    return MONTH_ABBR.get(m.group("on_mon").lower())
+
+
+def _resolve_date(found, default_date):
+    if "on_date" in found:
+        m = found["on_date"][0]
+        month = _on_date_month(m)
+        if not month:
+            return default_date
+        return safe_date(default_date.year, month, int(m.group("on_day")))
+
+    if "tomorrow" in found:
+        return default_date + timedelta(days=1)
+
+    if "next_day" in found:
+        target = WEEKDAY_MAP[found["next_day"][0].group("weekday").lower()]
+        delta = (target - default_date.weekday()) % 7
+        return default_date + timedelta(days=delta or 7)  # force NEXT, not today
+
+    return default_date
 
 
-   
 def extract_tags(text):
-    return list(set(tag.lower() for tag in re.findall(r"#(\w+)", text)))
+    return [
+        m.group("tag_name").lower()
+        for m in tokenize(text).get("tag", [])
+    ]
 
 
 def extract_date(raw_text, default_date):
@@ -50,120 +180,33 @@ def extract_date(raw_text, default_date):
     - Invalid dates are safely clamped to month end
       (e.g., 31 Feb → 28/29 Feb).
     """
-    text = raw_text.lower()
-
-    # --------------------------------
-    # 1️⃣ Explicit date: "on 15Feb", "on 15/02"
-    # --------------------------------
-    match = re.search(
-        r"\bon\s+(\d{1,2})[\s\-\/]?([a-z]{3}|\d{1,2})",
-        text,
-        re.I,
-    )
-
-    if match:
-        day = int(match.group(1))
-        month_token = match.group(2)
-
-        if month_token.isdigit():
-            month = int(month_token)
-        else:
-          try:
-              month = datetime.strptime(month_token[:3], "%b").month
-          except ValueError:
-              return default_date
+    return _resolve_date(tokenize(raw_text), default_date)
 
 
-        return safe_date(default_date.year, month, day)
-
-    # --------------------------------
-    # 2️⃣ Tomorrow
-    # --------------------------------
-    if re.search(r"\btomorrow\b", text):
-        return default_date + timedelta(days=1)
-
-    # --------------------------------
-    # 3️⃣ Next weekday (e.g. "next monday")
-    # --------------------------------
-    weekday_match = re.search(
-        r"\bnext\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
-        text,
-    )
-
-    if weekday_match:
-
-        target = WEEKDAY_MAP[weekday_match.group(1)]
-        today = default_date.weekday()
-
-        delta = (target - today) % 7
-        delta = 7 if delta == 0 else delta  # force NEXT, not today
-
-        return default_date + timedelta(days=delta)
-
-    # --------------------------------
-    # 4️⃣ Default → planner UI date
-    # --------------------------------
-    return default_date
-
-def parse_planner_input(raw_text, plan_date):
-    # --------------------------------
-    # QUADRANT PARSING
-    # --------------------------------
-    raw_text =normalize_date_time_order(raw_text)
-    raw_text = normalize_ordinal_dates(raw_text)
-    task_date = extract_date(raw_text, plan_date)
-
-    quadrant_match = re.search(r"\b(Q[1-4])\b", raw_text, re.I)
-    quadrant = (
-        QUADRANT_MAP[quadrant_match.group(1).upper()]
-        if quadrant_match
-        else None
-    )
+def parse_planner_input(raw_text, plan_date, found=None, leading=False):
+    """
+    One planner line → task dict. `found` is tokenize(raw_text, leading)
+    when the caller already scanned the line.
+    """
+    found = tokenize(raw_text, leading) if found is None else found
+    task_date = _resolve_date(found, plan_date)
 
     # --------------------------------
-    # TIME PARSING (existing logic)
+    # TIME (first kind present wins)
     # --------------------------------
- # --------------------------------
-# TIME PARSING (expanded)
-# --------------------------------
-
-    range_match = re.search(
-        r"(?:@|from)\s*([0-9:\.apm\s]+)\s+to\s+([0-9:\.apm\s]+)",
-        raw_text,
-        re.I,
-    )
-
-    single_match = re.search(
-        r"@\s*([0-9:\.apm\s]+)",
-        raw_text,
-        re.I,
-    )
-
-    bare_single_match = re.search(
-    r"\b([0-9]{1,2}[:\.][0-9]{2}\s*(?:am|pm)?)\b",
-    raw_text,
-    re.I,
-)
-
-
-    if range_match:
-        start_raw, end_raw = range_match.groups()
-        start_dt = parse_time_token(start_raw, task_date)
-        end_dt = parse_time_token(end_raw, task_date)
-
-    elif single_match:
-        start_raw = single_match.group(1)
-        start_dt = parse_time_token(start_raw, task_date)
-        end_dt = start_dt + timedelta(minutes=30)
-
-    elif bare_single_match:
-        start_raw = bare_single_match.group(1)
-        start_dt = parse_time_token(start_raw, task_date)
-        end_dt = start_dt + timedelta(minutes=30)
-
+    for kind, start_group, end_group in TIME_KINDS:
+        if kind in found:
+            time_match = found[kind][0]
+            break
     else:
         raise ValueError("Time missing")
 
+    start_dt = _match_time(time_match, start_group, task_date)
+    end_dt = (
+        _match_time(time_match, end_group, task_date)
+        if end_group
+        else start_dt + timedelta(minutes=30)
+    )
 
     if end_dt <= start_dt:
         raise ValueError("End time must be after start time")
@@ -171,31 +214,50 @@ def parse_planner_input(raw_text, plan_date):
     # --------------------------------
     # METADATA
     # --------------------------------
-    priority_match = re.search(r"\$(critical|high|medium|low)", raw_text, re.I)
-    category_match = re.search(
-    r"%(" + "|".join(TASK_CATEGORIES.keys()) + r")",
-    raw_text,
-    re.I
-    )
-
+    # Quadrant markers go at the end → the last one wins
+    # ("Review Q4 report @9am Q2" → Q2)
+    quadrant_match = found["quadrant"][-1] if "quadrant" in found else None
+    priority_match = found["priority"][0] if "priority" in found else None
+    category_match = found["category"][0] if "category" in found else None
 
     priority = (
-        priority_match.group(1).capitalize()
+        priority_match.group("priority_name").capitalize()
         if priority_match
         else DEFAULT_PRIORITY
     )
-
     category = (
-        category_match.group(1).capitalize()
+        category_match.group("category_name").capitalize()
         if category_match
         else DEFAULT_CATEGORY
     )
-    
-    title = re.sub(r"\s(@|\$|%|#|Q[1-4]).*", "", raw_text).strip()
-    tags = extract_tags(raw_text)
+    tags = list(dict.fromkeys(
+        m.group("tag_name").lower() for m in found.get("tag", [])
+    ))
+
+    # --------------------------------
+    # TITLE = text minus the tokens used above
+    # --------------------------------
+    connector = CONNECTOR_RE.search(raw_text, 0, time_match.start())
+    used = [(connector.start() if connector else time_match.start(), time_match.end())]
+    if quadrant_match:
+        used.append(quadrant_match.span())
+    used.extend(m.span() for m in found.get("on_date", ()) if _on_date_month(m))
+    for kind in ("tomorrow", "next_day", "priority", "category", "tag",
+                 "marker", "recurrence"):
+        used.extend(
+            m.span() for m in found.get(kind, ())
+            # "email#work" stays in the title; only its tag is read
+            if not (kind == "tag" and m.start() and not raw_text[m.start() - 1].isspace())
+        )
+
+    title, pos = [], 0
+    for start, end in sorted(used):
+        title.append(raw_text[pos:start])
+        pos = end
+    title.append(raw_text[pos:])
 
     return {
-        "title": title,
+        "title": " ".join("".join(title).split()),
         "start": start_dt,
         "end": end_dt,
         "date" : task_date,
@@ -203,7 +265,7 @@ def parse_planner_input(raw_text, plan_date):
         "priority_rank": PRIORITY_RANK[priority],
         "category": category,
         "tags": tags,
-        "quadrant": quadrant,  # ⭐ NEW
+        "quadrant": QUADRANT_MAP[quadrant_match.group().upper()] if quadrant_match else None,
     }
 
 
@@ -228,30 +290,3 @@ def generate_half_hour_slots(parsed):
 
     return slots
 
-
-
-
-ORDINAL_RE = re.compile(r'(\d+)(st|nd|rd|th)', re.I)
-
-def normalize_ordinal_dates(text: str) -> str:
-    """
-    Converts 'Jan31st' -> 'Jan 31'
-    Converts '31st Jan' -> '31 Jan'
-    """
-    return ORDINAL_RE.sub(r'\1', text)
-
-
-
-ON_DATE_FROM_TIME_RE = re.compile(
-    r"(on\s+[^,]+?)\s+(from\s+\d{1,2}(:\d{2})?\s*(am|pm)\s+to\s+\d{1,2}(:\d{2})?\s*(am|pm))",
-    re.I,
-)
-
-def normalize_date_time_order(text: str) -> str:
-    """
-    Converts:
-      'meet Renga on Feb 28 from 7 am to 8 am'
-    into:
-      'meet Renga from 7 am to 8 am on Feb 28'
-    """
-    return ON_DATE_FROM_TIME_RE.sub(r"\2 \1", text)
@@ -1,5 +1,9 @@
 from datetime import datetime, timedelta,date
-from config import IST
+from functools import lru_cache
+from config import IST, TOTAL_SLOTS
+
+SLOT_MINUTES = 30
+
 def slot_label(slot: int) -> str:
     total_minutes = (slot - 1) * 30
     start_h, start_m = divmod(total_minutes, 60)
@@ -14,6 +18,38 @@ def slot_label(slot: int) -> str:
 
     return f"{fmt(start_h, start_m)} – {fmt(end_h, end_m)}"
 
+# ==========================================================
+# SLOT TABLE – the 48-slot day grid, computed once at import
+# ==========================================================
+# slot → (start minute, end minute) from local midnight
+SLOT_BOUNDS = {
+    s: ((s - 1) * SLOT_MINUTES, s * SLOT_MINUTES)
+    for s in range(1, TOTAL_SLOTS + 1)
+}
+# slot → "07:00 AM – 07:30 AM"
+SLOT_LABELS = {s: slot_label(s) for s in SLOT_BOUNDS}
+
+
+@lru_cache(maxsize=64)
+def utc_offset(plan_date: date) -> timedelta:
+    """
+    IST offset from UTC on plan_date (taken at local midnight).
+    """
+    return datetime.combine(plan_date, datetime.min.time(), tzinfo=IST).utcoffset()
+
+
+def slot_utc_range(plan_date: date, slot: int):
+    """
+    Naive UTC (start, end) of a slot – table lookup + one cached offset
+    instead of two tz conversions.
+    """
+    start_min, end_min = SLOT_BOUNDS[slot]
+    midnight_utc = datetime.combine(plan_date, datetime.min.time()) - utc_offset(plan_date)
+    return (
+        midnight_utc + timedelta(minutes=start_min),
+        midnight_utc + timedelta(minutes=end_min),
+    )
+
 def current_slot():
     now = datetime.now(IST)
     return (now.hour * 60 + now.minute) // 30 + 1
@@ -23,11 +59,9 @@ def slots_to_timerange(slot_objs):
     return f"{start}–{end}"
 
 def slot_start_end(plan_date: date, slot: int):
-    start = datetime.combine(plan_date, datetime.min.time(), tzinfo=IST) + timedelta(
-        minutes=(slot - 1) * 30
-    )
-    end = start + timedelta(minutes=30)
-    return start, end
+    start_min, end_min = SLOT_BOUNDS[slot]
+    midnight = datetime.combine(plan_date, datetime.min.time(), tzinfo=IST)
+    return midnight + timedelta(minutes=start_min), midnight + timedelta(minutes=end_min)
 
 def generate_half_hour_slots(parsed):
     slots = []
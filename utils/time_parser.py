@@ -4,62 +4,43 @@ from zoneinfo import ZoneInfo
 
 IST = ZoneInfo("Asia/Kolkata")
 
+# "9", "9am", "7:30 pm", "14.05" – first time-looking run in a token
+TIME_TOKEN_RE = re.compile(
+    r"\b(\d{1,2})(?:[:\.](\d{2}))?(?:\s*(am|pm))?\b",
+    re.I,
+)
+
+
+def time_parts(hour, minute=None, meridiem=None):
+    """
+    (hour, minute) on the 24h clock from matched text groups.
+    12h times need 1–12 with am/pm; otherwise 0–23.
+    """
+    hour = int(hour)
+    minute = int(minute) if minute else 0
+
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Invalid 12-hour time: {hour}{meridiem}")
+        hour = hour % 12 + (12 if meridiem.lower() == "pm" else 0)
+    elif not 0 <= hour <= 23:
+        raise ValueError(f"Invalid hour in time: {hour}")
+
+    if not 0 <= minute < 60:
+        raise ValueError(f"Invalid minute in time: {minute}")
+
+    return hour, minute
+
+
 def parse_time_token(token, plan_date):
-    token = token.lower().strip()
-
-    # ----------------------------------
-    # 1️⃣ 24-hour HH:MM or HH.MM (PRIMARY)
-    # ----------------------------------
-    match = re.search(r"\b(\d{1,2})[:\.](\d{2})\b", token)
-    if match:
-        hour, minute = map(int, match.groups())
-
-        if not (0 <= hour <= 23):
-            raise ValueError(f"Invalid hour in time: {token}")
-        if not (0 <= minute < 60):
-            raise ValueError(f"Invalid minute in time: {token}")
-
-        naive = datetime.strptime(
-            f"{plan_date} {hour:02d}:{minute:02d}",
-            "%Y-%m-%d %H:%M",
-        )
-        return naive.replace(tzinfo=IST)
-
-    # ----------------------------------
-    # 2️⃣ am / pm format (secondary)
-    # ----------------------------------
-    match = re.search(
-        r"\b(\d{1,2})(?:[:\.](\d{2}))?\s*(am|pm)\b",
-        token
+    match = TIME_TOKEN_RE.search(token)
+    if not match:
+        raise ValueError(f"Invalid time token: {token.strip()}")
+
+    hour, minute = time_parts(*match.groups())
+    return datetime(
+        plan_date.year, plan_date.month, plan_date.day, hour, minute, tzinfo=IST
     )
-    if match:
-        hour, minute, meridiem = match.groups()
-        minute = minute or "00"
-
-        naive = datetime.strptime(
-            f"{plan_date} {hour}:{minute}{meridiem}",
-            "%Y-%m-%d %I:%M%p",
-        )
-        return naive.replace(tzinfo=IST)
-
-    # ----------------------------------
-    # 3️⃣ Plain hour fallback ("10" → 10:00)
-    # ----------------------------------
-    match = re.search(r"\b(\d{1,2})\b", token)
-    if match:
-        hour = int(match.group(1))
-
-        if 0 <= hour <= 23:
-            naive = datetime.strptime(
-                f"{plan_date} {hour:02d}:00",
-                "%Y-%m-%d %H:%M",
-            )
-            return naive.replace(tzinfo=IST)
-
-    # ----------------------------------
-    # ❌ Nothing matched
-    # ----------------------------------
-    raise ValueError(f"Invalid time token: {token}")
 
 def parse_time_range(text, plan_date):
     text = text.lower().strip()